@@ -2,12 +2,17 @@
 Cerebras-Powered Portfolio Recommender Agent
 Agentic AI orchestration using Cerebras Cloud SDK
 """
+import asyncio
 import json
 import logging
-from typing import Dict, Optional, List
+import contextvars
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Iterator, Optional, List, Tuple
 from datetime import datetime
 
-from cerebras.cloud.sdk import Cerebras
+from cerebras.cloud.sdk import AsyncCerebras, Cerebras
 
 from config_new import (
     CEREBRAS_API_KEY,
@@ -15,16 +20,36 @@ from config_new import (
     CEREBRAS_TEMPERATURE,
     CEREBRAS_TOP_P,
     CEREBRAS_MAX_TOKENS,
+    CEREBRAS_BASE_URL,
+    CEREBRAS_MAX_CONCURRENCY,
+    CEREBRAS_REQUESTS_PER_SECOND,
     AGENT_SYSTEM_PROMPT,
     EXTRACTION_PROMPT_TEMPLATE,
-    MANDATORY_DISCLAIMER
+    EXTRACTION_SYSTEM_PROMPT,
+    LOOKBACK_PERIOD_DAYS,
+    MANDATORY_DISCLAIMER,
+    RISK_PROFILES,
+    SPECULATION_WORKERS,
+    SPECULATIVE_OPTIMIZATION
 )
-from portfolio_optimizer_csv import CSVPortfolioOptimizer, create_optimizer
+from async_llm import AsyncThrottle, LoopLocal
+from extraction_cache import ExtractionCache, normalize_query
+from portfolio_optimizer_csv import PROFILE_OBJECTIVES, CSVPortfolioOptimizer, create_optimizer
 from guardrails import InputGuardrail, OutputGuardrail
+from single_flight import SingleFlight
+from tracing import Trace, span, start_trace
 
 logger = logging.getLogger(__name__)
 
 
+def _with_trace(response: Dict, trace: Trace) -> Dict:
+    """Attach per-stage seconds and the span list of a trace to a response"""
+    metadata = response.setdefault("metadata", {})
+    metadata["timings"] = trace.stage_seconds()
+    metadata["spans"] = trace.to_dict()["spans"]
+    return response
+
+
 class CerebrasPortfolioAgent:
     """
     Autonomous portfolio recommendation agent powered by Cerebras
@@ -35,7 +60,13 @@ class CerebrasPortfolioAgent:
         self,
         api_key: str = CEREBRAS_API_KEY,
         model: str = CEREBRAS_MODEL,
-        optimizer: Optional[CSVPortfolioOptimizer] = None
+        optimizer: Optional[CSVPortfolioOptimizer] = None,
+        extraction_cache: Optional[ExtractionCache] = None,
+        base_url: Optional[str] = CEREBRAS_BASE_URL,
+        max_concurrency: int = CEREBRAS_MAX_CONCURRENCY,
+        requests_per_second: Optional[float] = CEREBRAS_REQUESTS_PER_SECOND,
+        speculative_optimization: bool = SPECULATIVE_OPTIMIZATION,
+        speculation_workers: int = SPECULATION_WORKERS
     ):
         """
         Initialize agent with Cerebras client
@@ -44,11 +75,42 @@ class CerebrasPortfolioAgent:
             api_key: Cerebras API key
             model: Model name (llama3.1-70b or qwen-3-235b-a22b-instruct-2507)
             optimizer: Portfolio optimizer instance
+            extraction_cache: Persistent cache of parameter extractions
+                              (default: the shared on-disk cache)
+            base_url: API endpoint (default: Cerebras cloud; e.g. a local stub server)
+            max_concurrency: LLM requests in flight at once on the async path
+            requests_per_second: LLM request start rate on the async path (None: unlimited)
+            speculative_optimization: Start solving for the regex-extracted parameters
+                                      while the LLM extraction is in flight
+            speculation_workers: Speculative solves running at once (shared by every caller)
         """
-        self.client = Cerebras(api_key=api_key)
+        self.client = Cerebras(api_key=api_key, base_url=base_url)
         self.model = model
+        
+        # Async clients belong to an event loop, so one is created per loop
+        self._async_clients: LoopLocal[AsyncCerebras] = LoopLocal(
+            lambda: AsyncCerebras(api_key=api_key, base_url=base_url, warm_tcp_connection=False)
+        )
+        self.llm_throttle = AsyncThrottle(max_concurrency, requests_per_second)
+        
+        self.speculative_optimization = speculative_optimization
+        self._extraction_flights = SingleFlight()
+        # One agent serves every session: never queue a speculative solve behind
+        # others (including discarded ones that cannot be stopped)
+        speculation_workers = max(1, speculation_workers)
+        self._speculation_slots = threading.BoundedSemaphore(speculation_workers)
+        self._speculation_pool = ThreadPoolExecutor(
+            max_workers=speculation_workers, thread_name_prefix="speculative-solve"
+        )
         self.optimizer = optimizer or create_optimizer()
         
+        if extraction_cache is None:
+            try:
+                extraction_cache = ExtractionCache()
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Extraction cache unavailable, continuing without it: {e}")
+        self.extraction_cache = extraction_cache
+        
         # Initialize guardrails
         self.input_guardrail = InputGuardrail()
         self.output_guardrail = OutputGuardrail()
@@ -65,34 +127,298 @@ class CerebrasPortfolioAgent:
             
         Returns:
             Response dictionary with recommendation and metadata
+            (metadata["timings"] has seconds per pipeline stage)
         """
+        with start_trace("process_query") as trace:
+            return _with_trace(self._process_query(user_query, chat_history), trace)
+    
+    def _process_query(self, user_query: str, chat_history: Optional[List[Dict]] = None) -> Dict:
         logger.info(f"Processing query: {user_query[:100]}...")
         
         # Step 1: Input Guardrails
-        guardrail_result = self.input_guardrail.check(user_query)
-        
-        if not guardrail_result["passed"]:
-            return {
-                "success": False,
-                "error": "Input validation failed",
-                "issues": guardrail_result["issues"],
-                "message": "Your query contains sensitive information or violates safety policies. Please rephrase."
-            }
+        rejection = self._check_input(user_query)
+        if rejection is not None:
+            return rejection
         
         # Step 1.5: Classify query intent - is this a portfolio request or general chat?
-        query_intent = self._classify_query_intent(user_query, chat_history)
+        with span("intent"):
+            query_intent = self._classify_query_intent(user_query, chat_history)
         
         if query_intent == "general_chat":
             # Handle general conversation without portfolio generation
-            return self._handle_general_chat(user_query, chat_history)
+            with span("chat"):
+                return self._handle_general_chat(user_query, chat_history)
         elif query_intent == "research":
             # Handle research/information requests
-            return self._handle_research_query(user_query, chat_history)
+            with span("research"):
+                return self._handle_research_query(user_query, chat_history)
         
         # If portfolio request, continue with optimization...
         
-        # Step 2: Extract Investment Parameters using Cerebras
-        params = self._extract_parameters(user_query)
+        # Steps 2-3: Extract Investment Parameters using Cerebras and run the
+        # Quantitative Optimization (overlapped when speculation is enabled)
+        try:
+            params, optimization_result, speculation = self._extract_and_optimize(user_query)
+        except Exception as e:
+            return self._optimization_failure(e)
+        
+        # Step 4: Generate Enhanced Explanation using Cerebras
+        with span("explanation"):
+            enhanced_explanation = self.generate_explanation(params, optimization_result, user_query=user_query)
+        
+        # Step 5: Output Guardrails
+        response = self._finalize_response(params, optimization_result, enhanced_explanation)
+        response["metadata"]["speculation"] = speculation
+        
+        logger.info("Query processing complete")
+        return response
+    
+    async def process_query_async(self, user_query: str, chat_history: Optional[List[Dict]] = None) -> Dict:
+        """
+        Async version of process_query
+        
+        LLM calls go through the async client under the agent's concurrency
+        and rate limits; the CPU-bound optimization runs in a worker thread so
+        other queries keep making progress.
+        
+        Args:
+            user_query: User's natural language query
+            chat_history: Previous conversation context
+            
+        Returns:
+            Response dictionary with recommendation and metadata
+        """
+        with start_trace("process_query_async") as trace:
+            return _with_trace(await self._process_query_async(user_query, chat_history), trace)
+    
+    async def _process_query_async(self, user_query: str, chat_history: Optional[List[Dict]] = None) -> Dict:
+        logger.info(f"Processing query (async): {user_query[:100]}...")
+        
+        rejection = self._check_input(user_query)
+        if rejection is not None:
+            return rejection
+        
+        with span("intent"):
+            query_intent = self._classify_query_intent(user_query, chat_history)
+        
+        if query_intent == "general_chat":
+            try:
+                with span("chat"):
+                    reply = await self._complete_async(self._general_chat_request(user_query, chat_history))
+            except Exception as e:
+                logger.error(f"Chat failed: {e}")
+                return self._general_chat_response(None)
+            return self._general_chat_response(reply)
+        elif query_intent == "research":
+            try:
+                with span("research"):
+                    reply = await self._complete_async(self._research_request(user_query, chat_history))
+            except Exception as e:
+                logger.error(f"Research query failed: {e}")
+                return self._research_response(None)
+            return self._research_response(reply)
+        
+        with span("extraction"):
+            params = await self._extract_parameters_async(user_query)
+        logger.info(f"Extracted parameters: {params}")
+        
+        try:
+            with span("optimization"):
+                optimization_result = await asyncio.to_thread(self._optimize_for_params, params)
+        except Exception as e:
+            return self._optimization_failure(e)
+        
+        with span("explanation"):
+            try:
+                explanation = await self._complete_async(
+                    self._explanation_request(user_query, params, optimization_result)
+                )
+            except Exception as e:
+                logger.warning(f"Enhanced explanation failed: {e}")
+                explanation = optimization_result["explanation"]
+        
+        return self._finalize_response(params, optimization_result, explanation)
+    
+    async def process_queries_async(
+        self,
+        queries: List[str],
+        chat_history: Optional[List[Dict]] = None
+    ) -> List[Dict]:
+        """
+        Process many queries concurrently
+        
+        Args:
+            queries: User queries
+            chat_history: Conversation context shared by all queries
+            
+        Returns:
+            One response per query, in input order
+        """
+        results = await asyncio.gather(
+            *(self.process_query_async(query, chat_history) for query in queries),
+            return_exceptions=True
+        )
+        return [
+            {"success": False, "error": "Query processing failed", "message": str(result)}
+            if isinstance(result, Exception) else result
+            for result in results
+        ]
+    
+    def process_queries(self, queries: List[str], chat_history: Optional[List[Dict]] = None) -> List[Dict]:
+        """
+        Process a batch of queries with many LLM requests in flight at once
+        
+        Blocking wrapper around process_queries_async for scripts; call the
+        async version from code that already runs an event loop.
+        
+        Args:
+            queries: User queries
+            chat_history: Conversation context shared by all queries
+            
+        Returns:
+            One response per query, in input order
+        """
+        return asyncio.run(self.process_queries_async(queries, chat_history))
+    
+    def process_query_stream(self, user_query: str, chat_history: Optional[List[Dict]] = None) -> Dict:
+        """
+        Streaming version of process_query
+        
+        Returns as soon as everything except the LLM-written text is ready
+        (for portfolio requests: after extraction and optimization), so the
+        caller can show metrics and charts first. Successful responses carry
+        a "stream" generator of text chunks; consuming it fills in the
+        response's "message" (chat/research) or recommendation "explanation"
+        (portfolio, disclaimer included, which the stream also yields).
+        
+        Args:
+            user_query: User's natural language query
+            chat_history: Previous conversation context
+            
+        Returns:
+            Response dictionary as process_query, plus "stream" on success
+            (metadata["timings"] covers the work before the stream starts)
+        """
+        with start_trace("process_query_stream") as trace:
+            return _with_trace(self._process_query_stream(user_query, chat_history), trace)
+    
+    def _process_query_stream(self, user_query: str, chat_history: Optional[List[Dict]] = None) -> Dict:
+        logger.info(f"Processing query (streaming): {user_query[:100]}...")
+        
+        rejection = self._check_input(user_query)
+        if rejection is not None:
+            return rejection
+        
+        with span("intent"):
+            query_intent = self._classify_query_intent(user_query, chat_history)
+        
+        if query_intent in ("general_chat", "research"):
+            if query_intent == "general_chat":
+                request = self._general_chat_request(user_query, chat_history)
+                make_response = self._general_chat_response
+            else:
+                request = self._research_request(user_query, chat_history)
+                make_response = self._research_response
+            response = make_response("")
+            
+            def finish_reply(reply: Optional[str]) -> str:
+                response.clear()
+                response.update(make_response(reply))
+                return response["message"]
+            
+            response["stream"] = self._stream_text(request, finish_reply)
+            return response
+        
+        try:
+            params, optimization_result, speculation = self._extract_and_optimize(user_query)
+        except Exception as e:
+            return self._optimization_failure(e)
+        
+        response = self._finalize_response(params, optimization_result, "")
+        response["recommendation"]["explanation"] = ""
+        response["metadata"]["speculation"] = speculation
+        
+        def finish_explanation(explanation: Optional[str]) -> str:
+            final = self._finalize_response(
+                params, optimization_result, explanation or optimization_result["explanation"]
+            )
+            response["recommendation"]["explanation"] = final["recommendation"]["explanation"]
+            response["metadata"]["explanation_source"] = "llm" if explanation else "optimizer"
+            return response["recommendation"]["explanation"]
+        
+        response["stream"] = self._stream_text(
+            self._explanation_request(user_query, params, optimization_result), finish_explanation
+        )
+        return response
+    
+    def _check_input(self, user_query: str) -> Optional[Dict]:
+        """Run input guardrails; returns the rejection response if the query fails"""
+        with span("input_guardrail"):
+            guardrail_result = self.input_guardrail.check(user_query)
+        
+        if not guardrail_result["passed"]:
+            return {
+                "success": False,
+                "error": "Input validation failed",
+                "issues": guardrail_result["issues"],
+                "message": "Your query contains sensitive information or violates safety policies. Please rephrase."
+            }
+        return None
+    
+    def _optimize_for_params(self, params: Dict) -> Dict:
+        """Run the optimizer for extracted parameters"""
+        optimization_result = self.optimizer.optimize_portfolio(
+            risk_profile=params["risk_profile"],
+            horizon_years=params["horizon_years"],
+            sector_preferences=params.get("sector_preferences"),
+            exclude_tickers=params.get("constraints", {}).get("exclude_tickers")
+        )
+        logger.info(f"Optimization completed: {len(optimization_result['weights'])} holdings")
+        return optimization_result
+    
+    def _extract_and_optimize(self, user_query: str) -> Tuple[Dict, Dict, str]:
+        """
+        Extract parameters and optimize for them
+        
+        When the extraction needs an LLM call, the optimizer starts solving
+        for the regex extraction's parameters on a worker thread meanwhile.
+        The speculative solution is used if the LLM agrees on everything the
+        solve depends on (risk profile, sectors, exclusions; the horizon only
+        changes the explanation text) and discarded otherwise. Speculation
+        is skipped when every speculation worker is busy, since a queued
+        solve could finish after the sequential one would have.
+        
+        Args:
+            user_query: User's query
+            
+        Returns:
+            (params, optimization result, speculation outcome: "hit", "miss",
+            "busy", "cached" or "off")
+            
+        Raises:
+            Optimizer errors for the extracted parameters
+        """
+        future = None
+        with span("extraction"):
+            params = self._cached_extraction(user_query)
+            
+            if params is not None:
+                speculation = "cached"
+            elif self.speculative_optimization and not self._speculation_slots.acquire(blocking=False):
+                speculation = "busy"
+                params = self._request_extraction(user_query)
+            elif self.speculative_optimization:
+                guess = self._fallback_extraction(user_query)
+                # The worker thread records its spans in this request's trace
+                future = self._speculation_pool.submit(
+                    contextvars.copy_context().run, self._speculative_solve, guess
+                )
+                future.add_done_callback(lambda _: self._speculation_slots.release())
+                params = self._request_extraction(user_query)
+                speculation = "hit" if self._solve_key(guess) == self._solve_key(params) else "miss"
+            else:
+                speculation = "off"
+                params = self._request_extraction(user_query)
         logger.info(f"Extracted parameters: {params}")
         
         # Validate extraction confidence
@@ -100,15 +426,187 @@ class CerebrasPortfolioAgent:
             logger.warning(f"Low confidence extraction: {params.get('confidence')}")
             # Still continue with defaults rather than failing
         
-        # Step 3: Quantitative Optimization
-        try:
-            optimization_result = self.optimizer.optimize_portfolio(
-                risk_profile=params["risk_profile"],
-                horizon_years=params["horizon_years"],
-                sector_preferences=params.get("sector_preferences"),
-                exclude_tickers=params.get("constraints", {}).get("exclude_tickers")
+        with span("optimization"):
+            if speculation == "hit":
+                solution = future.result()
+            else:
+                if future is not None and not future.cancel():
+                    logger.info("Speculative solve discarded: LLM parameters differ")
+                solution = self._solve_for_params(params)
+            optimization_result = self._result_for_params(params, solution)
+        
+        return params, optimization_result, speculation
+    
+    @staticmethod
+    def _solve_key(params: Dict) -> Tuple:
+        """Parameters that determine the optimizer's solution"""
+        return (
+            params["risk_profile"],
+            tuple(sorted(params.get("sector_preferences") or [])),
+            tuple(sorted(params.get("constraints", {}).get("exclude_tickers") or []))
+        )
+    
+    def _solve_for_params(self, params: Dict) -> Tuple:
+        """
+        Estimate and solve for extracted parameters (everything but the result text)
+        
+        Concurrent solves with the same solve key, e.g. a speculative solve and
+        another user's identical request, share one computation.
+        """
+        def solve() -> Tuple:
+            mu, S = self.optimizer._prepare_estimates(
+                params["risk_profile"],
+                params.get("sector_preferences"),
+                params.get("constraints", {}).get("exclude_tickers"),
+                LOOKBACK_PERIOD_DAYS
             )
-            logger.info(f"Optimization completed: {len(optimization_result['weights'])} holdings")
+            return self.optimizer._solve(params["risk_profile"], mu, S)
+        
+        return self.optimizer.single_flight.do(("solve_for_params",) + self._solve_key(params), solve)
+    
+    def _speculative_solve(self, params: Dict) -> Tuple:
+        with span("speculative_solve"):
+            return self._solve_for_params(params)
+    
+    def _result_for_params(self, params: Dict, solution: Tuple) -> Dict:
+        """Optimization result dictionary for a solution of _solve_for_params"""
+        weights, performance, sector_mapper = solution
+        optimization_result = self.optimizer._build_result(
+            weights, performance, sector_mapper,
+            params["risk_profile"], params["horizon_years"], params.get("sector_preferences")
+        )
+        logger.info(f"Optimization completed: {len(optimization_result['weights'])} holdings")
+        return optimization_result
+    
+    def _optimization_failure(self, error: Exception) -> Dict:
+        logger.error(f"Optimization failed: {error}")
+        return {
+            "success": False,
+            "error": "Portfolio optimization failed",
+            "message": f"Could not generate portfolio recommendation: {str(error)}"
+        }
+    
+    def _complete(self, request: Dict) -> str:
+        """Send a chat completion request and return the reply text"""
+        response = self.client.chat.completions.create(**request)
+        return response.choices[0].message.content.strip()
+    
+    async def _complete_async(self, request: Dict) -> str:
+        """Async chat completion under the agent's concurrency and rate limits"""
+        client = self._async_clients.get()
+        async with self.llm_throttle:
+            response = await client.chat.completions.create(**request)
+        return response.choices[0].message.content.strip()
+    
+    def _stream(self, request: Dict) -> Iterator[str]:
+        """Send a streaming chat completion request and yield the reply text as it arrives"""
+        started = False
+        for chunk in self.client.chat.completions.create(stream=True, **request):
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not started and delta:
+                # Match the .strip() of the non-streaming path
+                delta = delta.lstrip()
+                started = bool(delta)
+            if delta:
+                yield delta
+    
+    def _stream_text(self, request: Dict, finish: Callable[[Optional[str]], str]) -> Iterator[str]:
+        """
+        Yield a streamed reply, then whatever finish() adds to it
+        
+        finish receives the complete reply (None if the call failed before
+        any text arrived) and returns the final text, which must start with
+        the reply; the remainder (disclaimer, fallback text) is yielded last.
+        """
+        parts = []
+        try:
+            for delta in self._stream(request):
+                parts.append(delta)
+                yield delta
+        except Exception as e:
+            logger.error(f"Streaming completion failed after {len(parts)} chunks: {e}")
+        
+        reply = "".join(parts).rstrip()
+        final = finish(reply or None)
+        if final.startswith(reply):
+            yield final[len(reply):]
+        else:
+            yield "\n\n" + final
+    
+    def recommend(self, params: Dict, explain: bool = False) -> Dict:
+        """
+        Structured entry point: optimize straight from form values
+        
+        Skips intent classification and LLM parameter extraction. The
+        explanation is the optimizer's deterministic summary unless
+        ``explain`` asks for the LLM-written one (see generate_explanation).
+        
+        Args:
+            params: risk_profile and horizon_years, optionally sector_preferences,
+                    exclude_tickers (or constraints.exclude_tickers) and one of
+                    target_volatility (answered from the cached efficient frontier),
+                    target_return or risk_aversion (solved in the warm optimization session)
+            explain: Also generate the personalized LLM explanation
+            
+        Returns:
+            Response dictionary in the same format as process_query
+        """
+        with start_trace("recommend") as trace:
+            return _with_trace(self._recommend(params, explain), trace)
+    
+    def _recommend(self, params: Dict, explain: bool) -> Dict:
+        risk_profile = str(params.get("risk_profile", "medium")).lower()
+        if risk_profile not in RISK_PROFILES:
+            return {
+                "success": False,
+                "error": "Invalid parameters",
+                "message": f"Unknown risk profile '{risk_profile}'. Choose from {list(RISK_PROFILES.keys())}"
+            }
+        
+        try:
+            horizon_years = max(1, min(30, int(params.get("horizon_years", 10))))
+        except (ValueError, TypeError):
+            horizon_years = 10
+        
+        params = {
+            **params,
+            "risk_profile": risk_profile,
+            "horizon_years": horizon_years,
+            "sector_preferences": params.get("sector_preferences") or [],
+            "constraints": params.get("constraints") or {},
+            "confidence": 1.0,
+            "reasoning": f"Structured request: {risk_profile} risk with {horizon_years}-year horizon"
+        }
+        exclude_tickers = params.get("exclude_tickers") or params["constraints"].get("exclude_tickers")
+        logger.info(f"Structured recommendation: risk={risk_profile}, horizon={horizon_years}y")
+        
+        try:
+            if params.get("target_volatility") is not None:
+                optimization_result = self.optimizer.optimize_on_frontier(
+                    risk_profile=risk_profile,
+                    horizon_years=horizon_years,
+                    target_volatility=params["target_volatility"],
+                    sector_preferences=params["sector_preferences"] or None,
+                    exclude_tickers=exclude_tickers
+                )
+            elif params.get("target_return") is not None or params.get("risk_aversion") is not None:
+                optimization_result = self.optimizer.optimize_for_target(
+                    risk_profile=risk_profile,
+                    horizon_years=horizon_years,
+                    target_return=params.get("target_return"),
+                    risk_aversion=params.get("risk_aversion"),
+                    sector_preferences=params["sector_preferences"] or None,
+                    exclude_tickers=exclude_tickers
+                )
+            else:
+                optimization_result = self.optimizer.optimize_portfolio(
+                    risk_profile=risk_profile,
+                    horizon_years=horizon_years,
+                    sector_preferences=params["sector_preferences"] or None,
+                    exclude_tickers=exclude_tickers
+                )
         except Exception as e:
             logger.error(f"Optimization failed: {e}")
             return {
@@ -117,25 +615,91 @@ class CerebrasPortfolioAgent:
                 "message": f"Could not generate portfolio recommendation: {str(e)}"
             }
         
-        # Step 4: Generate Enhanced Explanation using Cerebras
+        explanation = optimization_result["explanation"]
+        if explain:
+            with span("explanation"):
+                explanation = self.generate_explanation(params, optimization_result)
+        
+        response = self._finalize_response(params, optimization_result, explanation)
+        response["metadata"]["explanation_source"] = "llm" if explain else "optimizer"
+        return response
+    
+    def generate_explanation(
+        self,
+        params: Dict,
+        optimization_result: Dict,
+        user_query: Optional[str] = None
+    ) -> str:
+        """
+        LLM-written explanation for an optimization result
+        
+        Falls back to the optimizer's own explanation if the call fails, so it
+        can be requested separately after a fast recommend().
+        
+        Args:
+            params: Investment parameters (risk_profile, horizon_years, ...)
+            optimization_result: Result of the optimizer
+            user_query: Original query (a description of params if omitted)
+            
+        Returns:
+            Explanation text (without disclaimer)
+        """
+        if user_query is None:
+            user_query = self._describe_params(params)
         try:
-            enhanced_explanation = self._generate_enhanced_explanation(
+            return self._generate_enhanced_explanation(
                 user_query=user_query,
                 params=params,
                 optimization_result=optimization_result
             )
         except Exception as e:
             logger.warning(f"Enhanced explanation failed: {e}")
-            enhanced_explanation = optimization_result["explanation"]
+            return optimization_result["explanation"]
+    
+    def stream_explanation(
+        self,
+        params: Dict,
+        optimization_result: Dict,
+        user_query: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Streaming version of generate_explanation
         
-        # Step 5: Output Guardrails
-        final_output = f"{enhanced_explanation}\n\n{MANDATORY_DISCLAIMER}"
+        Args:
+            params: Investment parameters (risk_profile, horizon_years, ...)
+            optimization_result: Result of the optimizer
+            user_query: Original query (a description of params if omitted)
+            
+        Yields:
+            Explanation text chunks (without disclaimer); the optimizer's own
+            explanation if the LLM call fails before any text arrives
+        """
+        if user_query is None:
+            user_query = self._describe_params(params)
+        return self._stream_text(
+            self._explanation_request(user_query, params, optimization_result),
+            lambda explanation: explanation or optimization_result["explanation"]
+        )
+    
+    def _describe_params(self, params: Dict) -> str:
+        """Stand-in user query for structured requests"""
+        description = (
+            f"{params['risk_profile'].capitalize()} risk portfolio for a {params['horizon_years']}-year horizon"
+        )
+        if params.get("sector_preferences"):
+            description += f" focused on {', '.join(params['sector_preferences'])}"
+        return description
+    
+    def _finalize_response(self, params: Dict, optimization_result: Dict, explanation: str) -> Dict:
+        """Apply output guardrails and build the response dictionary"""
+        final_output = f"{explanation}\n\n{MANDATORY_DISCLAIMER}"
         
-        output_check = self.output_guardrail.check(final_output)
+        with span("output_guardrail"):
+            output_check = self.output_guardrail.check(final_output)
         
         if not output_check["passed"]:
             # Force disclaimer if missing
-            final_output = f"{enhanced_explanation}\n\n{MANDATORY_DISCLAIMER}"
+            final_output = f"{explanation}\n\n{MANDATORY_DISCLAIMER}"
         
         # Construct final response
         response = {
@@ -149,14 +713,24 @@ class CerebrasPortfolioAgent:
             "parameters": params,
             "metadata": {
                 "model": self.model,
+                "objective": self._objective(optimization_result),
                 "optimization_date": optimization_result["optimization_date"],
                 "guardrails_passed": True
             }
         }
-        
-        logger.info("Query processing complete")
+        if "frontier" in optimization_result:
+            response["recommendation"]["frontier"] = optimization_result["frontier"]
         return response
     
+    @staticmethod
+    def _objective(optimization_result: Dict) -> str:
+        """Objective the optimizer ran: a target, frontier interpolation or the risk profile's default"""
+        if "objective" in optimization_result:
+            return optimization_result["objective"]["type"]
+        if "frontier" in optimization_result:
+            return "frontier"
+        return PROFILE_OBJECTIVES[optimization_result["risk_profile"]]
+    
     def _extract_parameters(self, user_query: str) -> Dict:
         """
         Use Cerebras to extract investment parameters from natural language
@@ -167,85 +741,162 @@ class CerebrasPortfolioAgent:
         Returns:
             Extracted parameters dictionary
         """
-        logger.info("Extracting parameters with Cerebras")
+        cached = self._cached_extraction(user_query)
+        if cached is not None:
+            return cached
+        return self._request_extraction(user_query)
+    
+    def _request_extraction(self, user_query: str) -> Dict:
+        """
+        Extract parameters with an LLM call (bypassing the cache lookup)
         
-        extraction_prompt = EXTRACTION_PROMPT_TEMPLATE.format(query=user_query)
+        Queries in flight at the same time that share a cache entry (equal
+        after normalization) share one LLM call.
+        """
+        return self._extraction_flights.do(
+            self._extraction_key(user_query), lambda: self._call_extraction(user_query)
+        )
+    
+    def _extraction_key(self, user_query: str) -> Hashable:
+        """In-flight extraction key: the extraction cache's key for the query"""
+        if self.extraction_cache is not None:
+            return self.extraction_cache.make_key(user_query, self.model)
+        return (self.model, normalize_query(user_query))
+    
+    def _call_extraction(self, user_query: str) -> Dict:
+        logger.info("Extracting parameters with Cerebras")
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a specialized financial parameter extraction AI. Your ONLY job is to extract investment parameters and return valid JSON. Be intelligent about inferring missing information from context like age."},
-                    {"role": "user", "content": extraction_prompt}
-                ],
-                temperature=0.1,  # Very low temperature for consistent extraction
-                max_tokens=1000,
-                top_p=0.95
-            )
-            
-            content = response.choices[0].message.content.strip()
+            content = self._complete(self._extraction_request(user_query))
             logger.info(f"Cerebras response: {content[:300]}...")
-            
         except Exception as e:
             logger.error(f"Cerebras API call failed: {e}")
             # Fallback to regex extraction
             return self._fallback_extraction(user_query)
         
-        # Parse JSON response
+        return self._finish_extraction(user_query, content)
+    
+    async def _extract_parameters_async(self, user_query: str) -> Dict:
+        """Async version of _extract_parameters (coalesced with sync and async callers alike)"""
+        cached = self._cached_extraction(user_query)
+        if cached is not None:
+            return cached
+        
+        return await self._extraction_flights.do_async(
+            self._extraction_key(user_query), lambda: self._call_extraction_async(user_query)
+        )
+    
+    async def _call_extraction_async(self, user_query: str) -> Dict:
         try:
-            # Clean up markdown code blocks
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0].strip()
-            elif "```" in content:
-                # Try to find JSON between any code blocks
-                parts = content.split("```")
-                for part in parts:
-                    part = part.strip()
-                    if part.startswith("{") and part.endswith("}"):
-                        content = part
-                        break
-            
-            # Remove any leading/trailing text
-            if "{" in content and "}" in content:
-                start = content.index("{")
-                end = content.rindex("}") + 1
-                content = content[start:end]
-            
-            params = json.loads(content)
-            
-            # Validate and normalize risk profile
-            if "risk_profile" not in params or not params["risk_profile"]:
-                params["risk_profile"] = "medium"
-            
-            risk_lower = str(params["risk_profile"]).lower()
-            if any(word in risk_lower for word in ["low", "conservative", "safe", "cautious"]):
-                params["risk_profile"] = "low"
-            elif any(word in risk_lower for word in ["high", "aggressive", "growth", "risky"]):
-                params["risk_profile"] = "high"
-            else:
-                params["risk_profile"] = "medium"
-            
-            # Validate and normalize horizon
-            if "horizon_years" not in params or not params["horizon_years"]:
-                params["horizon_years"] = 10
-            
-            try:
-                params["horizon_years"] = max(1, min(30, int(params["horizon_years"])))
-            except (ValueError, TypeError):
-                params["horizon_years"] = 10
-            
-            # Ensure optional fields exist
-            params.setdefault("sector_preferences", [])
-            params.setdefault("constraints", {})
-            params.setdefault("confidence", 0.85)
-            params.setdefault("reasoning", "Extracted from user query")
-            
-            logger.info(f"✅ Successfully extracted: risk={params['risk_profile']}, horizon={params['horizon_years']}y, confidence={params.get('confidence', 0):.2f}")
-            return params
-            
+            content = await self._complete_async(self._extraction_request(user_query))
+        except Exception as e:
+            logger.error(f"Cerebras API call failed: {e}")
+            return self._fallback_extraction(user_query)
+        
+        return self._finish_extraction(user_query, content)
+    
+    def _cached_extraction(self, user_query: str) -> Optional[Dict]:
+        if self.extraction_cache is None:
+            return None
+        cached = self.extraction_cache.get(user_query, self.model)
+        if cached is not None:
+            logger.info(f"Extraction cache hit: risk={cached['risk_profile']}, horizon={cached['horizon_years']}y")
+        return cached
+    
+    def _extraction_request(self, user_query: str) -> Dict:
+        """Chat completion arguments for parameter extraction"""
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
+                {"role": "user", "content": EXTRACTION_PROMPT_TEMPLATE.format(query=user_query)}
+            ],
+            "temperature": 0.1,  # Very low temperature for consistent extraction
+            "max_tokens": 1000,
+            "top_p": 0.95
+        }
+    
+    def _finish_extraction(self, user_query: str, content: str) -> Dict:
+        """Parse the model output, falling back to regex extraction, and cache successes"""
+        try:
+            params = self._parse_extraction(content)
         except (json.JSONDecodeError, ValueError) as e:
             logger.warning(f"JSON parsing failed: {e}, attempting fallback extraction")
             return self._fallback_extraction(user_query)
+        
+        # Only successful LLM extractions are cached; fallbacks are retried next time
+        if self.extraction_cache is not None:
+            try:
+                self.extraction_cache.put(user_query, self.model, params)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not cache extraction: {e}")
+        
+        return params
+    
+    def _parse_extraction(self, content: str) -> Dict:
+        """
+        Parse and normalize the JSON returned by the extraction prompt
+        
+        Args:
+            content: Raw model output
+            
+        Returns:
+            Normalized parameters dictionary
+            
+        Raises:
+            ValueError: If no valid JSON object can be parsed
+        """
+        # Clean up markdown code blocks
+        if "```json" in content:
+            content = content.split("```json")[1].split("```")[0].strip()
+        elif "```" in content:
+            # Try to find JSON between any code blocks
+            parts = content.split("```")
+            for part in parts:
+                part = part.strip()
+                if part.startswith("{") and part.endswith("}"):
+                    content = part
+                    break
+        
+        # Remove any leading/trailing text
+        if "{" in content and "}" in content:
+            start = content.index("{")
+            end = content.rindex("}") + 1
+            content = content[start:end]
+        
+        params = json.loads(content)
+        if not isinstance(params, dict):
+            raise ValueError("Extraction is not a JSON object")
+        
+        # Validate and normalize risk profile
+        if "risk_profile" not in params or not params["risk_profile"]:
+            params["risk_profile"] = "medium"
+        
+        risk_lower = str(params["risk_profile"]).lower()
+        if any(word in risk_lower for word in ["low", "conservative", "safe", "cautious"]):
+            params["risk_profile"] = "low"
+        elif any(word in risk_lower for word in ["high", "aggressive", "growth", "risky"]):
+            params["risk_profile"] = "high"
+        else:
+            params["risk_profile"] = "medium"
+        
+        # Validate and normalize horizon
+        if "horizon_years" not in params or not params["horizon_years"]:
+            params["horizon_years"] = 10
+        
+        try:
+            params["horizon_years"] = max(1, min(30, int(params["horizon_years"])))
+        except (ValueError, TypeError):
+            params["horizon_years"] = 10
+        
+        # Ensure optional fields exist
+        params.setdefault("sector_preferences", [])
+        params.setdefault("constraints", {})
+        params.setdefault("confidence", 0.85)
+        params.setdefault("reasoning", "Extracted from user query")
+        
+        logger.info(f"✅ Successfully extracted: risk={params['risk_profile']}, horizon={params['horizon_years']}y, confidence={params.get('confidence', 0):.2f}")
+        return params
     
     def _fallback_extraction(self, user_query: str) -> Dict:
         """
@@ -339,7 +990,10 @@ class CerebrasPortfolioAgent:
             Enhanced explanation text
         """
         logger.info("Generating enhanced explanation with Cerebras")
-        
+        return self._complete(self._explanation_request(user_query, params, optimization_result))
+    
+    def _explanation_request(self, user_query: str, params: Dict, optimization_result: Dict) -> Dict:
+        """Chat completion arguments for the personalized explanation"""
         # Prepare context for LLM
         context = {
             "user_query": user_query,
@@ -422,20 +1076,16 @@ Write ONLY the explanation (no preamble, no meta-commentary):
 Do NOT include disclaimers (they will be added automatically).
 """
         
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
+        return {
+            "model": self.model,
+            "messages": [
                 {"role": "system", "content": AGENT_SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
-            temperature=CEREBRAS_TEMPERATURE,
-            top_p=CEREBRAS_TOP_P,
-            max_tokens=1000
-        )
-        
-        enhanced_explanation = response.choices[0].message.content.strip()
-        
-        return enhanced_explanation
+            "temperature": CEREBRAS_TEMPERATURE,
+            "top_p": CEREBRAS_TOP_P,
+            "max_tokens": 1000
+        }
     
     def _format_top_holdings(self, weights: Dict[str, float], limit: int = 10) -> str:
         """Format top holdings for display"""
@@ -501,6 +1151,15 @@ Do NOT include disclaimers (they will be added automatically).
         """
         logger.info("Handling general chat query")
         
+        try:
+            reply = self._complete(self._general_chat_request(user_query, chat_history))
+        except Exception as e:
+            logger.error(f"Chat failed: {e}")
+            return self._general_chat_response(None)
+        return self._general_chat_response(reply)
+    
+    def _general_chat_request(self, user_query: str, chat_history: Optional[List[Dict]] = None) -> Dict:
+        """Chat completion arguments for a general conversation turn"""
         messages = [
             {"role": "system", "content": """You are "F2 Portfolio AI", a friendly and knowledgeable investment advisor assistant. 
 
@@ -526,33 +1185,24 @@ Be helpful, educational, and encouraging."""}
         
         messages.append({"role": "user", "content": user_query})
         
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=0.7,
-                max_tokens=200  # Reduced for chat responses
-            )
-            
-            reply = response.choices[0].message.content.strip()
-            
-            return {
-                "success": True,
-                "is_chat": True,
-                "message": reply,
-                "recommendation": None,
-                "parameters": None
-            }
-            
-        except Exception as e:
-            logger.error(f"Chat failed: {e}")
-            return {
-                "success": True,
-                "is_chat": True,
-                "message": "Hello! I'm F2 Portfolio AI, your investment strategy assistant. I can help you with personalized portfolio recommendations based on your age, risk tolerance, and investment goals. I can also research investment topics and explain financial concepts. How can I assist you today?",
-                "recommendation": None,
-                "parameters": None
-            }
+        return {
+            "model": self.model,
+            "messages": messages,
+            "temperature": 0.7,
+            "max_tokens": 200  # Reduced for chat responses
+        }
+    
+    def _general_chat_response(self, reply: Optional[str]) -> Dict:
+        """Wrap a chat reply (None: the LLM call failed) in a response dictionary"""
+        if reply is None:
+            reply = "Hello! I'm F2 Portfolio AI, your investment strategy assistant. I can help you with personalized portfolio recommendations based on your age, risk tolerance, and investment goals. I can also research investment topics and explain financial concepts. How can I assist you today?"
+        return {
+            "success": True,
+            "is_chat": True,
+            "message": reply,
+            "recommendation": None,
+            "parameters": None
+        }
     
     def _handle_research_query(self, user_query: str, chat_history: Optional[List[Dict]] = None) -> Dict:
         """
@@ -567,6 +1217,15 @@ Be helpful, educational, and encouraging."""}
         """
         logger.info("Handling research query")
         
+        try:
+            reply = self._complete(self._research_request(user_query, chat_history))
+        except Exception as e:
+            logger.error(f"Research query failed: {e}")
+            return self._research_response(None)
+        return self._research_response(reply)
+    
+    def _research_request(self, user_query: str, chat_history: Optional[List[Dict]] = None) -> Dict:
+        """Chat completion arguments for a research question"""
         messages = [
             {"role": "system", "content": """You are "F2 Portfolio AI", an investment research assistant with expertise in:
 - Stock analysis and company fundamentals
@@ -597,34 +1256,32 @@ Always include a note that this is general information, not specific investment
         
         messages.append({"role": "user", "content": user_query})
         
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=0.6,
-                max_tokens=600  # Reduced from 800 for efficiency
-            )
-            
-            reply = response.choices[0].message.content.strip()
-            
-            # Add disclaimer for research
-            reply += "\n\n💡 *Note: This is general educational information. For specific investment decisions, please consult a licensed financial advisor.*"
-            
-            return {
-                "success": True,
-                "is_research": True,
-                "message": reply,
-                "recommendation": None,
-                "parameters": None
-            }
-            
-        except Exception as e:
-            logger.error(f"Research query failed: {e}")
+        return {
+            "model": self.model,
+            "messages": messages,
+            "temperature": 0.6,
+            "max_tokens": 600  # Reduced from 800 for efficiency
+        }
+    
+    def _research_response(self, reply: Optional[str]) -> Dict:
+        """Wrap a research answer (None: the LLM call failed) in a response dictionary"""
+        if reply is None:
             return {
                 "success": False,
                 "error": "Research failed",
                 "message": "I encountered an error while researching that topic. Please try rephrasing your question."
             }
+        
+        # Add disclaimer for research
+        reply += "\n\n💡 *Note: This is general educational information. For specific investment decisions, please consult a licensed financial advisor.*"
+        
+        return {
+            "success": True,
+            "is_research": True,
+            "message": reply,
+            "recommendation": None,
+            "parameters": None
+        }
     
     def _format_sector_allocation(self, sector_allocation: Dict[str, float]) -> str:
         """Format sector allocation for display"""
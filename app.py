@@ -9,9 +9,16 @@ import plotly.express as px
 from datetime import datetime
 import logging
 
-from agent_cerebras import CerebrasPortfolioAgent
-from data_loader import get_data_loader
-from config_new import STREAMLIT_CONFIG, COLOR_SCHEME, RISK_PROFILES
+from job_queue import JobQueue
+from resources import get_shared_resources
+from monte_carlo import MonteCarloSimulator
+from backtester import WalkForwardBacktester
+from portfolio_optimizer_csv import PROFILE_OBJECTIVES
+import tracing
+from config_new import (
+    STREAMLIT_CONFIG, COLOR_SCHEME, RISK_PROFILES, ALLOCATION_COMPARE_MULTIPLES, JOB_POLL_INTERVAL_SECONDS,
+    CEREBRAS_TEMPERATURE
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -83,19 +90,61 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Initialize session state
-if 'agent' not in st.session_state:
-    st.session_state.agent = CerebrasPortfolioAgent()
-    
-if 'data_loader' not in st.session_state:
-    st.session_state.data_loader = get_data_loader()
-    
+# Loader, optimizer and agent are shared by every session in this process;
+# session state only holds the conversation and its last recommendation
+resources = get_shared_resources()
+
 if 'chat_history' not in st.session_state:
     st.session_state.chat_history = []
     
 if 'recommendation' not in st.session_state:
     st.session_state.recommendation = None
 
+# Display names of the optimizer objectives reported in response metadata
+OBJECTIVE_LABELS = {
+    "min_volatility": "Minimum Volatility",
+    "max_sharpe": "Mean-Variance (Sharpe Maximization)",
+    "efficient_return": "Efficient Return",
+    "target_return": "Minimum Volatility at Target Return",
+    "target_volatility": "Maximum Return at Target Volatility",
+    "risk_aversion": "Quadratic Utility",
+    "frontier": "Efficient Frontier (Target Volatility)",
+}
+
+
+def describe_objective(objective: str) -> str:
+    """Display name of an optimizer objective"""
+    return OBJECTIVE_LABELS.get(objective, objective.replace("_", " ").title())
+
+
+def describe_result(result: dict) -> str:
+    """One-line summary of how a recommendation was produced"""
+    metadata = result.get("metadata", {})
+    if metadata.get("explanation_source") == "llm":
+        commentary = f"Commentary: Cerebras {metadata.get('model', '')}".rstrip()
+    else:
+        commentary = "Commentary: Optimizer summary (no LLM call)"
+    objective = metadata.get("objective")
+    optimization = f"Optimization: {describe_objective(objective)}" if objective else "Optimization: Mean-Variance"
+    return f"{commentary} | {optimization}"
+
+
+def describe_generation(result: dict) -> dict:
+    """Disclaimer wording for how a recommendation's commentary was produced"""
+    metadata = result.get("metadata", {})
+    if metadata.get("explanation_source") == "llm":
+        model = f"Cerebras {metadata.get('model', '')}".rstrip()
+        return {
+            "produced": f"AI-generated using {model}",
+            "data_source": "Historical price data (2020-2025) | Cerebras fine-tuned inference",
+            "model": f"{model} | Temperature: {CEREBRAS_TEMPERATURE} | Real-time generation",
+        }
+    return {
+        "produced": "generated by the quantitative optimizer",
+        "data_source": "Historical price data (2020-2025)",
+        "model": "None (commentary summarizes the optimizer output; no LLM call)",
+    }
+
 
 def main():
     """Main application"""
@@ -135,6 +184,7 @@ def show_ai_chat():
         if st.button("🗑️ Clear Chat", use_container_width=True):
             st.session_state.chat_history = []
             st.session_state.recommendation = None
+            st.session_state.pop("chat_job", None)
             st.rerun()
     
     # Display chat messages
@@ -145,33 +195,18 @@ def show_ai_chat():
             # Show portfolio visualization if it exists in the message
             if message["role"] == "assistant" and message.get("has_portfolio"):
                 if st.session_state.recommendation:
-                    st.divider()
-                    
-                    # Compact metrics display
-                    metrics = st.session_state.recommendation["recommendation"]["metrics"]
-                    col1, col2, col3, col4 = st.columns(4)
-                    
-                    with col1:
-                        st.metric("📈 Return", f"{metrics['expected_annual_return']*100:.1f}%")
-                    with col2:
-                        st.metric("📊 Volatility", f"{metrics['annual_volatility']*100:.1f}%")
-                    with col3:
-                        st.metric("⚡ Sharpe", f"{metrics['sharpe_ratio']:.2f}")
-                    with col4:
-                        st.metric("🎯 Holdings", metrics['diversification'])
-                    
-                    # Charts in expander to save space
-                    with st.expander("📊 View Portfolio Charts", expanded=False):
-                        chart_col1, chart_col2 = st.columns(2)
-                        
-                        with chart_col1:
-                            show_allocation_chart(st.session_state.recommendation["recommendation"]["allocation"])
-                        
-                        with chart_col2:
-                            show_sector_chart(st.session_state.recommendation["recommendation"]["sector_allocation"])
+                    show_chat_portfolio_summary(st.session_state.recommendation["recommendation"])
+    
+    # A reply still being prepared in the background (survives reruns)
+    pending_job = st.session_state.get("chat_job")
+    if pending_job is not None:
+        show_pending_chat_reply(pending_job)
     
     # Chat input at the bottom
-    user_input = st.chat_input("Ask me anything... e.g., 'hi', 'research Apple stock', or 'I'm 25, moderate risk'")
+    user_input = st.chat_input(
+        "Ask me anything... e.g., 'hi', 'research Apple stock', or 'I'm 25, moderate risk'",
+        disabled=pending_job is not None
+    )
     
     if user_input:
         # Add user message to history
@@ -180,81 +215,160 @@ def show_ai_chat():
             "content": user_input
         })
         
-        # Display user message immediately
-        with st.chat_message("user", avatar="👤"):
-            st.markdown(user_input)
-        
-        # Get AI response with streaming simulation
-        with st.chat_message("assistant", avatar="🤖"):
-            message_placeholder = st.empty()
-            
-            # Show thinking indicator
-            message_placeholder.markdown("🤔 *Thinking...*")
-            
-            # Process query (only send last 10 messages for context efficiency)
-            recent_history = st.session_state.chat_history[-10:] if len(st.session_state.chat_history) > 10 else st.session_state.chat_history
-            
-            result = st.session_state.agent.process_query(
-                user_input,
-                recent_history
-            )
-            
-            # Determine response type and content
-            has_portfolio = False
-            
-            if result.get("is_chat") or result.get("is_research"):
-                # General chat or research response
-                response_text = result.get("message", "")
-                
-            elif result["success"] and result.get("recommendation"):
-                # Portfolio recommendation
-                response_text = result["recommendation"]["explanation"]
-                has_portfolio = True
-                st.session_state.recommendation = result
-                
-            else:
-                # Error
-                response_text = "❌ " + result.get("message", "I encountered an error. Please try again.")
-            
-            # Display response with simulated streaming effect
-            message_placeholder.markdown(response_text)
-            
-            # If portfolio recommendation, show metrics
-            if has_portfolio:
-                st.divider()
-                
-                metrics = result["recommendation"]["metrics"]
-                col1, col2, col3, col4 = st.columns(4)
-                
-                with col1:
-                    st.metric("📈 Return", f"{metrics['expected_annual_return']*100:.1f}%")
-                with col2:
-                    st.metric("📊 Volatility", f"{metrics['annual_volatility']*100:.1f}%")
-                with col3:
-                    st.metric("⚡ Sharpe", f"{metrics['sharpe_ratio']:.2f}")
-                with col4:
-                    st.metric("🎯 Holdings", metrics['diversification'])
-                
-                with st.expander("📊 View Portfolio Charts", expanded=False):
-                    chart_col1, chart_col2 = st.columns(2)
-                    
-                    with chart_col1:
-                        show_allocation_chart(result["recommendation"]["allocation"])
-                    
-                    with chart_col2:
-                        show_sector_chart(result["recommendation"]["sector_allocation"])
-        
-        # Add assistant response to history
-        st.session_state.chat_history.append({
-            "role": "assistant",
-            "content": response_text,
-            "has_portfolio": has_portfolio
-        })
+        # Process query in the background (only send last 10 messages for context efficiency)
+        recent_history = st.session_state.chat_history[-10:] if len(st.session_state.chat_history) > 10 else st.session_state.chat_history
+        job = resources.jobs.submit(
+            resources.agent.process_query_stream,
+            user_input,
+            list(recent_history),
+            key=JobQueue.make_key("chat", user_input, recent_history)
+        )
+        st.session_state.chat_job = job.id
         
-        # Rerun to update the chat display
+        # Rerun to show the user message and follow the job
         st.rerun()
 
 
+def show_pending_chat_reply(job_id: str):
+    """Show a background chat reply's progress, or file it in the history once finished"""
+    job = resources.jobs.get(job_id)
+    if job is None:
+        # Expired before this session came back for it
+        del st.session_state.chat_job
+        st.rerun()
+    
+    # Get AI response, streaming the LLM-written text as it arrives
+    with st.chat_message("assistant", avatar="🤖"):
+        message_placeholder = st.empty()
+        summary_container = st.container()
+        
+        result = job.result
+        has_portfolio = result is not None and result["success"] and bool(result.get("recommendation"))
+        
+        # Quantitative results are ready before the explanation starts
+        if has_portfolio:
+            with summary_container:
+                show_chat_portfolio_summary(result["recommendation"])
+        
+        # Show thinking indicator until text arrives
+        streamed = job.text()
+        message_placeholder.markdown(streamed + "▌" if streamed else "🤔 *Thinking...*")
+        
+        if not job.wait(JOB_POLL_INTERVAL_SECONDS):
+            st.rerun()
+        
+        # The finished stream has filled in the final text
+        result = job.result
+        has_portfolio = result is not None and result["success"] and bool(result.get("recommendation"))
+        if result is None or not result["success"]:
+            # Error
+            message = result.get("message") if result else None
+            response_text = "❌ " + (message or "I encountered an error. Please try again.")
+        elif has_portfolio:
+            # Portfolio recommendation
+            response_text = result["recommendation"]["explanation"]
+            st.session_state.recommendation = result
+        else:
+            # General chat or research response
+            response_text = result.get("message", "")
+        
+        message_placeholder.markdown(response_text)
+    
+    # Add assistant response to history
+    st.session_state.chat_history.append({
+        "role": "assistant",
+        "content": response_text,
+        "has_portfolio": has_portfolio
+    })
+    del st.session_state.chat_job
+    
+    # Rerun to update the chat display
+    st.rerun()
+
+
+def show_chat_portfolio_summary(recommendation: dict):
+    """Compact metrics and charts under a chat portfolio recommendation"""
+    st.divider()
+    
+    metrics = recommendation["metrics"]
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("📈 Return", f"{metrics['expected_annual_return']*100:.1f}%")
+    with col2:
+        st.metric("📊 Volatility", f"{metrics['annual_volatility']*100:.1f}%")
+    with col3:
+        st.metric("⚡ Sharpe", f"{metrics['sharpe_ratio']:.2f}")
+    with col4:
+        st.metric("🎯 Holdings", metrics['diversification'])
+    
+    # Charts in expander to save space
+    with st.expander("📊 View Portfolio Charts", expanded=False):
+        chart_col1, chart_col2 = st.columns(2)
+        
+        with chart_col1:
+            show_allocation_chart(recommendation["allocation"])
+        
+        with chart_col2:
+            show_sector_chart(recommendation["sector_allocation"])
+
+
+def quick_recommendation(params: dict, explain: bool, settings: dict):
+    """
+    Background Quick Recommend pipeline, yielding the result as each stage completes
+    
+    The recommendation (weights, metrics, commentary) comes first, then the
+    Monte Carlo projection and, if requested, the walk-forward backtest, so
+    the app can render the portfolio while the projections are computed.
+    """
+    result = resources.agent.recommend(params, explain=explain)
+    yield result
+    if not result["success"]:
+        return
+    
+    allocation = result["recommendation"]["allocation"]
+    try:
+        returns = resources.data_loader.get_returns(tickers=list(allocation.keys()))
+        simulation = MonteCarloSimulator(n_paths=5000, seed=42).simulate_bootstrap(
+            allocation, returns, settings["horizon_years"], initial_value=settings["portfolio_value"]
+        )
+        result = {**result, "monte_carlo": simulation}
+    except Exception as e:
+        logger.warning(f"Monte Carlo projection failed: {e}")
+        result = {**result, "monte_carlo_error": str(e)}
+    yield result
+    
+    if settings["run_backtest"]:
+        try:
+            backtest = WalkForwardBacktester(resources.optimizer).run(
+                risk_profile=settings["risk_profile"],
+                rebalance_frequency=settings["rebalance_frequency"],
+                horizon_years=settings["horizon_years"],
+                sector_preferences=settings["sector_preferences"] or None
+            )
+            result = {**result, "backtest": backtest}
+        except Exception as e:
+            logger.warning(f"Walk-forward backtest failed: {e}")
+            result = {**result, "backtest_error": str(e)}
+        yield result
+
+
+def pending_stages(result: dict, settings: dict) -> list:
+    """Pipeline stages a Quick Recommend job is still working on"""
+    if result is None:
+        stages = ["Calculating covariance matrices", f"Solving {describe_objective(settings['objective'])}"]
+        if settings["ai_explanation"]:
+            stages.append("Fetching Cerebras model outputs")
+        return stages
+    
+    stages = []
+    if "monte_carlo" not in result and "monte_carlo_error" not in result:
+        stages.append("Running Monte Carlo simulations")
+    if settings["run_backtest"] and "backtest" not in result and "backtest_error" not in result:
+        stages.append("Replaying walk-forward backtest")
+    return stages or ["Finishing up"]
+
+
 def show_quick_recommend():
     """Wall Street-Level Quantitative Portfolio Optimization Engine"""
     
@@ -338,7 +452,7 @@ def show_quick_recommend():
             )
         
         with adv_col2:
-            all_sectors = st.session_state.data_loader.get_sector_mapping()
+            all_sectors = resources.sector_mapping()
             unique_sectors = sorted(set(all_sectors.values()))
             
             sector_preferences = st.multiselect(
@@ -348,6 +462,17 @@ def show_quick_recommend():
             )
             
             include_etfs = st.checkbox("Include ETFs", value=False, help="Add ETF exposure (if available)")
+            ai_explanation = st.checkbox(
+                "AI-written commentary",
+                value=False,
+                help="Ask Cerebras for a personalized explanation (adds an LLM round trip)"
+            )
+            
+            run_backtest = st.checkbox(
+                "Walk-forward backtest",
+                value=False,
+                help="Replay the strategy over the price history with the selected rebalancing frequency (one solve per rebalance)"
+            )
     
     st.divider()
     
@@ -363,172 +488,270 @@ def show_quick_recommend():
         )
     
     if generate_clicked:
-        # Professional loading message
-        with st.spinner("⚙️ Executing quantitative optimization pipeline..."):
-            st.info("🔄 **Status**: Fetching Cerebras model outputs | Calculating covariance matrices | Running Monte Carlo simulations...")
+        # Structured request straight to the optimizer (no LLM extraction)
+        params = {
+            "risk_profile": risk_profile,
+            "horizon_years": horizon_years,
+            "sector_preferences": sector_preferences
+        }
+        # A moved volatility slider is answered from the cached efficient frontier
+        if target_volatility != int(profile_details['target_volatility'] * 100):
+            params["target_volatility"] = target_volatility / 100
+        
+        settings = {
+            "objective": "frontier" if "target_volatility" in params else PROFILE_OBJECTIVES[risk_profile],
+            "ai_explanation": ai_explanation,
+            "risk_profile": risk_profile,
+            "horizon_years": horizon_years,
+            "portfolio_value": portfolio_value,
+            "sector_preferences": sector_preferences,
+            "rebalance_frequency": rebalance_frequency,
+            "run_backtest": run_backtest
+        }
+        
+        # Solved and projected in the background: reruns from other widgets re-attach to the job
+        job = resources.jobs.submit(
+            quick_recommendation,
+            params,
+            ai_explanation,
+            settings,
+            key=JobQueue.make_key("quick_recommendation", params, ai_explanation, settings)
+        )
+        st.session_state.quick_job = {"id": job.id, "settings": settings}
+    
+    pending_job = st.session_state.get("quick_job")
+    if pending_job is not None:
+        job = resources.jobs.get(pending_job["id"])
+        if job is None:
+            del st.session_state.quick_job
+            st.warning("⏳ This optimization expired before it could be shown. Please generate it again.")
+            return
+        
+        # The job publishes the solve first, then the projections; show whatever is ready
+        settings = pending_job["settings"]
+        finished = job.done()
+        result = job.result
+        if finished:
+            del st.session_state.quick_job
+            if result is None:
+                result = {"success": False, "message": f"Optimization job failed: {job.error}"}
+        else:
+            # Professional loading message
+            st.info(f"🔄 **Status**: {' | '.join(pending_stages(result, settings))}...")
+        
+        if result is not None:
+            show_quick_result(result, settings)
+        
+        if not finished:
+            with st.spinner("⚙️ Executing quantitative optimization pipeline..."):
+                job.wait(JOB_POLL_INTERVAL_SECONDS)
+            st.rerun()
+
+
+def show_quick_result(result: dict, settings: dict):
+    """Render a Quick Recommend result; stages still running show a placeholder"""
+    # Results are shown for the inputs they were requested with
+    portfolio_value = settings["portfolio_value"]
+    rebalance_frequency = settings["rebalance_frequency"]
+    run_backtest = settings["run_backtest"]
+    
+    if result["success"]:
+        st.session_state.recommendation = result
+        
+        # Professional success message
+        st.success(f"✅ **Portfolio Optimization Complete** | {describe_result(result)}")
+        
+        st.divider()
+        
+        # PORTFOLIO RECOMMENDATION HEADER
+        st.markdown("## ✅ Portfolio Recommendation")
+        
+        metrics = result["recommendation"]["metrics"]
+        allocation = result["recommendation"]["allocation"]
+        sector_allocation = result["recommendation"]["sector_allocation"]
+        
+        # Professional metrics display
+        metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
+        
+        with metric_col1:
+            st.markdown(f"""
+            <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
+                        padding: 1.5rem; border-radius: 10px; text-align: center; color: white;">
+                <h3 style="margin: 0; font-size: 0.9rem;">📈 Expected Return</h3>
+                <h1 style="margin: 0.5rem 0; font-size: 2rem;">{metrics['expected_annual_return']*100:.2f}%</h1>
+                <p style="margin: 0; font-size: 0.8rem; opacity: 0.9;">Annualized</p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with metric_col2:
+            st.markdown(f"""
+            <div style="background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%); 
+                        padding: 1.5rem; border-radius: 10px; text-align: center; color: white;">
+                <h3 style="margin: 0; font-size: 0.9rem;">📊 Volatility</h3>
+                <h1 style="margin: 0.5rem 0; font-size: 2rem;">{metrics['annual_volatility']*100:.2f}%</h1>
+                <p style="margin: 0; font-size: 0.8rem; opacity: 0.9;">Annual Std Dev</p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with metric_col3:
+            st.markdown(f"""
+            <div style="background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%); 
+                        padding: 1.5rem; border-radius: 10px; text-align: center; color: white;">
+                <h3 style="margin: 0; font-size: 0.9rem;">⚡ Sharpe Ratio</h3>
+                <h1 style="margin: 0.5rem 0; font-size: 2rem;">{metrics['sharpe_ratio']:.2f}</h1>
+                <p style="margin: 0; font-size: 0.8rem; opacity: 0.9;">Risk-Adjusted</p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with metric_col4:
+            st.markdown(f"""
+            <div style="background: linear-gradient(135deg, #fa709a 0%, #fee140 100%); 
+                        padding: 1.5rem; border-radius: 10px; text-align: center; color: white;">
+                <h3 style="margin: 0; font-size: 0.9rem;">🎯 Holdings</h3>
+                <h1 style="margin: 0.5rem 0; font-size: 2rem;">{metrics['diversification']}</h1>
+                <p style="margin: 0; font-size: 0.8rem; opacity: 0.9;">Positions</p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        st.divider()
+        
+        # Monte Carlo projection over the chosen horizon (computed by the job after the solve)
+        st.markdown("### 🎲 Monte Carlo Projection")
+        if "monte_carlo" in result:
+            show_monte_carlo_chart(result["monte_carlo"])
+        elif "monte_carlo_error" in result:
+            st.warning(f"Projection unavailable: {result['monte_carlo_error']}")
+        else:
+            st.info("🎲 Running Monte Carlo simulations...")
+        
+        st.divider()
+        
+        if run_backtest:
+            st.markdown(f"### 📉 Walk-Forward Backtest ({rebalance_frequency} Rebalancing)")
+            if "backtest" in result:
+                show_backtest_chart(result["backtest"])
+            elif "backtest_error" in result:
+                st.warning(f"Backtest unavailable: {result['backtest_error']}")
+            else:
+                st.info("📉 Replaying the strategy over the price history...")
             
-            # Build professional query
-            query = f"Generate an optimal portfolio with {risk_profile} risk tolerance for a {horizon_years}-year horizon."
-            if sector_preferences:
-                query += f" Focus on {', '.join(sector_preferences)} sectors."
+            st.divider()
+        
+        # Allocations and discrete shares
+        alloc_col1, alloc_col2 = st.columns([1.5, 1])
+        
+        with alloc_col1:
+            st.markdown("### � Portfolio Allocations")
             
-            # Process with agent
-            result = st.session_state.agent.process_query(query)
+            # Calculate discrete allocation for the entered amount and the comparison sizes
+            ticket_sizes = [portfolio_value] + [portfolio_value * m for m in ALLOCATION_COMPARE_MULTIPLES]
+            ticket_allocations = resources.optimizer.discrete_allocations(
+                allocation,
+                ticket_sizes
+            )
+            discrete_alloc, leftover = ticket_allocations[0]
             
-            if result["success"]:
-                st.session_state.recommendation = result
-                
-                # Professional success message
-                st.success("✅ **Portfolio Optimization Complete** | Model: Cerebras Llama 3.3-70B | Optimization: Mean-Variance (Sharpe Maximization)")
-                
-                st.divider()
-                
-                # PORTFOLIO RECOMMENDATION HEADER
-                st.markdown("## ✅ Portfolio Recommendation")
-                
-                metrics = result["recommendation"]["metrics"]
-                allocation = result["recommendation"]["allocation"]
-                sector_allocation = result["recommendation"]["sector_allocation"]
-                
-                # Professional metrics display
-                metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
-                
-                with metric_col1:
-                    st.markdown(f"""
-                    <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-                                padding: 1.5rem; border-radius: 10px; text-align: center; color: white;">
-                        <h3 style="margin: 0; font-size: 0.9rem;">📈 Expected Return</h3>
-                        <h1 style="margin: 0.5rem 0; font-size: 2rem;">{metrics['expected_annual_return']*100:.2f}%</h1>
-                        <p style="margin: 0; font-size: 0.8rem; opacity: 0.9;">Annualized</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                with metric_col2:
-                    st.markdown(f"""
-                    <div style="background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%); 
-                                padding: 1.5rem; border-radius: 10px; text-align: center; color: white;">
-                        <h3 style="margin: 0; font-size: 0.9rem;">📊 Volatility</h3>
-                        <h1 style="margin: 0.5rem 0; font-size: 2rem;">{metrics['annual_volatility']*100:.2f}%</h1>
-                        <p style="margin: 0; font-size: 0.8rem; opacity: 0.9;">Annual Std Dev</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                with metric_col3:
-                    st.markdown(f"""
-                    <div style="background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%); 
-                                padding: 1.5rem; border-radius: 10px; text-align: center; color: white;">
-                        <h3 style="margin: 0; font-size: 0.9rem;">⚡ Sharpe Ratio</h3>
-                        <h1 style="margin: 0.5rem 0; font-size: 2rem;">{metrics['sharpe_ratio']:.2f}</h1>
-                        <p style="margin: 0; font-size: 0.8rem; opacity: 0.9;">Risk-Adjusted</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                with metric_col4:
-                    st.markdown(f"""
-                    <div style="background: linear-gradient(135deg, #fa709a 0%, #fee140 100%); 
-                                padding: 1.5rem; border-radius: 10px; text-align: center; color: white;">
-                        <h3 style="margin: 0; font-size: 0.9rem;">🎯 Holdings</h3>
-                        <h1 style="margin: 0.5rem 0; font-size: 2rem;">{metrics['diversification']}</h1>
-                        <p style="margin: 0; font-size: 0.8rem; opacity: 0.9;">Positions</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                st.divider()
+            # Build professional allocation table
+            alloc_data = []
+            for ticker in sorted(allocation.keys(), key=lambda x: allocation[x], reverse=True):
+                shares = discrete_alloc.get(ticker, 0)
+                sector = resources.sector_mapping().get(ticker, "Unknown")
                 
-                # Allocations and discrete shares
-                alloc_col1, alloc_col2 = st.columns([1.5, 1])
-                
-                with alloc_col1:
-                    st.markdown("### � Portfolio Allocations")
-                    
-                    # Calculate discrete allocation
-                    discrete_alloc, leftover = st.session_state.agent.optimizer.discrete_allocation(
-                        allocation,
-                        portfolio_value
-                    )
-                    
-                    # Build professional allocation table
-                    alloc_data = []
-                    for ticker in sorted(allocation.keys(), key=lambda x: allocation[x], reverse=True):
-                        shares = discrete_alloc.get(ticker, 0)
-                        sector = st.session_state.data_loader.get_sector_mapping().get(ticker, "Unknown")
-                        
-                        alloc_data.append({
-                            "Ticker": ticker,
-                            "Allocation": f"{allocation[ticker]*100:.1f}%",
-                            "Shares": shares,
-                            "Sector": sector,
-                            "Weight": allocation[ticker]
-                        })
-                    
-                    df_alloc = pd.DataFrame(alloc_data)
-                    
-                    # Styled dataframe
-                    st.dataframe(
-                        df_alloc[["Ticker", "Sector", "Allocation", "Shares"]],
-                        use_container_width=True,
-                        hide_index=True
-                    )
-                    
-                    st.info(f"💵 **Leftover Cash**: ${leftover:,.2f}")
-                
-                with alloc_col2:
-                    st.markdown("### 🌐 Sector Breakdown")
-                    
-                    sector_data = []
-                    for sector, weight in sorted(sector_allocation.items(), key=lambda x: x[1], reverse=True):
-                        sector_data.append({
-                            "Sector": sector,
-                            "Weight": f"{weight*100:.1f}%"
-                        })
-                    
-                    st.dataframe(
-                        pd.DataFrame(sector_data),
-                        use_container_width=True,
-                        hide_index=True
+                alloc_data.append({
+                    "Ticker": ticker,
+                    "Allocation": f"{allocation[ticker]*100:.1f}%",
+                    "Shares": shares,
+                    "Sector": sector,
+                    "Weight": allocation[ticker]
+                })
+            
+            df_alloc = pd.DataFrame(alloc_data)
+            
+            # Styled dataframe
+            st.dataframe(
+                df_alloc[["Ticker", "Sector", "Allocation", "Shares"]],
+                use_container_width=True,
+                hide_index=True
+            )
+            
+            st.info(f"💵 **Leftover Cash**: ${leftover:,.2f}")
+            
+            with st.expander("📏 Compare ticket sizes"):
+                ticket_data = [
+                    {
+                        "Amount": f"${size:,.0f}",
+                        "Positions": len(shares),
+                        "Shares": sum(shares.values()),
+                        "Leftover Cash": f"${cash:,.2f}",
+                        "Invested": f"{(size - cash) / size * 100:.2f}%"
+                    }
+                    for size, (shares, cash) in sorted(
+                        zip(ticket_sizes, ticket_allocations), key=lambda item: item[0]
                     )
-                
-                st.divider()
-                
-                # Visualizations
-                viz_col1, viz_col2 = st.columns(2)
-                
-                with viz_col1:
-                    show_allocation_chart(allocation)
-                
-                with viz_col2:
-                    show_sector_chart(sector_allocation)
-                
-                st.divider()
-                
-                # AI Commentary
-                st.markdown("### 🧩 AI-Generated Portfolio Commentary")
-                
-                st.markdown(f"""
-                <div style="background: #f8f9fa; padding: 1.5rem; border-radius: 10px; border-left: 4px solid #667eea;">
-                {result["recommendation"]["explanation"]}
-                </div>
-                """, unsafe_allow_html=True)
-                
-                st.divider()
-                
-                # Professional disclaimer
-                st.warning("""
-                ⚠️ **DISCLAIMER**: This portfolio is AI-generated using Cerebras Llama 3.3-70B for **educational and demonstration purposes only**.
-                
-                - This output does **NOT** constitute financial advice, investment recommendations, or trading signals.
-                - Past performance does not guarantee future results.
-                - All investments carry risk, including potential loss of principal.
-                - Consult a licensed financial advisor (CFA, CFP) before making investment decisions.
-                - Periodic rebalancing and risk monitoring are recommended.
-                
-                **Optimization Method**: Mean-Variance Optimization | Sharpe Ratio Maximization  
-                **Data Source**: Historical price data (2020-2025) | Cerebras fine-tuned inference  
-                **Model**: Cerebras Llama 3.3-70B | Temperature: 0.7 | Real-time generation
-                """)
-                
-            else:
-                st.error(f"❌ **Optimization Failed**: {result.get('message', 'Unknown error occurred. Please try again.')}")
+                ]
+                st.dataframe(pd.DataFrame(ticket_data), use_container_width=True, hide_index=True)
+        
+        with alloc_col2:
+            st.markdown("### 🌐 Sector Breakdown")
+            
+            sector_data = []
+            for sector, weight in sorted(sector_allocation.items(), key=lambda x: x[1], reverse=True):
+                sector_data.append({
+                    "Sector": sector,
+                    "Weight": f"{weight*100:.1f}%"
+                })
+            
+            st.dataframe(
+                pd.DataFrame(sector_data),
+                use_container_width=True,
+                hide_index=True
+            )
+        
+        st.divider()
+        
+        # Visualizations
+        viz_col1, viz_col2 = st.columns(2)
+        
+        with viz_col1:
+            show_allocation_chart(allocation)
+        
+        with viz_col2:
+            show_sector_chart(sector_allocation)
+        
+        st.divider()
+        
+        # Commentary (from the LLM or the optimizer's own summary)
+        generation = describe_generation(result)
+        if result["metadata"].get("explanation_source") == "llm":
+            st.markdown("### 🧩 AI-Generated Portfolio Commentary")
+        else:
+            st.markdown("### 🧩 Portfolio Commentary")
+        
+        st.markdown(f"""
+        <div style="background: #f8f9fa; padding: 1.5rem; border-radius: 10px; border-left: 4px solid #667eea;">
+        {result["recommendation"]["explanation"]}
+        </div>
+        """, unsafe_allow_html=True)
+        
+        st.divider()
+        
+        # Professional disclaimer
+        st.warning(f"""
+        ⚠️ **DISCLAIMER**: This portfolio is {generation["produced"]} for **educational and demonstration purposes only**.
+        
+        - This output does **NOT** constitute financial advice, investment recommendations, or trading signals.
+        - Past performance does not guarantee future results.
+        - All investments carry risk, including potential loss of principal.
+        - Consult a licensed financial advisor (CFA, CFP) before making investment decisions.
+        - Periodic rebalancing and risk monitoring are recommended.
+        
+        **Optimization Method**: {describe_objective(result["metadata"].get("objective", "max_sharpe"))}  
+        **Data Source**: {generation["data_source"]}  
+        **Model**: {generation["model"]}
+        """)
+        
+    else:
+        st.error(f"❌ **Optimization Failed**: {result.get('message', 'Unknown error occurred. Please try again.')}")
 
 
 def show_portfolio_analysis():
@@ -536,7 +759,7 @@ def show_portfolio_analysis():
     st.header("📈 Portfolio Analysis")
     
     # Portfolio overview
-    stats = st.session_state.data_loader.get_portfolio_stats()
+    stats = resources.data_loader.get_portfolio_stats()
     
     col1, col2, col3 = st.columns(3)
     
@@ -574,7 +797,7 @@ def show_portfolio_analysis():
     st.divider()
     st.subheader("📋 Stock Universe")
     
-    portfolio_df = st.session_state.data_loader.load_portfolio()
+    portfolio_df = resources.data_loader.load_portfolio()
     st.dataframe(portfolio_df, use_container_width=True)
     
     # Historical price analysis
@@ -583,14 +806,14 @@ def show_portfolio_analysis():
     
     selected_tickers = st.multiselect(
         "Select stocks to analyze",
-        options=st.session_state.data_loader.get_stock_universe(),
-        default=st.session_state.data_loader.get_stock_universe()[:5]
+        options=resources.data_loader.get_stock_universe(),
+        default=resources.data_loader.get_stock_universe()[:5]
     )
     
     if selected_tickers:
         lookback = st.slider("Lookback period (days)", 30, 365, 252)
         
-        prices = st.session_state.data_loader.get_historical_prices(
+        prices = resources.data_loader.get_historical_prices(
             tickers=selected_tickers,
             lookback_days=lookback
         )
@@ -618,7 +841,7 @@ def show_portfolio_analysis():
         st.plotly_chart(fig, use_container_width=True)
         
         # Returns statistics
-        returns = st.session_state.data_loader.get_returns(
+        returns = resources.data_loader.get_returns(
             tickers=selected_tickers,
             lookback_days=lookback
         )
@@ -639,7 +862,7 @@ def show_settings():
     
     with col1:
         st.subheader("📊 Data Status")
-        is_valid, issues = st.session_state.data_loader.validate_data()
+        is_valid, issues = resources.data_loader.validate_data()
         
         if is_valid:
             st.success("✅ All data validated")
@@ -648,7 +871,7 @@ def show_settings():
             for issue in issues:
                 st.text(f"- {issue}")
         
-        stats = st.session_state.data_loader.get_portfolio_stats()
+        stats = resources.data_loader.get_portfolio_stats()
         
         col_a, col_b, col_c = st.columns(3)
         with col_a:
@@ -668,10 +891,42 @@ def show_settings():
     
     with col2:
         st.subheader("🤖 AI Model")
-        st.metric("Model", st.session_state.agent.model)
+        st.metric("Model", resources.agent.model)
         st.metric("Provider", "Cerebras Cloud")
         st.metric("Status", "🟢 Active")
         
+        if resources.agent.extraction_cache is not None:
+            cache_stats = resources.agent.extraction_cache.stats()
+            cache_col1, cache_col2 = st.columns(2)
+            with cache_col1:
+                st.metric("Extraction Cache Hit Rate", f"{cache_stats['hit_rate']*100:.0f}%")
+            with cache_col2:
+                st.metric("Cached Extractions", cache_stats['size'])
+        
+        job_stats = resources.jobs.stats()
+        job_col1, job_col2 = st.columns(2)
+        with job_col1:
+            st.metric("Jobs In Flight", job_stats['in_flight'])
+        with job_col2:
+            st.metric("Duplicate Requests Joined", job_stats['deduplicated'])
+        
+        latency = tracing.metrics.summary()
+        if latency:
+            with st.expander("⏱️ Pipeline Stage Latency", expanded=False):
+                latency_df = pd.DataFrame([
+                    {
+                        "Request": trace_name,
+                        "Stage": stage,
+                        "Count": stats["count"],
+                        "p50 (ms)": stats["p50"] * 1000,
+                        "p95 (ms)": stats["p95"] * 1000,
+                        "p99 (ms)": stats["p99"] * 1000,
+                    }
+                    for trace_name, stages in latency.items()
+                    for stage, stats in stages.items()
+                ])
+                st.dataframe(latency_df.round(1), use_container_width=True, hide_index=True)
+        
         st.divider()
         
         st.subheader("🏗️ Architecture")
@@ -752,6 +1007,70 @@ def show_sector_chart(sector_allocation: dict):
     st.plotly_chart(fig, use_container_width=True)
 
 
+def show_monte_carlo_chart(simulation: dict):
+    """Display percentile wealth bands and risk statistics of a simulation"""
+    years = simulation["years"]
+    bands = simulation["percentile_bands"]
+    percentiles = sorted(bands)
+    
+    fig = go.Figure()
+    for low, high in zip(percentiles[:len(percentiles) // 2], percentiles[::-1]):
+        fig.add_trace(go.Scatter(x=years, y=bands[high], line=dict(width=0), showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scatter(
+            x=years, y=bands[low], fill='tonexty', line=dict(width=0),
+            fillcolor='rgba(102, 126, 234, 0.2)', name=f"P{low}–P{high}"
+        ))
+    median = percentiles[len(percentiles) // 2]
+    fig.add_trace(go.Scatter(x=years, y=bands[median], line=dict(color='#667eea', width=3), name=f"P{median}"))
+    fig.update_layout(
+        title=f"Projected Portfolio Value ({simulation['n_paths']:,} simulated paths)",
+        xaxis_title="Years",
+        yaxis_title="Portfolio Value"
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Probability of Loss", f"{simulation['probability_of_loss']*100:.1f}%")
+    with col2:
+        st.metric("Median Final Value", f"{simulation['final_value']['median']:,.0f}")
+    with col3:
+        st.metric("Median Max Drawdown", f"{simulation['max_drawdown']['percentiles'].get(50, simulation['max_drawdown']['mean'])*100:.1f}%")
+
+
+def show_backtest_chart(backtest: dict):
+    """Display a backtest's equity curve, drawdowns and summary metrics"""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=backtest["equity_curve"].index, y=backtest["equity_curve"].values,
+        name="Equity", line=dict(color='#667eea', width=2)
+    ))
+    fig.add_trace(go.Scatter(
+        x=backtest["drawdown"].index, y=backtest["equity_curve"].cummax().clip(lower=1.0).values,
+        name="Running Peak", fill='tonexty', line=dict(color='#f5576c', width=1, dash='dot'),
+        fillcolor='rgba(245, 87, 108, 0.15)'
+    ))
+    fig.update_layout(title="Growth of 1 Unit", xaxis_title="Date", yaxis_title="Value")
+    st.plotly_chart(fig, use_container_width=True)
+    
+    metrics = backtest["metrics"]
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Annualized Return", f"{metrics['annualized_return']*100:.2f}%")
+    with col2:
+        st.metric("Realized Sharpe", f"{metrics['sharpe_ratio']:.2f}")
+    with col3:
+        st.metric("Max Drawdown", f"{metrics['max_drawdown']*100:.1f}%")
+    with col4:
+        st.metric("Annual Turnover", f"{metrics['annual_turnover']*100:.0f}%")
+    
+    if backtest.get("unpriced_tickers"):
+        st.caption(
+            f"Left out of the backtest (never priced over a full estimation window): "
+            f"{', '.join(backtest['unpriced_tickers'])}"
+        )
+
+
 def show_metrics_cards(metrics: dict):
     """Display performance metrics"""
     st.markdown("### 📊 Performance Metrics")
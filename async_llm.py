@@ -0,0 +1,89 @@
+"""
+Async LLM Helpers for F2 Portfolio Recommender
+Per-event-loop resources and a concurrency/rate throttle for async Cerebras calls
+"""
+import asyncio
+import threading
+import time
+import weakref
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LoopLocal(Generic[T]):
+    """
+    Lazily creates one object per running event loop
+
+    asyncio primitives and async HTTP clients belong to the loop they were
+    first used on; Streamlit sessions and asyncio.run() calls each get their
+    own loop, so such objects are kept per loop and dropped with it.
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._instances: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, T]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self) -> T:
+        """Instance for the current running loop (created on first use)"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            instance = self._instances.get(loop)
+            if instance is None:
+                instance = self._factory()
+                self._instances[loop] = instance
+            return instance
+
+
+class AsyncThrottle:
+    """
+    Async context manager bounding in-flight requests and their start rate
+
+    Concurrency is bounded per event loop; the rate limit is shared by every
+    loop and thread in the process, since it protects the remote API quota.
+
+    Usage:
+        async with throttle:
+            response = await client.chat.completions.create(...)
+    """
+
+    def __init__(self, max_concurrency: int, requests_per_second: Optional[float] = None):
+        """
+        Initialize throttle
+
+        Args:
+            max_concurrency: Maximum requests in flight per event loop
+            requests_per_second: Maximum request starts per second (None: unlimited)
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.requests_per_second = requests_per_second
+        self._interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._semaphores: LoopLocal[asyncio.Semaphore] = LoopLocal(
+            lambda: asyncio.Semaphore(self.max_concurrency)
+        )
+        self._next_slot = 0.0
+        self._slot_lock = threading.Lock()
+
+    def _reserve_slot(self) -> float:
+        """Claim the next start time and return how long to wait for it"""
+        with self._slot_lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+            return slot - now
+
+    async def __aenter__(self) -> "AsyncThrottle":
+        semaphore = self._semaphores.get()
+        await semaphore.acquire()
+        try:
+            delay = self._reserve_slot()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        except BaseException:
+            semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._semaphores.get().release()
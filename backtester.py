@@ -0,0 +1,262 @@
+"""
+Walk-Forward Backtester for F2 Portfolio Recommender
+Re-optimizes on a rolling window at each rebalance date and holds the weights until the next
+"""
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config_new import FACTOR_PCA_COMPONENTS, LOOKBACK_PERIOD_DAYS, RISK_FREE_RATE
+from factor_model import FactorCovariance
+from frontier_cache import FrontierCache
+from optimization_session import SessionCache
+from portfolio_optimizer_csv import CSVPortfolioOptimizer
+from rolling_estimator import RollingCovariance, TRADING_DAYS_PER_YEAR
+
+logger = logging.getLogger(__name__)
+
+# Months between rebalances for the UI's rebalancing options
+REBALANCE_MONTHS = {
+    "Monthly": 1,
+    "Quarterly": 3,
+    "Semi-Annual": 6,
+    "Annual": 12,
+}
+
+
+class WalkForwardBacktester:
+    """
+    Walk-forward simulation of a CSVPortfolioOptimizer strategy
+
+    One RollingCovariance slides over the whole history, so each rebalance
+    reads (mu, S) for its window in O(n^2) instead of re-estimating from the
+    window's prices. Under a 'sector' or 'pca' covariance model (or 'auto'
+    at factor-model size) S is instead the optimizer's factor model, fitted
+    to the window's prices. Each rebalance picks from the tickers priced over
+    its whole window, so names listed partway through join once they have a
+    full window of history. Between rebalances the drifting holdings are valued with
+    one cumulative-product and matrix-vector product per holding period.
+
+    Every rebalance brings new estimates, so nothing a solve caches is reused
+    by the next one: the strategy is replayed on a private optimizer over the
+    same loader, leaving the given optimizer's (possibly shared) frontier and
+    session caches untouched.
+    """
+
+    def __init__(
+        self,
+        optimizer: CSVPortfolioOptimizer,
+        window: int = LOOKBACK_PERIOD_DAYS,
+        transaction_cost: float = 0.0
+    ):
+        """
+        Initialize backtester
+
+        Args:
+            optimizer: Optimizer whose strategy (loader, covariance model) is replayed
+            window: Trading days of returns used for each estimate
+            transaction_cost: Cost per unit of traded weight (e.g. 0.001 = 10 bps)
+        """
+        self.optimizer = CSVPortfolioOptimizer(
+            optimizer.data_loader,
+            frontier_cache=FrontierCache(maxsize=1),
+            covariance_model=optimizer.covariance_model,
+            session_cache=SessionCache(maxsize=1)
+        )
+        self.window = window
+        self.transaction_cost = transaction_cost
+
+    @staticmethod
+    def rebalance_positions(dates: pd.DatetimeIndex, frequency: str) -> np.ndarray:
+        """
+        Row positions of the last trading day of each rebalancing period
+
+        Args:
+            dates: Trading dates
+            frequency: One of REBALANCE_MONTHS
+
+        Returns:
+            Sorted row positions
+        """
+        if frequency not in REBALANCE_MONTHS:
+            raise ValueError(f"Invalid rebalance frequency: {frequency}. Choose from {list(REBALANCE_MONTHS)}")
+        months = REBALANCE_MONTHS[frequency]
+        period = (dates.year.to_numpy() * 12 + dates.month.to_numpy() - 1) // months
+        return np.flatnonzero(period[1:] != period[:-1])
+
+    def run(
+        self,
+        risk_profile: str,
+        rebalance_frequency: str = "Quarterly",
+        horizon_years: int = 5,
+        sector_preferences: Optional[List[str]] = None,
+        exclude_tickers: Optional[List[str]] = None,
+        start_date: Optional[pd.Timestamp] = None,
+        end_date: Optional[pd.Timestamp] = None
+    ) -> Dict:
+        """
+        Replay the strategy over the price history
+
+        Args:
+            risk_profile: 'low', 'medium', or 'high'
+            rebalance_frequency: 'Monthly', 'Quarterly', 'Semi-Annual' or 'Annual'
+            horizon_years: Passed through to the optimizer
+            sector_preferences: Preferred sectors (optional)
+            exclude_tickers: Tickers to exclude (optional)
+            start_date: First date of price history to use (optional)
+            end_date: Last date of price history to use (optional)
+
+        Returns:
+            Dictionary with equity curve, daily returns, rebalance log and
+            metrics; 'unpriced_tickers' lists the tickers never priced over a
+            full window (each rebalance lists those it had to leave out)
+        """
+        universe = self.optimizer._select_universe(sector_preferences, exclude_tickers)
+        prices = self.optimizer.data_loader.get_historical_prices(
+            tickers=universe, start_date=start_date, end_date=end_date
+        )
+        # Gaps are carried forward; a ticker listed partway through has no
+        # returns before its first price and only joins windows after it
+        prices = prices.ffill().dropna(axis=1, how="all")
+        tickers = prices.columns.tolist()
+
+        returns = prices.pct_change().iloc[1:]
+        values = returns.to_numpy()
+        dates = returns.index
+        if len(values) <= self.window:
+            raise ValueError(
+                f"Not enough history for a {self.window}-day window ({len(values)} daily returns)"
+            )
+        # First row each ticker has a return; unpriced days count as 0 for holdings they are never in
+        has_return = ~np.isnan(values)
+        first_valid = np.where(has_return.any(axis=0), np.argmax(has_return, axis=0), len(values))
+        values = np.nan_to_num(values, nan=0.0)
+
+        positions = self.rebalance_positions(dates, rebalance_frequency)
+        positions = np.union1d([self.window - 1], positions[positions >= self.window - 1])
+        positions = positions[positions < len(values) - 1]
+
+        model = self.optimizer._resolve_covariance_model(len(tickers))
+        logger.info(
+            f"Backtesting {risk_profile} risk, {rebalance_frequency} rebalancing: "
+            f"{len(tickers)} tickers, {len(positions)} rebalances, {model} covariance"
+        )
+
+        engine = RollingCovariance(tickers, window=self.window)
+        portfolio_returns = np.zeros(len(values))
+        weights = np.zeros(len(tickers))
+        drifted = np.zeros(len(tickers))
+        rebalances = []
+        failures = 0
+        pushed = 0
+
+        for k, position in enumerate(positions):
+            # Slide the window up to and including the rebalance day
+            for row in values[pushed:position + 1]:
+                engine.push_returns(row)
+            pushed = position + 1
+
+            # Universe of the window: tickers priced over all of it
+            priced = first_valid <= position - self.window + 1
+            window_tickers = [t for t, ok in zip(tickers, priced) if ok]
+            unpriced = [t for t, ok in zip(tickers, priced) if not ok]
+
+            try:
+                mu, S = engine.estimates()
+                mu = mu[window_tickers]
+                if model == "sample":
+                    S = S.loc[window_tickers, window_tickers]
+                else:
+                    S = self._factor_covariance(
+                        model, prices.iloc[position - self.window + 1:position + 2][window_tickers]
+                    )
+                result = self.optimizer.optimize_portfolio(
+                    risk_profile=risk_profile,
+                    horizon_years=horizon_years,
+                    sector_preferences=sector_preferences,
+                    exclude_tickers=exclude_tickers,
+                    estimates=(mu, S)
+                )
+                target = np.array([result["weights"].get(t, 0.0) for t in tickers])
+                target /= target.sum()
+            except Exception as e:
+                failures += 1
+                logger.warning(f"Rebalance on {dates[position].date()} failed, keeping weights: {e}")
+                target = drifted if drifted.any() else None
+
+            if target is not None:
+                traded = float(np.abs(target - drifted).sum())
+                weights = target
+                rebalances.append({
+                    "date": dates[position],
+                    "turnover": traded / 2,
+                    "weights": dict(zip(tickers, weights.round(4).tolist())),
+                    "unpriced_tickers": unpriced
+                })
+            else:
+                traded = 0.0
+
+            # Hold until the next rebalance (or the end of the data)
+            stop = positions[k + 1] + 1 if k + 1 < len(positions) else len(values)
+            segment = values[position + 1:stop]
+            if not weights.any():
+                continue
+            growth = np.cumprod(1.0 + segment, axis=0)
+            wealth = growth @ weights
+            portfolio_returns[position + 1:stop] = np.diff(wealth, prepend=1.0) / np.concatenate(([1.0], wealth[:-1]))
+            portfolio_returns[position + 1] -= self.transaction_cost * traded * (1.0 + portfolio_returns[position + 1])
+            drifted = weights * growth[-1] / wealth[-1]
+
+        # Tickers that never had a full window of prices to be picked from
+        never_priced = [t for t, row in zip(tickers, first_valid) if row > positions[-1] - self.window + 1]
+        if never_priced:
+            logger.info(f"Backtest left out {len(never_priced)} tickers without a full window: {never_priced}")
+
+        start = positions[0] + 1
+        daily = pd.Series(portfolio_returns[start:], index=dates[start:], name="portfolio_return")
+        equity = (1.0 + daily).cumprod().rename("equity")
+
+        return {
+            "equity_curve": equity,
+            "daily_returns": daily,
+            "drawdown": (equity / equity.cummax().clip(lower=1.0) - 1.0).rename("drawdown"),
+            "rebalances": rebalances,
+            "metrics": self._metrics(daily, equity, rebalances, failures),
+            "tickers": tickers,
+            "unpriced_tickers": never_priced,
+            "covariance_model": model,
+            "rebalance_frequency": rebalance_frequency,
+            "risk_profile": risk_profile
+        }
+
+    def _factor_covariance(self, model: str, prices: pd.DataFrame) -> FactorCovariance:
+        """The optimizer's factor covariance for one window of prices"""
+        if model == "sector":
+            return FactorCovariance.from_sectors(prices, self.optimizer.sector_mapping, TRADING_DAYS_PER_YEAR)
+        return FactorCovariance.from_pca(prices, FACTOR_PCA_COMPONENTS, TRADING_DAYS_PER_YEAR)
+
+    @staticmethod
+    def _metrics(daily: pd.Series, equity: pd.Series, rebalances: List[Dict], failures: int) -> Dict:
+        """Summary statistics of a backtest"""
+        years = len(daily) / TRADING_DAYS_PER_YEAR
+        total_return = float(equity.iloc[-1] - 1.0)
+        annual_return = (1.0 + total_return) ** (1.0 / years) - 1.0 if years > 0 else 0.0
+        annual_volatility = float(daily.std() * np.sqrt(TRADING_DAYS_PER_YEAR))
+        sharpe = (annual_return - RISK_FREE_RATE) / annual_volatility if annual_volatility > 0 else 0.0
+        drawdown = equity / equity.cummax().clip(lower=1.0) - 1.0
+        # The first allocation is a purchase, not turnover
+        turnovers = [r["turnover"] for r in rebalances[1:]]
+
+        return {
+            "total_return": round(total_return, 4),
+            "annualized_return": round(annual_return, 4),
+            "annualized_volatility": round(annual_volatility, 4),
+            "sharpe_ratio": round(sharpe, 4),
+            "max_drawdown": round(float(-drawdown.min()), 4),
+            "average_turnover": round(float(np.mean(turnovers)), 4) if turnovers else 0.0,
+            "annual_turnover": round(float(np.sum(turnovers) / years), 4) if years > 0 else 0.0,
+            "rebalances": len(rebalances),
+            "failed_rebalances": failures
+        }
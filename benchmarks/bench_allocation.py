@@ -0,0 +1,84 @@
+"""
+Benchmark: discrete share allocation for many holdings and portfolio values
+
+Compares the previous path (full price history per call, pypfopt's
+get_latest_prices and one DiscreteAllocation.greedy_portfolio per amount)
+with the loader's latest-price index and one vectorized greedy_allocation
+call for all amounts. Both produce the same shares.
+
+Usage:
+    python benchmarks/bench_allocation.py [--tickers 27 300 1000] [--values 10]
+"""
+import argparse
+import json
+import logging
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from synthetic_data import write_dataset  # noqa: E402
+
+
+def timed(fn, repeat: int) -> float:
+    """Median seconds per call of fn()"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, nargs="+", default=[27, 300, 1000])
+    parser.add_argument("--values", type=int, default=10, help="Portfolio values allocated per call")
+    parser.add_argument("--days", type=int, default=1260)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    import numpy as np
+    from pypfopt.discrete_allocation import DiscreteAllocation, get_latest_prices
+    from data_loader import PortfolioDataLoader
+    from share_allocation import greedy_allocation
+
+    logging.disable(logging.WARNING)
+    warnings.simplefilter("ignore")
+    values = [float(v) for v in np.geomspace(10_000, 10_000_000, args.values)]
+    results = {}
+    for n_tickers in args.tickers:
+        with tempfile.TemporaryDirectory() as tmp:
+            loader = PortfolioDataLoader(*write_dataset(Path(tmp), n_tickers=n_tickers, n_days=args.days))
+            tickers = loader.get_stock_universe()
+            weights = dict(zip(tickers, np.random.default_rng(0).dirichlet(np.ones(len(tickers))).round(5).tolist()))
+            loader.get_historical_prices()
+            loader.get_latest_prices()
+
+            def previous():
+                latest_prices = get_latest_prices(loader.get_historical_prices(tickers=tickers))
+                return [
+                    DiscreteAllocation(weights, latest_prices, total_portfolio_value=v).greedy_portfolio()
+                    for v in values
+                ]
+
+            def vectorized():
+                return greedy_allocation(weights, loader.get_latest_prices(tickers), values)
+
+            assert [a for a, _ in previous()] == [a for a, _ in vectorized()]
+            results[n_tickers] = {"previous": timed(previous, args.repeat), "vectorized": timed(vectorized, args.repeat)}
+
+    print(f"{'tickers':>8}{'previous (ms)':>16}{'vectorized (ms)':>18}{'speed-up':>10}")
+    for n_tickers, stats in results.items():
+        stats["speedup"] = stats["previous"] / stats["vectorized"]
+        print(f"{n_tickers:>8}{stats['previous'] * 1e3:>16.1f}{stats['vectorized'] * 1e3:>18.1f}{stats['speedup']:>9.1f}x")
+    print(json.dumps({"values": args.values, "days": args.days, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
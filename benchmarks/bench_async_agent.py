@@ -0,0 +1,102 @@
+"""
+Benchmark: agent query throughput, sequential vs. concurrent LLM calls
+
+Runs the same portfolio queries through CerebrasPortfolioAgent.process_query
+one at a time and through process_queries (async client, bounded
+concurrency) against the local stub API with a fixed per-completion latency,
+and reports queries/sec for both. The extraction cache is disabled so every
+query makes its two LLM calls.
+
+Usage:
+    python benchmarks/bench_async_agent.py [--queries 16] [--latency 0.5] [--concurrency 8]
+"""
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from synthetic_data import write_dataset  # noqa: E402
+
+PROFILES = ["low", "medium"]
+
+
+def make_queries(n: int):
+    return [f"Build me a {PROFILES[i % 2]} risk portfolio for {3 + i % 15} years" for i in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds per stub completion")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=None, help="Request starts per second (default: unlimited)")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    from agent_cerebras import CerebrasPortfolioAgent
+    from cerebras_stub import StubCerebrasServer
+    from data_loader import PortfolioDataLoader
+    from portfolio_optimizer_csv import CSVPortfolioOptimizer
+
+    queries = make_queries(args.queries)
+    with tempfile.TemporaryDirectory() as tmp, StubCerebrasServer(latency=args.latency) as server:
+        portfolio_csv, prices_csv = write_dataset(Path(tmp))
+        agent = CerebrasPortfolioAgent(
+            api_key="bench",
+            optimizer=CSVPortfolioOptimizer(PortfolioDataLoader(portfolio_csv, prices_csv)),
+            base_url=server.base_url,
+            max_concurrency=args.concurrency,
+            requests_per_second=args.rate
+        )
+        agent.extraction_cache = None
+        agent.optimizer.data_loader.get_price_matrix()
+
+        start = time.perf_counter()
+        sequential = [agent.process_query(query) for query in queries]
+        sequential_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        concurrent = agent.process_queries(queries)
+        concurrent_seconds = time.perf_counter() - start
+        max_in_flight = server.max_in_flight
+
+    results = {
+        "queries": len(queries),
+        "latency": args.latency,
+        "concurrency": args.concurrency,
+        "sequential": {
+            "seconds": sequential_seconds,
+            "queries_per_second": len(queries) / sequential_seconds,
+            "succeeded": sum(r["success"] for r in sequential),
+        },
+        "concurrent": {
+            "seconds": concurrent_seconds,
+            "queries_per_second": len(queries) / concurrent_seconds,
+            "succeeded": sum(r["success"] for r in concurrent),
+            "max_in_flight": max_in_flight,
+        },
+        "speedup": sequential_seconds / concurrent_seconds,
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{len(queries)} queries, {args.latency}s per completion, concurrency {args.concurrency}")
+    print(f"{'mode':<12}{'seconds':>10}{'queries/s':>12}{'ok':>6}")
+    for label in ("sequential", "concurrent"):
+        r = results[label]
+        print(f"{label:<12}{r['seconds']:>10.2f}{r['queries_per_second']:>12.2f}{r['succeeded']:>6}")
+    print(f"speed-up: {results['speedup']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark: walk-forward backtest throughput in rebalances per second
+
+Compares WalkForwardBacktester (rolling covariance reused across
+overlapping windows, vectorized holding-period P&L) with a naive replay
+that re-estimates (mu, S) from each window's prices and values the
+portfolio day by day.
+
+Usage:
+    python benchmarks/bench_backtest.py [--frequency Monthly] [--risk-profile medium]
+"""
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from synthetic_data import write_dataset  # noqa: E402
+
+
+def naive_backtest(optimizer, risk_profile: str, frequency: str, window: int) -> int:
+    """Reference replay: full re-estimation per rebalance and a Python loop over days"""
+    import numpy as np
+    from pypfopt import expected_returns, risk_models
+    from backtester import WalkForwardBacktester
+
+    prices = optimizer.data_loader.get_historical_prices().ffill().dropna(axis=1)
+    returns = prices.pct_change().iloc[1:]
+    positions = WalkForwardBacktester.rebalance_positions(returns.index, frequency)
+    positions = [p for p in positions if p >= window - 1]
+
+    weights = np.zeros(prices.shape[1])
+    rebalance_at = set(positions)
+    for day, row in enumerate(returns.to_numpy()):
+        if day in rebalance_at:
+            window_prices = prices.iloc[day + 2 - window - 1:day + 2]
+            mu = expected_returns.mean_historical_return(window_prices)
+            S = risk_models.sample_cov(window_prices)
+            try:
+                result = optimizer.optimize_portfolio(risk_profile, 5, estimates=(mu, S))
+                weights = np.array([result["weights"].get(t, 0.0) for t in prices.columns])
+            except Exception:
+                pass
+        daily = float(weights @ row)
+        if weights.any():
+            weights = weights * (1 + row) / (1 + daily)
+    return len(positions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frequency", default="Monthly")
+    parser.add_argument("--risk-profile", default="medium")
+    parser.add_argument("--window", type=int, default=252)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    from backtester import WalkForwardBacktester
+    from data_loader import PortfolioDataLoader
+    from portfolio_optimizer_csv import CSVPortfolioOptimizer
+
+    with tempfile.TemporaryDirectory() as tmp:
+        portfolio_csv, prices_csv = write_dataset(Path(tmp))
+        optimizer = CSVPortfolioOptimizer(PortfolioDataLoader(portfolio_csv, prices_csv))
+        optimizer.data_loader.get_price_matrix()
+
+        backtester = WalkForwardBacktester(optimizer, window=args.window)
+        start = time.perf_counter()
+        result = backtester.run(args.risk_profile, args.frequency)
+        engine_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        naive_rebalances = naive_backtest(optimizer, args.risk_profile, args.frequency, args.window)
+        naive_seconds = time.perf_counter() - start
+
+    rebalances = result["metrics"]["rebalances"]
+    results = {
+        "frequency": args.frequency,
+        "risk_profile": args.risk_profile,
+        "walk_forward": {
+            "rebalances": rebalances,
+            "seconds": engine_seconds,
+            "rebalances_per_second": rebalances / engine_seconds,
+        },
+        "naive": {
+            "rebalances": naive_rebalances,
+            "seconds": naive_seconds,
+            "rebalances_per_second": naive_rebalances / naive_seconds,
+        },
+        "metrics": result["metrics"],
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{args.frequency} rebalancing, {args.risk_profile} risk, {args.window}-day window")
+    print(f"{'engine':<14}{'rebalances':>12}{'seconds':>10}{'rebal/s':>10}")
+    for label in ("walk_forward", "naive"):
+        r = results[label]
+        print(f"{label:<14}{r['rebalances']:>12}{r['seconds']:>10.2f}{r['rebalances_per_second']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark: PII and malicious-intent scanning of bulk text
+
+Builds synthetic chat transcripts (portfolio questions with occasional
+phone numbers, card numbers, PAN/passport ids and keywords) of several
+sizes and compares the previous per-pattern scan (one findall per PII
+pattern, a lowercase copy and substring test per keyword list) with the
+single-pass TextScanner behind GuardrailSystem. Both report the same
+findings; throughput is in MB of text per second.
+
+Usage:
+    python benchmarks/bench_guardrails.py [--sizes 10000 1000000 10000000] [--repeat 5]
+"""
+import argparse
+import json
+import logging
+import random
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+LINES = [
+    "I'm 35 and want a moderate risk portfolio for 15 years",
+    "Conservative allocation for retirement in 5 years, avoid tobacco stocks",
+    "What sectors should a 25 year old focus on for long-term growth?",
+    "Assistant: For a 10-year horizon we suggest 60% equities across IT, Banking and FMCG.",
+    "Can you rebalance towards large caps? I hold INFY, TCS and HDFCBANK today.",
+    "Returns were 12.4% last year, volatility 18.2%, Sharpe ratio 0.71",
+]
+SENSITIVE = [
+    "call me at 555-123-4567",
+    "my card is 4111 1111 1111 1111",
+    "PAN ABCDE1234F",
+    "my passport is in the drawer",
+    "can you bypass the risk checks",
+]
+
+
+def transcript(size: int, seed: int = 0) -> str:
+    """Synthetic chat transcript of about size characters, roughly 1 line in 20 sensitive"""
+    rng = random.Random(seed)
+    lines, length = [], 0
+    while length < size:
+        line = rng.choice(LINES)
+        if rng.random() < 0.05:
+            line = f"{line}, {rng.choice(SENSITIVE)}"
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)[:size]
+
+
+def legacy_scan(text: str, patterns, pii_keywords, malicious_keywords):
+    """The scan GuardrailSystem.validate_input ran before the shared scanner"""
+    detected = []
+    for pattern in patterns:
+        detected.extend(f"PII Pattern: {m[:4]}***" for m in pattern.findall(text))
+    text_lower = text.lower()
+    detected.extend(f"PII Keyword: {k}" for k in pii_keywords if k in text_lower)
+    malicious = any(k in text.lower() for k in malicious_keywords)
+    return detected, malicious
+
+
+def median_seconds(fn, repeat: int) -> float:
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000],
+                        help="Transcript sizes in characters")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    from config_new import PII_PATTERNS
+    from guardrails import MALICIOUS_KEYWORDS, PII_KEYWORDS, GuardrailSystem
+
+    logging.disable(logging.WARNING)
+    guardrail = GuardrailSystem()
+    patterns = [re.compile(p) for p in PII_PATTERNS]
+
+    def scanner_scan(text):
+        matches = guardrail.scanner.scan(text)
+        return guardrail.detect_pii(text, matches)[1], any(m["category"] == "MALICIOUS" for m in matches)
+
+    results = {}
+    print(f"{'size':>12}{'findings':>10}{'legacy MB/s':>14}{'scanner MB/s':>14}{'speedup':>9}")
+    for size in args.sizes:
+        text = transcript(size)
+        expected = legacy_scan(text, patterns, PII_KEYWORDS, MALICIOUS_KEYWORDS)
+        assert scanner_scan(text) == expected, "scanner findings differ from the per-pattern scan"
+
+        legacy = median_seconds(lambda: legacy_scan(text, patterns, PII_KEYWORDS, MALICIOUS_KEYWORDS), args.repeat)
+        scanner = median_seconds(lambda: scanner_scan(text), args.repeat)
+        results[str(size)] = {
+            "findings": len(expected[0]),
+            "legacy_seconds": legacy,
+            "scanner_seconds": scanner,
+            "legacy_mb_per_second": len(text) / legacy / 1e6,
+            "scanner_mb_per_second": len(text) / scanner / 1e6,
+            "speedup": legacy / scanner,
+        }
+        r = results[str(size)]
+        print(f"{size:>12}{r['findings']:>10}{r['legacy_mb_per_second']:>14.1f}"
+              f"{r['scanner_mb_per_second']:>14.1f}{r['speedup']:>8.2f}x")
+    print(json.dumps({"repeat": args.repeat, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark: cold PortfolioDataLoader.load_prices via CSV parse vs. binary price store
+
+Each measurement runs in a fresh interpreter so it reflects a real process
+start (no warm pandas caches). Reports wall time of load_prices() and the
+peak memory it allocates (tracemalloc, which also tracks NumPy buffers)
+alongside the process peak RSS.
+
+Usage:
+    python benchmarks/bench_load_prices.py [--prices-csv PATH] [--repeat 5]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from synthetic_data import write_dataset  # noqa: E402
+
+CHILD_SCRIPT = """
+import json, resource, sys, time, tracemalloc
+sys.path.insert(0, {root!r})
+from pathlib import Path
+from data_loader import PortfolioDataLoader
+
+loader = PortfolioDataLoader(Path({portfolio!r}), Path({prices!r}), use_store={use_store})
+tracemalloc.start()
+start = time.perf_counter()
+df = loader.load_prices()
+elapsed = time.perf_counter() - start
+_, traced_peak = tracemalloc.get_traced_memory()
+tracemalloc.stop()
+print(json.dumps({{"seconds": elapsed, "rows": len(df), "traced_peak_kb": traced_peak / 1024,
+                  "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}}))
+"""
+
+
+def run_child(prices_csv: Path, use_store: bool) -> dict:
+    script = CHILD_SCRIPT.format(
+        root=str(PROJECT_ROOT),
+        portfolio=str(prices_csv.parent / "Portfolio.csv"),
+        prices=str(prices_csv),
+        use_store=use_store,
+    )
+    out = subprocess.run([sys.executable, "-c", script], check=True, capture_output=True, text=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prices-csv", type=Path, default=None,
+                        help="Prices CSV to benchmark (default: synthetic 27 tickers x ~5 years)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        prices_csv = args.prices_csv
+        if prices_csv is None:
+            _, prices_csv = write_dataset(Path(tmp))
+
+        # Build the store once up front; cold runs then only pay the load
+        run_child(prices_csv, use_store=True)
+
+        results = {}
+        for label, use_store in (("csv", False), ("store", True)):
+            runs = [run_child(prices_csv, use_store) for _ in range(args.repeat)]
+            results[label] = {
+                "rows": runs[0]["rows"],
+                "median_seconds": statistics.median(r["seconds"] for r in runs),
+                "median_traced_peak_kb": statistics.median(r["traced_peak_kb"] for r in runs),
+                "median_peak_rss_kb": statistics.median(r["peak_rss_kb"] for r in runs),
+            }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"Cold load_prices() on {results['csv']['rows']:,} rows (median of {args.repeat} fresh processes)")
+    print(f"{'path':<8}{'time (ms)':>12}{'alloc peak (MB)':>18}{'peak RSS (MB)':>16}")
+    for label, r in results.items():
+        print(f"{label:<8}{r['median_seconds'] * 1000:>12.1f}"
+              f"{r['median_traced_peak_kb'] / 1024:>18.1f}{r['median_peak_rss_kb'] / 1024:>16.1f}")
+    speedup = results["csv"]["median_seconds"] / max(results["store"]["median_seconds"], 1e-9)
+    print(f"Speed-up: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
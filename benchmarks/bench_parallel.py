@@ -0,0 +1,87 @@
+"""
+Benchmark: batch optimization throughput vs. number of worker processes
+
+Scores a batch of client profiles with distinct universes (one excluded
+ticker each, so no two requests share an estimate) through
+ParallelOptimizer at increasing worker counts and reports requests/sec
+and speed-up over one worker. Pool start-up is excluded from the timing.
+
+Usage:
+    python benchmarks/bench_parallel.py [--requests 256] [--workers 1 2 4 8]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from synthetic_data import write_dataset  # noqa: E402
+
+
+def make_requests(tickers, n_requests: int):
+    profiles = ["low", "medium"]
+    return [
+        {
+            "risk_profile": profiles[i % len(profiles)],
+            "horizon_years": 3 + i % 8,
+            "exclude_tickers": [tickers[i % len(tickers)], tickers[(i // len(tickers)) % len(tickers)]],
+        }
+        for i in range(n_requests)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=256)
+    parser.add_argument("--workers", type=int, nargs="+", default=None,
+                        help="Worker counts to measure (default: powers of two up to the CPU count)")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    from parallel_optimizer import ParallelOptimizer
+
+    cpus = os.cpu_count() or 1
+    workers = args.workers or sorted({min(2 ** k, cpus) for k in range(cpus.bit_length() + 1)})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        portfolio_csv, prices_csv = write_dataset(Path(tmp))
+
+        import pandas as pd
+        tickers = sorted(pd.read_csv(portfolio_csv)["Ticker"])
+        requests = make_requests(tickers, args.requests)
+
+        results = {}
+        for n_workers in workers:
+            with ParallelOptimizer(portfolio_csv, prices_csv, max_workers=n_workers, chunk_size=4) as pool:
+                pool.optimize_many(requests[:n_workers])  # warm every worker
+                start = time.perf_counter()
+                out = pool.optimize_many(requests)
+                elapsed = time.perf_counter() - start
+            results[n_workers] = {
+                "seconds": elapsed,
+                "requests_per_second": len(requests) / elapsed,
+                "errors": sum("error" in r for r in out),
+            }
+
+    base = results[workers[0]]["requests_per_second"]
+    for r in results.values():
+        r["speedup"] = r["requests_per_second"] / base
+
+    if args.json:
+        print(json.dumps({"cpus": cpus, "requests": args.requests, "results": results}, indent=2))
+        return
+
+    print(f"{args.requests} optimization requests on {cpus} CPUs")
+    print(f"{'workers':>8}{'seconds':>10}{'req/s':>10}{'speed-up':>10}")
+    for n_workers, r in results.items():
+        print(f"{n_workers:>8}{r['seconds']:>10.2f}{r['requests_per_second']:>10.1f}{r['speedup']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
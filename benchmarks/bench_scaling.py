@@ -0,0 +1,139 @@
+"""
+Benchmark: loader and optimizer scaling with universe size
+
+Generates a synthetic universe per size (synthetic_data.py) and times each
+stage of the pipeline on it:
+
+    write         streaming CSV generation
+    load_prices   CSV parse (price store disabled)
+    pivot         long prices -> Date x Ticker matrix
+    sample_cov    mean historical return + sample covariance over the lookback
+    factor_cov    sector factor model (FactorCovariance.from_sectors) over the lookback
+    solve         medium-risk max Sharpe with sector constraints
+
+Once the universe outgrows the lookback window the sample covariance is
+rank deficient (smallest eigenvalue ~0) and the dense solve starts
+failing; the table reports both, along with the memory of each covariance.
+
+Usage:
+    python benchmarks/bench_scaling.py [--tickers 27 100 500 1000] [--years 5] [--max-solve-tickers 500]
+    python benchmarks/bench_scaling.py --tickers 1000 3000 5000 --covariance-model sector --max-solve-tickers 5000
+"""
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from synthetic_data import TRADING_DAYS_PER_YEAR, write_dataset  # noqa: E402
+
+
+def timed(fn):
+    start = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - start
+
+
+def run_size(
+    directory: Path, n_tickers: int, n_sectors: int, n_days: int, solve: bool, covariance_model: str
+) -> dict:
+    import numpy as np
+    from pypfopt import expected_returns, risk_models
+    from config_new import LOOKBACK_PERIOD_DAYS
+    from data_loader import PortfolioDataLoader
+    from factor_model import FactorCovariance
+    from portfolio_optimizer_csv import CSVPortfolioOptimizer
+    from price_store import build_price_matrix
+
+    (portfolio_csv, prices_csv), write_seconds = timed(
+        lambda: write_dataset(directory, n_tickers=n_tickers, n_sectors=n_sectors, n_days=n_days)
+    )
+    loader = PortfolioDataLoader(portfolio_csv, prices_csv, use_store=False)
+    prices, load_seconds = timed(loader.load_prices)
+    (matrix, _), pivot_seconds = timed(lambda: build_price_matrix(prices))
+
+    window = matrix.iloc[-(LOOKBACK_PERIOD_DAYS * TRADING_DAYS_PER_YEAR // 365):]
+    (_, S), cov_seconds = timed(lambda: (
+        expected_returns.mean_historical_return(window, frequency=TRADING_DAYS_PER_YEAR),
+        risk_models.sample_cov(window, frequency=TRADING_DAYS_PER_YEAR),
+    ))
+    factor, factor_seconds = timed(
+        lambda: FactorCovariance.from_sectors(window, loader.get_sector_mapping(), TRADING_DAYS_PER_YEAR)
+    )
+
+    row = {
+        "tickers": n_tickers,
+        "days": n_days,
+        "rows": len(prices),
+        "csv_mb": round(prices_csv.stat().st_size / 1e6, 1),
+        "write": round(write_seconds, 3),
+        "load_prices": round(load_seconds, 3),
+        "pivot": round(pivot_seconds, 3),
+        "sample_cov": round(cov_seconds, 3),
+        "sample_cov_mb": round(S.to_numpy().nbytes / 1e6, 2),
+        "min_eigenvalue": float(np.linalg.eigvalsh(S.to_numpy())[0]),
+        "factor_cov": round(factor_seconds, 3),
+        "factor_cov_mb": round(factor.nbytes / 1e6, 2),
+        "covariance_model": covariance_model,
+        "solve": None,
+    }
+    if solve:
+        optimizer = CSVPortfolioOptimizer(loader, covariance_model=covariance_model)
+        loader.get_price_matrix()
+        try:
+            _, row["solve"] = timed(lambda: optimizer.optimize_portfolio("medium", 10))
+            row["solve"] = round(row["solve"], 3)
+        except Exception as e:
+            row["solve"] = f"failed: {e.args[-1] if e.args else e}"
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, nargs="+", default=[27, 100, 500, 1000])
+    parser.add_argument("--sectors", type=int, default=5)
+    parser.add_argument("--years", type=float, default=5)
+    parser.add_argument("--max-solve-tickers", type=int, default=500,
+                        help="Skip the solver above this universe size")
+    parser.add_argument("--covariance-model", default="auto", choices=["sample", "sector", "pca", "auto"],
+                        help="Covariance model used by the solve")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    warnings.simplefilter("ignore")
+    n_days = int(args.years * TRADING_DAYS_PER_YEAR)
+    rows = []
+    print(
+        f"{'tickers':>8}{'rows':>11}{'csv MB':>9}{'write':>9}{'load':>9}{'pivot':>9}{'cov':>9}"
+        f"{'cov MB':>9}{'min eig':>11}{'factor':>9}{'fac MB':>9}{'solve':>9}"
+    )
+    for n_tickers in args.tickers:
+        with tempfile.TemporaryDirectory() as tmp:
+            row = run_size(
+                Path(tmp), n_tickers, args.sectors, n_days, n_tickers <= args.max_solve_tickers,
+                args.covariance_model
+            )
+        rows.append(row)
+        if row["solve"] is None:
+            solve = "skipped"
+        elif isinstance(row["solve"], str):
+            solve = "failed"
+        else:
+            solve = f"{row['solve']:.2f}s"
+        print(
+            f"{row['tickers']:>8}{row['rows']:>11}{row['csv_mb']:>9}{row['write']:>8.2f}s"
+            f"{row['load_prices']:>8.2f}s{row['pivot']:>8.2f}s{row['sample_cov']:>8.2f}s"
+            f"{row['sample_cov_mb']:>9}{row['min_eigenvalue']:>11.1e}{row['factor_cov']:>8.2f}s"
+            f"{row['factor_cov_mb']:>9}{solve:>9}"
+        )
+    print(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark: interactive re-optimization with warm optimization sessions
+
+Sweeps a target return and a risk aversion across a range of values, the
+way a slider does, and compares a fresh pypfopt EfficientFrontier per value
+(constraints re-added and the problem re-canonicalized every time) with
+OptimizationSession, which compiles each objective once and then only
+updates a parameter and warm-starts the solver. Also times repeated
+optimize_portfolio calls (e.g. horizon changes), which now reuse the
+cached session.
+
+Usage:
+    python benchmarks/bench_session.py [--points 25] [--tickers 27]
+    python benchmarks/bench_session.py --tickers 1000 --covariance-model sector
+"""
+import argparse
+import json
+import logging
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from synthetic_data import write_dataset  # noqa: E402
+
+
+def per_call(fn, values) -> float:
+    """Median seconds per call of fn(value) over the sweep"""
+    samples = []
+    for value in values:
+        start = time.perf_counter()
+        fn(value)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=25, help="Slider positions per sweep")
+    parser.add_argument("--tickers", type=int, default=27)
+    parser.add_argument("--risk-profile", default="medium")
+    parser.add_argument("--covariance-model", default="auto", choices=["sample", "sector", "pca", "auto"])
+    args = parser.parse_args()
+
+    import numpy as np
+    from config_new import RISK_FREE_RATE, RISK_PROFILES
+    from data_loader import PortfolioDataLoader
+    from optimization_session import OptimizationSession
+    from portfolio_optimizer_csv import CSVPortfolioOptimizer
+
+    logging.disable(logging.WARNING)
+    warnings.simplefilter("ignore")
+    with tempfile.TemporaryDirectory() as tmp:
+        portfolio_csv, prices_csv = write_dataset(Path(tmp), n_tickers=args.tickers)
+        optimizer = CSVPortfolioOptimizer(
+            PortfolioDataLoader(portfolio_csv, prices_csv, use_store=False), covariance_model=args.covariance_model
+        )
+
+        profile_config = RISK_PROFILES[args.risk_profile]
+        mu, S = optimizer._prepare_estimates(args.risk_profile, None, None, 252)
+        sector_mapper = optimizer._sector_mapper(mu.index)
+        min_weight = optimizer._min_weight(len(mu))
+
+        def session():
+            return OptimizationSession(mu, S, sector_mapper, profile_config['max_sector_weight'], min_weight)
+
+        low = session().min_volatility()[1][0]
+        high = session().max_return()
+        targets = [float(t) for t in np.linspace(low, high * 0.98, args.points)]
+        aversions = [float(a) for a in np.geomspace(0.5, 50, args.points)]
+
+        def fresh_return(target):
+            ef = optimizer._build_frontier(mu, S, sector_mapper, profile_config)
+            ef.efficient_return(target)
+            return ef.portfolio_performance(risk_free_rate=RISK_FREE_RATE)
+
+        def fresh_utility(delta):
+            ef = optimizer._build_frontier(mu, S, sector_mapper, profile_config)
+            ef.max_quadratic_utility(risk_aversion=delta)
+            return ef.portfolio_performance(risk_free_rate=RISK_FREE_RATE)
+
+        warm = session()
+        warm.efficient_return(targets[0])
+        warm.max_quadratic_utility(aversions[0])
+
+        results = {
+            "target_return": {
+                "fresh_frontier": per_call(fresh_return, targets),
+                "session": per_call(warm.efficient_return, targets),
+            },
+            "risk_aversion": {
+                "fresh_frontier": per_call(fresh_utility, aversions),
+                "session": per_call(warm.max_quadratic_utility, aversions),
+            },
+        }
+
+        # Horizon slider: same estimates and profile, new optimize_portfolio call
+        def fresh_profile(_):
+            ef = optimizer._build_frontier(mu, S, sector_mapper, profile_config)
+            ef.max_sharpe(risk_free_rate=RISK_FREE_RATE)
+            ef.clean_weights()
+            return ef.portfolio_performance(risk_free_rate=RISK_FREE_RATE)
+
+        optimizer.optimize_portfolio(args.risk_profile, 1)
+        results["optimize_portfolio"] = {
+            "fresh_frontier": per_call(fresh_profile, range(args.points)),
+            "session": per_call(
+                lambda years: optimizer._solve(args.risk_profile, mu, S), range(1, args.points + 1)
+            ),
+        }
+
+    print(f"{'sweep':<22}{'fresh EF (ms)':>15}{'session (ms)':>15}{'speed-up':>10}")
+    for name, stats in results.items():
+        speedup = stats["fresh_frontier"] / stats["session"]
+        stats["speedup"] = speedup
+        print(f"{name:<22}{stats['fresh_frontier'] * 1e3:>15.2f}{stats['session'] * 1e3:>15.2f}{speedup:>9.1f}x")
+    print(json.dumps({"tickers": args.tickers, "points": args.points, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark: bursts of identical concurrent optimize_portfolio requests
+
+Fires a burst of requests from many threads at once, spread over a few
+distinct (risk profile, horizon, sectors) combinations, against a fresh
+optimizer (cold caches, as at market open). Compares direct solves, where
+every request estimates and solves for itself, with the single-flight path
+of optimize_portfolio, where each distinct request is computed once.
+
+Usage:
+    python benchmarks/bench_single_flight.py [--requests 32] [--distinct 4] [--tickers 27]
+"""
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from synthetic_data import write_dataset  # noqa: E402
+
+REQUEST_MIX = [
+    ("medium", 10, None),
+    ("low", 5, None),
+    ("medium", 3, None),
+    ("low", 20, None),
+    ("medium", 7, None),
+    ("low", 1, None),
+]
+
+
+def burst(call, requests) -> float:
+    """Run call(*request) for every request on its own thread at once; seconds until all finish"""
+    start_gate = threading.Barrier(len(requests) + 1)
+
+    def worker(request):
+        start_gate.wait()
+        call(*request)
+
+    threads = [threading.Thread(target=worker, args=(request,)) for request in requests]
+    for thread in threads:
+        thread.start()
+    start = time.perf_counter()
+    start_gate.wait()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=32, help="Requests in the burst")
+    parser.add_argument("--distinct", type=int, default=4, choices=range(1, len(REQUEST_MIX) + 1))
+    parser.add_argument("--tickers", type=int, default=27)
+    args = parser.parse_args()
+
+    from config_new import LOOKBACK_PERIOD_DAYS
+    from data_loader import PortfolioDataLoader
+    from portfolio_optimizer_csv import CSVPortfolioOptimizer
+
+    logging.disable(logging.WARNING)
+    warnings.simplefilter("ignore")
+    requests = [REQUEST_MIX[i % args.distinct] for i in range(args.requests)]
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        portfolio_csv, prices_csv = write_dataset(Path(tmp), n_tickers=args.tickers)
+        loader = PortfolioDataLoader(portfolio_csv, prices_csv)
+        loader.get_price_matrix()
+
+        for mode in ("direct", "single_flight"):
+            optimizer = CSVPortfolioOptimizer(loader)
+            solves = []
+            compute = optimizer._optimize_portfolio
+
+            def counted(*solve_args):
+                solves.append(solve_args)
+                return compute(*solve_args)
+
+            optimizer._optimize_portfolio = counted
+            if mode == "direct":
+                seconds = burst(
+                    lambda risk, years, sectors: optimizer._optimize_portfolio(
+                        risk, years, sectors, None, LOOKBACK_PERIOD_DAYS
+                    ),
+                    requests
+                )
+            else:
+                seconds = burst(lambda risk, years, sectors: optimizer.optimize_portfolio(risk, years, sectors), requests)
+            results[mode] = {"seconds": seconds, "computations": len(solves)}
+
+    results["speedup"] = results["direct"]["seconds"] / results["single_flight"]["seconds"]
+    print(f"{'mode':<16}{'computations':>14}{'burst (ms)':>12}")
+    for mode in ("direct", "single_flight"):
+        print(f"{mode:<16}{results[mode]['computations']:>14}{results[mode]['seconds'] * 1e3:>12.1f}")
+    print(json.dumps({"requests": args.requests, "distinct": args.distinct, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark: per-stage latency of process_query with and without speculation
+
+Runs the same portfolio queries through CerebrasPortfolioAgent.process_query
+against the local stub API, once solving after the LLM extraction returns
+and once solving speculatively (for the regex extraction) while it is in
+flight, and reports mean seconds per stage from the response metadata.
+The extraction cache is disabled so every query makes its LLM calls.
+
+Usage:
+    python benchmarks/bench_speculation.py [--queries 8] [--latency 0.5]
+"""
+import argparse
+import json
+import logging
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_async_agent import make_queries  # noqa: E402
+from synthetic_data import write_dataset  # noqa: E402
+
+STAGES = ["extraction", "optimization", "explanation", "total"]
+
+
+def run_mode(agent, queries, speculative: bool):
+    agent.speculative_optimization = speculative
+    results = [agent.process_query(query) for query in queries]
+    succeeded = [r for r in results if r["success"]]
+    means = {
+        stage: sum(r["metadata"]["timings"].get(stage, 0.0) for r in succeeded) / max(len(succeeded), 1)
+        for stage in STAGES
+    }
+    outcomes = [r["metadata"]["speculation"] for r in succeeded]
+    return {
+        "succeeded": len(succeeded),
+        "hits": outcomes.count("hit"),
+        "stage_seconds": means,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds per stub completion")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    from agent_cerebras import CerebrasPortfolioAgent
+    from cerebras_stub import StubCerebrasServer
+    from data_loader import PortfolioDataLoader
+    from portfolio_optimizer_csv import CSVPortfolioOptimizer
+
+    queries = make_queries(args.queries)
+    with tempfile.TemporaryDirectory() as tmp, StubCerebrasServer(latency=args.latency) as server:
+        portfolio_csv, prices_csv = write_dataset(Path(tmp))
+        agent = CerebrasPortfolioAgent(
+            api_key="bench",
+            optimizer=CSVPortfolioOptimizer(PortfolioDataLoader(portfolio_csv, prices_csv)),
+            base_url=server.base_url
+        )
+        agent.extraction_cache = None
+        # Warm the price matrix and estimate cache so both modes solve from cached (mu, S)
+        agent.optimizer.data_loader.get_price_matrix()
+        agent.optimizer.optimize_many([{"risk_profile": p, "horizon_years": 5} for p in ("low", "medium")])
+
+        results = {
+            "queries": len(queries),
+            "latency": args.latency,
+            "sequential": run_mode(agent, queries, speculative=False),
+            "speculative": run_mode(agent, queries, speculative=True),
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{len(queries)} queries, {args.latency}s per completion (mean seconds per stage)")
+    print(f"{'mode':<13}" + "".join(f"{stage:>14}" for stage in STAGES) + f"{'hits':>6}")
+    for label in ("sequential", "speculative"):
+        r = results[label]
+        print(
+            f"{label:<13}" + "".join(f"{r['stage_seconds'][stage]:>14.3f}" for stage in STAGES)
+            + f"{r['hits']:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
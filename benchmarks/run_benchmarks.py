@@ -0,0 +1,262 @@
+"""
+Benchmark suite: data, optimizer, guardrail and agent hot paths
+
+Runs offline against synthetic CSVs and the local stub Cerebras API, and
+writes machine-readable results (one JSON file per run) so runs can be
+compared for regressions:
+
+    load_prices             cold (fresh interpreter; CSV parse and price store) and warm (new loader, same process)
+    get_historical_prices   latency by universe size
+    optimize_portfolio      per risk profile, estimate cache cleared each run
+    discrete_allocation     share quantities for a medium-risk portfolio
+    guardrails              input/output scanning throughput
+    process_query           end to end with the stub API (no latency) and no extraction cache
+
+Usage:
+    python benchmarks/run_benchmarks.py [--repeat 20] [--only optimize_portfolio guardrails]
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/baseline.json [--threshold 0.2]
+"""
+import argparse
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_load_prices import run_child  # noqa: E402
+from synthetic_data import write_dataset  # noqa: E402
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+GUARDRAIL_QUERIES = [
+    "I'm 35 and want a moderate risk portfolio for 15 years",
+    "Conservative allocation for retirement in 5 years, avoid tobacco stocks",
+    "My email is someone@example.com, build me an aggressive growth portfolio",
+    "What sectors should a 25 year old focus on for long-term growth?",
+    "Guaranteed returns with no risk please, call me at 555-123-4567",
+]
+
+
+def measure(fn: Callable[[], object], repeat: int, warmup: int = 1) -> Dict:
+    """Time fn() repeat times after warmup calls; seconds statistics"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def summarize(samples: List[float]) -> Dict:
+    ordered = sorted(samples)
+    return {
+        "unit": "seconds",
+        "samples": len(ordered),
+        "min": ordered[0],
+        "median": statistics.median(ordered),
+        "mean": statistics.fmean(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+    }
+
+
+class Fixture:
+    """Synthetic dataset and shared objects for one benchmark run"""
+
+    def __init__(self, directory: Path, repeat: int):
+        from data_loader import PortfolioDataLoader
+        from portfolio_optimizer_csv import CSVPortfolioOptimizer
+
+        self.repeat = repeat
+        self.portfolio_csv, self.prices_csv = write_dataset(directory)
+        self.store_dir = directory / "store"
+        self.loader = PortfolioDataLoader(self.portfolio_csv, self.prices_csv, store_dir=self.store_dir)
+        self.loader.get_price_matrix()
+        self.optimizer = CSVPortfolioOptimizer(self.loader)
+
+    def new_loader(self, use_store: bool = True):
+        from data_loader import PortfolioDataLoader
+        return PortfolioDataLoader(self.portfolio_csv, self.prices_csv, store_dir=self.store_dir, use_store=use_store)
+
+
+def bench_load_prices(fx: Fixture) -> Dict[str, Dict]:
+    results = {}
+    cold_repeat = max(3, fx.repeat // 5)
+    for label, use_store in (("csv", False), ("store", True)):
+        # The child uses the default store location next to the CSV
+        samples = [run_child(fx.prices_csv, use_store)["seconds"] for _ in range(cold_repeat + 1)][1:]
+        results[f"load_prices.cold.{label}"] = summarize(samples)
+        results[f"load_prices.warm.{label}"] = measure(lambda: fx.new_loader(use_store).load_prices(), fx.repeat)
+    return results
+
+
+def bench_historical_prices(fx: Fixture) -> Dict[str, Dict]:
+    universe = fx.loader.get_stock_universe()
+    results = {}
+    for size in sorted({5, 10, 20, len(universe)}):
+        if size > len(universe):
+            continue
+        tickers = universe[:size]
+        results[f"get_historical_prices.{size}_tickers"] = measure(
+            lambda: fx.loader.get_historical_prices(tickers=tickers, lookback_days=365), fx.repeat * 5
+        )
+    return results
+
+
+def bench_optimize(fx: Fixture) -> Dict[str, Dict]:
+    from config_new import RISK_PROFILES
+
+    results = {}
+    for risk_profile in RISK_PROFILES:
+        def run():
+            fx.optimizer.estimate_cache.clear()
+            fx.optimizer.optimize_portfolio(risk_profile, 10)
+        try:
+            results[f"optimize_portfolio.{risk_profile}"] = measure(run, fx.repeat)
+        except Exception as e:
+            results[f"optimize_portfolio.{risk_profile}"] = {"error": str(e)}
+    return results
+
+
+def bench_discrete_allocation(fx: Fixture) -> Dict[str, Dict]:
+    weights = fx.optimizer.optimize_portfolio("medium", 10)["weights"]
+    return {
+        "discrete_allocation.medium": measure(lambda: fx.optimizer.discrete_allocation(weights, 100_000), fx.repeat)
+    }
+
+
+def bench_guardrails(fx: Fixture) -> Dict[str, Dict]:
+    from config_new import MANDATORY_DISCLAIMER
+    from guardrails import InputGuardrail, OutputGuardrail
+
+    queries = GUARDRAIL_QUERIES * 200
+    explanation = fx.optimizer.optimize_portfolio("medium", 10)["explanation"] + "\n\n" + MANDATORY_DISCLAIMER
+    outputs = [explanation] * 200
+    results = {}
+    for label, guardrail, texts in (("input", InputGuardrail(), queries), ("output", OutputGuardrail(), outputs)):
+        def scan():
+            for text in texts:
+                guardrail.check(text)
+        stats = measure(scan, fx.repeat)
+        stats["texts_per_second"] = len(texts) / stats["median"]
+        stats["mb_per_second"] = sum(map(len, texts)) / stats["median"] / 1e6
+        results[f"guardrails.{label}"] = stats
+    return results
+
+
+def bench_process_query(fx: Fixture) -> Dict[str, Dict]:
+    from agent_cerebras import CerebrasPortfolioAgent
+    from cerebras_stub import StubCerebrasServer
+
+    with StubCerebrasServer() as server:
+        agent = CerebrasPortfolioAgent(
+            api_key="bench", optimizer=fx.optimizer, base_url=server.base_url, extraction_cache=None
+        )
+        agent.extraction_cache = None
+        queries = ["Build me a low risk portfolio for 8 years", "Medium risk portfolio for 12 years"]
+        counter = iter(range(10 ** 9))
+        return {
+            "process_query.portfolio": measure(lambda: agent.process_query(queries[next(counter) % 2]), fx.repeat),
+            "process_query.chat": measure(lambda: agent.process_query("hello there"), fx.repeat),
+        }
+
+
+BENCHMARKS = {
+    "load_prices": bench_load_prices,
+    "get_historical_prices": bench_historical_prices,
+    "optimize_portfolio": bench_optimize,
+    "discrete_allocation": bench_discrete_allocation,
+    "guardrails": bench_guardrails,
+    "process_query": bench_process_query,
+}
+
+
+def environment() -> Dict:
+    import numpy as np
+    import pandas as pd
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Print median ratios against a baseline run; returns names of regressions"""
+    regressions = []
+    print(f"\n{'benchmark':<44}{'baseline':>12}{'current':>12}{'ratio':>8}")
+    for name, stats in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or "median" not in base or "median" not in stats:
+            continue
+        ratio = stats["median"] / base["median"]
+        flag = "  REGRESSION" if ratio > 1 + threshold else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:<44}{base['median'] * 1e3:>10.2f}ms{stats['median'] * 1e3:>10.2f}ms{ratio:>8.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per benchmark")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Benchmarks to run (default: all)")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Results file (default: benchmarks/results/<UTC timestamp>.json)")
+    parser.add_argument("--compare", type=Path, default=None, help="Baseline results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Median slowdown vs. baseline reported as a regression (default: 20%%)")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    started = datetime.now(timezone.utc)
+    run = {"started_at": started.isoformat(), "repeat": args.repeat, "environment": environment(), "results": {}}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fx = Fixture(Path(tmp), args.repeat)
+        for name in args.only or BENCHMARKS:
+            start = time.perf_counter()
+            run["results"].update(BENCHMARKS[name](fx))
+            print(f"{name:<24} done in {time.perf_counter() - start:.1f}s")
+
+    print(f"\n{'benchmark':<44}{'median':>12}{'p95':>12}")
+    for name, stats in run["results"].items():
+        if "error" in stats:
+            print(f"{name:<44}  error: {stats['error']}")
+        else:
+            print(f"{name:<44}{stats['median'] * 1e3:>10.2f}ms{stats['p95'] * 1e3:>10.2f}ms")
+
+    output = args.output or RESULTS_DIR / f"{started.strftime('%Y%m%dT%H%M%SZ')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(run, indent=2))
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        regressions = compare(run, json.loads(args.compare.read_text()), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
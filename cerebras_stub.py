@@ -0,0 +1,245 @@
+"""
+Local Cerebras Stub Server for F2 Portfolio Recommender
+OpenAI-style /v1/chat/completions endpoint (including SSE streaming) with
+configurable latency, used by tests and benchmarks in place of the Cerebras API
+
+Usage:
+    python cerebras_stub.py --port 8765 --latency 0.5
+    CEREBRAS_BASE_URL=http://127.0.0.1:8765 streamlit run app.py
+"""
+import argparse
+import json
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, Optional
+
+STUB_EXPLANATION = (
+    "This portfolio balances growth and stability across several sectors, "
+    "matching your risk tolerance and investment horizon."
+)
+
+
+def default_responder(request: Dict) -> str:
+    """
+    Canned reply for a chat completion request
+
+    Extraction prompts get a JSON parameter object inferred from keywords in
+    the quoted user query; every other prompt gets a fixed explanation.
+    """
+    prompt = request["messages"][-1]["content"]
+    if "Extract investment parameters" not in prompt:
+        return STUB_EXPLANATION
+
+    match = re.search(r'User Query: "(.*?)"', prompt, re.DOTALL)
+    query = (match.group(1) if match else prompt).lower()
+
+    risk_profile = "medium"
+    if any(word in query for word in ("low", "conservative", "safe", "cautious")):
+        risk_profile = "low"
+    elif any(word in query for word in ("high", "aggressive", "growth")):
+        risk_profile = "high"
+    horizon = re.search(r"(\d+)[\s-]*years?\b(?!\s*old)", query)
+
+    return json.dumps({
+        "risk_profile": risk_profile,
+        "horizon_years": int(horizon.group(1)) if horizon else 10,
+        "sector_preferences": [],
+        "constraints": {},
+        "confidence": 0.9,
+        "reasoning": f"Stub extraction: {risk_profile} risk",
+    })
+
+
+class StubCerebrasServer:
+    """
+    Threaded HTTP server imitating the Cerebras chat completions API
+
+    Tracks the number of requests served and the peak number handled
+    concurrently, so callers can check concurrency limits.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        responder: Optional[Callable[[Dict], str]] = None,
+        token_interval: float = 0.0
+    ):
+        """
+        Initialize server (call start() or use as a context manager)
+
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            latency: Seconds each completion takes (time to first token when streaming)
+            responder: Maps a request body to the reply text
+            token_interval: Seconds between streamed tokens
+        """
+        self.latency = latency
+        self.token_interval = token_interval
+        self.responder = responder or default_responder
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubCerebrasServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serve on the calling thread until interrupted"""
+        self._httpd.serve_forever()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self) -> "StubCerebrasServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    @contextmanager
+    def _tracked(self):
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def complete(self, request: Dict) -> Dict:
+        """Produce a chat completion response body (after the configured latency)"""
+        with self._tracked():
+            if self.latency:
+                time.sleep(self.latency)
+            content = self.responder(request)
+
+        prompt_tokens = sum(len(m["content"].split()) for m in request["messages"])
+        completion_tokens = len(content.split())
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def stream(self, request: Dict) -> Iterator[Dict]:
+        """Produce chat completion chunks, one per word of the reply"""
+        with self._tracked():
+            if self.latency:
+                time.sleep(self.latency)
+            content = self.responder(request)
+            chunk_id = f"chatcmpl-{uuid.uuid4().hex}"
+            created = int(time.time())
+
+            def chunk(delta: Dict, finish_reason: Optional[str] = None) -> Dict:
+                return {
+                    "id": chunk_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": request.get("model", "stub"),
+                    "system_fingerprint": "stub",
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                }
+
+            for i, token in enumerate(re.findall(r"\s*\S+", content)):
+                if i and self.token_interval:
+                    time.sleep(self.token_interval)
+                yield chunk({"role": "assistant", "content": token} if i == 0 else {"content": token})
+            yield chunk({}, "stop")
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, body: Dict) -> None:
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                # The SDK warms its TCP connection with GET /v1/tcp_warming
+                self._send_json(200, {})
+
+            def do_POST(self):
+                if self.path.rstrip("/") != "/v1/chat/completions":
+                    self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if not request.get("stream"):
+                    self._send_json(200, server.complete(request))
+                    return
+
+                # Server-sent events; the body ends when the connection closes
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                for chunk in server.stream(request):
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds per completion")
+    parser.add_argument("--token-interval", type=float, default=0.02, help="Seconds between streamed tokens")
+    args = parser.parse_args()
+
+    server = StubCerebrasServer(args.host, args.port, latency=args.latency, token_interval=args.token_interval)
+    print(f"Stub Cerebras API on {server.base_url} (latency {args.latency}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 Configuration for F2 Portfolio Recommender Agent (Restructured)
 Centralized settings for Cerebras API and dataset-based analysis
 """
+import hashlib
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -25,11 +26,56 @@ CEREBRAS_MODEL = os.getenv("CEREBRAS_MODEL", "llama-3.3-70b")
 CEREBRAS_TEMPERATURE = float(os.getenv("CEREBRAS_TEMPERATURE", "0.7"))
 CEREBRAS_TOP_P = float(os.getenv("CEREBRAS_TOP_P", "0.8"))
 CEREBRAS_MAX_TOKENS = int(os.getenv("CEREBRAS_MAX_TOKENS", "20000"))
+CEREBRAS_BASE_URL = os.getenv("CEREBRAS_BASE_URL")  # None uses the SDK default endpoint
+CEREBRAS_MAX_CONCURRENCY = int(os.getenv("CEREBRAS_MAX_CONCURRENCY", "8"))  # In-flight async requests
+CEREBRAS_REQUESTS_PER_SECOND = float(os.getenv("CEREBRAS_REQUESTS_PER_SECOND", "10"))  # Async request start rate
 
 # ========== Portfolio Analysis Configuration ==========
 # Analysis will be based on actual portfolio data from CSV files
 LOOKBACK_PERIOD_DAYS = 252  # 1 year of trading days
 RISK_FREE_RATE = 0.04  # 4% annual risk-free rate
+ESTIMATE_CACHE_SIZE = 64  # (mu, S) pairs kept by the optimizer's estimate cache
+FRONTIER_GRID_POINTS = 40  # Efficient-return solves per precomputed frontier
+FRONTIER_CACHE_SIZE = 16  # Frontier grids kept by the optimizer's frontier cache
+SESSION_CACHE_SIZE = 16  # Compiled optimization sessions kept by the optimizer
+
+# ========== Covariance Model ==========
+# "sample" (dense sample covariance), "sector" or "pca" (low-rank factor model),
+# or "auto" (sample covariance for small universes, sector factors for large ones)
+COVARIANCE_MODEL = os.getenv("F2_COVARIANCE_MODEL", "auto")
+FACTOR_MODEL_MIN_TICKERS = 250  # "auto" switches to sector factors from here (~1 year of daily returns)
+FACTOR_PCA_COMPONENTS = 10  # Statistical factors of the "pca" model
+
+# ========== Extraction Cache ==========
+EXTRACTION_CACHE_PATH = Path(os.getenv("F2_EXTRACTION_CACHE", str(PROJECT_ROOT / ".cache" / "extraction_cache.sqlite3")))
+EXTRACTION_CACHE_TTL_SECONDS = 7 * 24 * 3600  # Cached LLM extractions expire after a week
+EXTRACTION_CACHE_MAX_ENTRIES = 10000  # Least recently used entries are evicted beyond this
+
+# ========== Monte Carlo Simulation ==========
+MC_PATHS = 10000  # Simulated wealth paths per projection
+MC_STEPS_PER_YEAR = 52  # Time steps per year for parametric (mu, S) paths
+MC_CHUNK_ELEMENTS = 2_000_000  # Path x step values generated per batch (bounds memory)
+MC_PERCENTILES = (5, 25, 50, 75, 95)  # Wealth bands reported per year
+
+# ========== Parallel Optimization ==========
+PARALLEL_WORKERS = int(os.getenv("F2_PARALLEL_WORKERS", str(os.cpu_count() or 1)))
+PARALLEL_BATCH_TIMEOUT = float(os.getenv("F2_PARALLEL_BATCH_TIMEOUT", "300"))  # Seconds per batch of requests
+PARALLEL_CHUNK_SIZE = 32  # Requests sent to a worker per task
+# Solve for the regex-extracted parameters while the LLM extraction is in flight
+SPECULATIVE_OPTIMIZATION = os.getenv("F2_SPECULATIVE_OPTIMIZATION", "true").lower() in ("1", "true", "yes")
+
+# ========== Background Jobs ==========
+JOB_WORKERS = int(os.getenv("F2_JOB_WORKERS", "4"))  # Recommendation jobs run at once (mostly waiting on the LLM)
+JOB_HISTORY_SIZE = 256  # Finished jobs kept so app reruns can still pick up their results
+JOB_POLL_INTERVAL_SECONDS = 0.25  # How long an app run waits on a job before rerunning to show progress
+# Speculative solves in flight at once (one per concurrent job); requests skip speculation when all are busy
+SPECULATION_WORKERS = int(os.getenv("F2_SPECULATION_WORKERS", str(JOB_WORKERS)))
+
+# ========== Tracing ==========
+TRACE_LOG_PATH = os.getenv("F2_TRACE_LOG")  # JSON lines file of finished traces (unset: off)
+METRICS_FILE_PATH = os.getenv("F2_METRICS_FILE")  # Prometheus text file of stage latencies (unset: off)
+METRICS_FILE_INTERVAL_SECONDS = 10.0  # Minimum seconds between metrics file rewrites
+TRACE_MAX_SAMPLES = 2048  # Latest durations per stage kept for latency quantiles
 
 # Risk profile mappings (based on actual portfolio data)
 RISK_PROFILES = {
@@ -68,6 +114,8 @@ PII_PATTERNS = [
     r'\b\d{12}\b',  # Aadhaar (India)
 ]
 
+VIOLATION_LOG_SIZE = 1000  # Most recent guardrail violations kept per guardrail
+
 MANDATORY_DISCLAIMER = (
     "⚠️ DISCLAIMER: This portfolio is AI-generated for educational and demonstration purposes only. "
     "It is NOT financial advice. Consult a licensed financial advisor before investing. "
@@ -214,6 +262,13 @@ User Query: "{query}"
   "reasoning": "<one sentence explaining what you extracted>"
 }}"""
 
+EXTRACTION_SYSTEM_PROMPT = "You are a specialized financial parameter extraction AI. Your ONLY job is to extract investment parameters and return valid JSON. Be intelligent about inferring missing information from context like age."
+
+# Changes whenever the extraction prompts change, invalidating cached extractions
+EXTRACTION_PROMPT_VERSION = hashlib.sha256(
+    (EXTRACTION_SYSTEM_PROMPT + EXTRACTION_PROMPT_TEMPLATE).encode("utf-8")
+).hexdigest()[:12]
+
 # ========== Streamlit Configuration ==========
 STREAMLIT_CONFIG = {
     "page_title": "F2 Portfolio Recommender",
@@ -243,6 +298,12 @@ COLOR_SCHEME = {
     }
 }
 
+# Multiples of the entered amount shown in the ticket-size comparison
+ALLOCATION_COMPARE_MULTIPLES = (0.5, 2, 5)
+
+# Seconds between checks for new price data by the process-wide app resources
+RESOURCE_REFRESH_INTERVAL_SECONDS = 5.0
+
 # ========== Evaluation Metrics ==========
 EVALUATION_METRICS = [
     "tool_selection_accuracy",
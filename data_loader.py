@@ -4,28 +4,55 @@ Loads portfolio and historical price data from CSV files
 """
 import pandas as pd
 import numpy as np
+import threading
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime, timedelta
 import logging
 
+from price_store import PriceStore, build_price_matrix
+from tracing import span, traced
+
 logger = logging.getLogger(__name__)
 
 class PortfolioDataLoader:
-    """Handles loading and processing of portfolio data from CSV files"""
+    """
+    Handles loading and processing of portfolio data from CSV files
+    
+    Safe to share between threads: cached data is built and dropped under a
+    lock, and the price matrix travels with its last-valid positions as one
+    tuple that readers take once, so a concurrent refresh() never pairs a
+    matrix with another version's positions.
+    """
     
-    def __init__(self, portfolio_csv: Path, prices_csv: Path):
+    def __init__(
+        self,
+        portfolio_csv: Path,
+        prices_csv: Path,
+        store_dir: Optional[Path] = None,
+        use_store: bool = True
+    ):
         """
         Initialize data loader
         
         Args:
             portfolio_csv: Path to Portfolio.csv
             prices_csv: Path to Portfolio_prices.csv
+            store_dir: Location of the binary price store (default: next to the CSV)
+            use_store: Load prices through the binary store instead of parsing the CSV
         """
         self.portfolio_csv = portfolio_csv
         self.prices_csv = prices_csv
+        self.use_store = use_store
+        self.price_store = PriceStore(prices_csv, store_dir) if use_store else None
         self._portfolio_df = None
         self._prices_df = None
+        # (matrix, last valid row per column), replaced as a whole
+        self._price_data: Optional[Tuple[pd.DataFrame, np.ndarray]] = None
+        # (the _price_data it was read from, latest price per ticker)
+        self._latest_prices: Optional[Tuple[Tuple[pd.DataFrame, np.ndarray], pd.Series]] = None
+        self._data_version = None
+        self._lock = threading.RLock()
         
     def load_portfolio(self) -> pd.DataFrame:
         """Load portfolio composition data"""
@@ -37,11 +64,62 @@ class PortfolioDataLoader:
     
     def load_prices(self) -> pd.DataFrame:
         """Load historical price data"""
-        if self._prices_df is None:
-            logger.info(f"Loading prices from {self.prices_csv}")
-            self._prices_df = pd.read_csv(self.prices_csv, parse_dates=['Date'])
-            logger.info(f"Loaded {len(self._prices_df)} price records")
-        return self._prices_df
+        prices_df = self._prices_df
+        if prices_df is not None:
+            return prices_df
+        
+        with self._lock:
+            if self._prices_df is None:
+                logger.info(f"Loading prices from {self.prices_csv}")
+                with span("load_prices"):
+                    if self.price_store is not None:
+                        try:
+                            self._prices_df = self.price_store.load()
+                        except OSError as e:
+                            logger.warning(f"Price store unavailable ({e}), parsing CSV directly")
+                    if self._prices_df is None:
+                        self._prices_df = pd.read_csv(self.prices_csv, parse_dates=['Date'])
+                if self._data_version is None:
+                    self._data_version = self._source_version()
+                logger.info(f"Loaded {len(self._prices_df)} price records")
+            return self._prices_df
+    
+    def _source_version(self) -> str:
+        """Fingerprint of the prices CSV as it is on disk right now"""
+        if self.price_store is not None:
+            try:
+                return self.price_store.version
+            except OSError as e:
+                logger.warning(f"Price store unavailable ({e}), falling back to file stat")
+        stat = Path(self.prices_csv).stat()
+        return f"{stat.st_size}-{stat.st_mtime_ns}"
+    
+    @property
+    def data_version(self) -> str:
+        """Fingerprint of the price data this loader serves"""
+        if self._data_version is None:
+            self._data_version = self._source_version()
+        return self._data_version
+    
+    def refresh(self) -> bool:
+        """
+        Drop cached prices if the CSV changed on disk
+        
+        Returns:
+            True if cached data was discarded
+        """
+        current = self._source_version()
+        with self._lock:
+            if self._data_version is None or current == self._data_version:
+                self._data_version = current
+                return False
+            
+            logger.info("Price data changed on disk, reloading")
+            self._prices_df = None
+            self._price_data = None
+            self._latest_prices = None
+            self._data_version = current
+            return True
     
     def get_stock_universe(self) -> List[str]:
         """Get list of all available stock tickers"""
@@ -53,6 +131,7 @@ class PortfolioDataLoader:
         portfolio_df = self.load_portfolio()
         return dict(zip(portfolio_df['Ticker'], portfolio_df['Sector']))
     
+    @traced("data_load")
     def get_historical_prices(
         self,
         tickers: Optional[List[str]] = None,
@@ -72,30 +151,31 @@ class PortfolioDataLoader:
         Returns:
             DataFrame with Date index and ticker columns containing adjusted close prices
         """
-        prices_df = self.load_prices()
+        price_data = self._get_price_data()
+        matrix = price_data[0]
         
-        # Filter by tickers
-        if tickers is not None:
-            prices_df = prices_df[prices_df['Ticker'].isin(tickers)]
+        # Column selection (kept in the matrix's sorted ticker order, like pivot)
+        col_pos = None if tickers is None else np.flatnonzero(matrix.columns.isin(tickers))
         
         # Set date range
         if end_date is None:
-            end_date = prices_df['Date'].max()
+            end_date = self._latest_date(price_data, tickers)
         
         if lookback_days is not None and start_date is None:
             start_date = end_date - timedelta(days=lookback_days)
         
-        if start_date is not None:
-            prices_df = prices_df[prices_df['Date'] >= start_date]
-        
-        prices_df = prices_df[prices_df['Date'] <= end_date]
+        # Row selection: the index is sorted, so a date range is a contiguous slice
+        start_pos = matrix.index.searchsorted(start_date, side='left') if start_date is not None else 0
+        end_pos = matrix.index.searchsorted(end_date, side='right')
         
-        # Pivot to wide format (Date x Ticker)
-        price_matrix = prices_df.pivot(
-            index='Date',
-            columns='Ticker',
-            values='Adjusted'
-        )
+        if col_pos is None:
+            price_matrix = matrix.iloc[start_pos:end_pos]
+        else:
+            price_matrix = matrix.iloc[start_pos:end_pos, col_pos]
+            # Dates where none of the requested tickers traded would not survive a pivot
+            has_data = price_matrix.notna().to_numpy().any(axis=1)
+            if not has_data.all():
+                price_matrix = price_matrix[has_data]
         
         logger.info(
             f"Fetched prices for {price_matrix.shape[1]} tickers, "
@@ -104,6 +184,102 @@ class PortfolioDataLoader:
         
         return price_matrix
     
+    def get_latest_date(self, tickers: Optional[List[str]] = None) -> pd.Timestamp:
+        """
+        Latest date with a price for any of the given tickers
+        
+        Args:
+            tickers: List of ticker symbols (None = all tickers)
+            
+        Returns:
+            The date get_historical_prices uses when end_date is None
+        """
+        return self._latest_date(self._get_price_data(), tickers)
+    
+    @staticmethod
+    def _latest_date(
+        price_data: Tuple[pd.DataFrame, np.ndarray],
+        tickers: Optional[List[str]] = None
+    ) -> pd.Timestamp:
+        matrix, last_valid_pos = price_data
+        if tickers is None:
+            last_valid = last_valid_pos
+        else:
+            last_valid = last_valid_pos[np.flatnonzero(matrix.columns.isin(tickers))]
+        
+        valid = last_valid[last_valid >= 0]
+        return matrix.index[valid.max()] if len(valid) else matrix.index.max()
+    
+    def get_latest_prices(self, tickers: Optional[List[str]] = None) -> pd.Series:
+        """
+        Last available adjusted close of each ticker, indexed once per loader
+        
+        Same values as pypfopt's get_latest_prices on the full history, read
+        from the price matrix at each ticker's last valid row.
+        
+        Args:
+            tickers: List of ticker symbols (None = all tickers)
+            
+        Returns:
+            Series of prices by ticker (NaN for tickers without prices)
+        """
+        price_data = self._get_price_data()
+        cached = self._latest_prices
+        if cached is not None and cached[0] is price_data:
+            latest_prices = cached[1]
+        else:
+            matrix, last_valid_pos = price_data
+            columns = np.flatnonzero(last_valid_pos >= 0)
+            latest = np.full(matrix.shape[1], np.nan)
+            latest[columns] = matrix.to_numpy()[last_valid_pos[columns], columns]
+            latest_prices = pd.Series(latest, index=matrix.columns, name="latest_price")
+            self._latest_prices = (price_data, latest_prices)
+        
+        if tickers is None:
+            return latest_prices.copy()
+        return latest_prices.reindex(tickers)
+    
+    def get_price_matrix(self) -> pd.DataFrame:
+        """
+        Dense Date x Ticker matrix of adjusted closes, built once per loader
+        
+        With the price store enabled the matrix is a read-only memory map of
+        the store's matrix file, shared by every loader on the machine.
+        
+        Returns:
+            DataFrame with a sorted DatetimeIndex and sorted ticker columns
+        """
+        return self._get_price_data()[0]
+    
+    def _get_price_data(self) -> Tuple[pd.DataFrame, np.ndarray]:
+        """The (matrix, last valid row per column) pair, built once per data version"""
+        price_data = self._price_data
+        if price_data is not None:
+            return price_data
+        
+        with self._lock:
+            if self._price_data is None and self.price_store is not None:
+                if self._data_version is None:
+                    self._data_version = self._source_version()
+                try:
+                    with span("price_matrix"):
+                        self._price_data = self.price_store.load_matrix()
+                    logger.info(
+                        f"Mapped shared price matrix: {self._price_data[0].shape[0]} days x "
+                        f"{self._price_data[0].shape[1]} tickers"
+                    )
+                except (OSError, KeyError) as e:
+                    logger.warning(f"Shared price matrix unavailable ({e}), pivoting in memory")
+            
+            if self._price_data is None:
+                with span("price_matrix"):
+                    self._price_data = build_price_matrix(self.load_prices())
+                logger.info(
+                    f"Built price matrix: {self._price_data[0].shape[0]} days x "
+                    f"{self._price_data[0].shape[1]} tickers"
+                )
+            return self._price_data
+    
     def get_returns(
         self,
         tickers: Optional[List[str]] = None,
@@ -0,0 +1,120 @@
+"""
+Estimate Cache for F2 Portfolio Recommender
+Bounded LRU caches, bound to a price-data version, for optimizer intermediates
+such as (expected returns, covariance) pairs
+"""
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+import pandas as pd
+
+from config_new import ESTIMATE_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class VersionedLRUCache:
+    """
+    Thread-safe LRU cache bound to one price-data version
+
+    The cache empties itself as soon as ``bind`` sees a different version,
+    so entries derived from old prices are never served.
+    """
+
+    def __init__(self, maxsize: int):
+        """
+        Initialize cache
+
+        Args:
+            maxsize: Maximum number of entries kept
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.data_version: Optional[str] = None
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def bind(self, data_version: str) -> None:
+        """Drop every entry if the price data changed since the last call"""
+        with self._lock:
+            if self.data_version != data_version:
+                if self._entries:
+                    logger.info(
+                        f"Price data changed, dropping {len(self._entries)} {type(self).__name__} entries"
+                    )
+                self._entries.clear()
+                self.data_version = data_version
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value or compute and store it
+
+        The computation runs outside the lock, so concurrent misses on the
+        same key may both compute; the result is identical either way.
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current occupancy"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "data_version": self.data_version,
+            }
+
+
+class EstimateCache(VersionedLRUCache):
+    """
+    LRU cache of (mu, S) estimates
+
+    Keys identify the estimation problem: universe, window end, lookback,
+    estimator and annualization frequency.
+    """
+
+    def __init__(self, maxsize: int = ESTIMATE_CACHE_SIZE):
+        super().__init__(maxsize)
+
+    @staticmethod
+    def make_key(
+        tickers: Iterable[str],
+        end_date: datetime,
+        lookback_days: int,
+        estimator: str,
+        frequency: int
+    ) -> Tuple:
+        """Build a cache key; ticker order does not matter"""
+        return (tuple(sorted(tickers)), pd.Timestamp(end_date), lookback_days, estimator, frequency)
@@ -0,0 +1,173 @@
+"""
+Extraction Cache for F2 Portfolio Recommender
+Persistent SQLite cache of LLM parameter extractions keyed on the normalized query
+"""
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from config_new import (
+    EXTRACTION_CACHE_MAX_ENTRIES,
+    EXTRACTION_CACHE_PATH,
+    EXTRACTION_CACHE_TTL_SECONDS,
+    EXTRACTION_PROMPT_VERSION
+)
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS extractions (
+    key TEXT PRIMARY KEY,
+    query TEXT NOT NULL,
+    model TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    params TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_extractions_last_access ON extractions(last_access);
+"""
+
+
+def normalize_query(query: str) -> str:
+    """Case-fold, collapse whitespace and drop trailing punctuation"""
+    return _WHITESPACE.sub(" ", query.casefold()).strip().rstrip(".!?").strip()
+
+
+class ExtractionCache:
+    """
+    Disk-backed cache of extracted investment parameters
+
+    Entries are keyed on (normalized query, model, prompt version), expire
+    after ``ttl_seconds`` and are evicted least-recently-used beyond
+    ``max_entries``. The database is shared by every process using the same
+    path (SQLite handles the locking); hit/miss counters are per instance.
+    """
+
+    def __init__(
+        self,
+        path: Path = EXTRACTION_CACHE_PATH,
+        ttl_seconds: float = EXTRACTION_CACHE_TTL_SECONDS,
+        max_entries: int = EXTRACTION_CACHE_MAX_ENTRIES,
+        prompt_version: str = EXTRACTION_PROMPT_VERSION
+    ):
+        """
+        Open (or create) the cache database
+
+        Args:
+            path: SQLite database file
+            ttl_seconds: Age after which an entry is no longer served
+            max_entries: Maximum number of stored extractions
+            prompt_version: Extraction prompt version included in every key
+        """
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.prompt_version = prompt_version
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=5.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def make_key(self, query: str, model: str) -> str:
+        """Digest of the normalized query, model and prompt version"""
+        payload = json.dumps([normalize_query(query), model, self.prompt_version])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, query: str, model: str) -> Optional[Dict]:
+        """
+        Look up a cached extraction
+
+        Args:
+            query: Raw user query
+            model: Model that produced the extraction
+
+        Returns:
+            Extracted parameters, or None on a miss or expired entry
+        """
+        key = self.make_key(query, model)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT params, created_at FROM extractions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._conn.execute("DELETE FROM extractions WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE extractions SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, query: str, model: str, params: Dict) -> None:
+        """
+        Store an extraction, evicting the least recently used entries if full
+
+        Args:
+            query: Raw user query
+            model: Model that produced the extraction
+            params: Extracted parameters (JSON-serializable)
+        """
+        key = self.make_key(query, model)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extractions "
+                "(key, query, model, prompt_version, params, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, normalize_query(query), model, self.prompt_version, json.dumps(params), now, now)
+            )
+            self._conn.execute(
+                "DELETE FROM extractions WHERE key IN ("
+                "SELECT key FROM extractions ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """Delete expired entries and return how many were removed"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM extractions WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM extractions")
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters of this instance and the stored entry count"""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM extractions").fetchone()[0]
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": size,
+                "max_entries": self.max_entries,
+                "prompt_version": self.prompt_version,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,198 @@
+"""
+Factor Covariance Model for F2 Portfolio Recommender
+Low-rank plus diagonal covariance (S = B F B' + diag(d)) and its cvxpy risk
+term, for universes too large for a dense sample covariance
+
+Storage is O(n * k) for n tickers and k factors instead of O(n^2), and the
+risk term is ||chol(F)' B' w||^2 + sum(d * w^2), so an OptimizationSession
+on a factor model never contains an n x n matrix.
+
+Usage:
+    S = FactorCovariance.from_sectors(prices, sector_mapping)
+    session = OptimizationSession(mu, S, sector_mapper, max_sector_weight=0.35)
+    weights, performance = session.max_sharpe(risk_free_rate=0.04)
+"""
+import logging
+from typing import Dict, List, Optional
+
+import cvxpy as cp
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+logger = logging.getLogger(__name__)
+
+SPECIFIC_VARIANCE_FLOOR = 1e-8  # Keeps the diagonal term positive definite
+# The interior-point solver converges on large factor problems where cvxpy's
+# default QP pick (OSQP) runs out of iterations
+SOLVER = cp.CLARABEL if cp.CLARABEL in cp.installed_solvers() else None
+
+
+class FactorCovariance:
+    """
+    Annualized covariance S = B F B' + diag(d)
+
+    B holds the tickers' factor loadings (n x k), F the factor covariance
+    (k x k) and d the tickers' specific (idiosyncratic) variances.
+    """
+
+    def __init__(
+        self,
+        tickers: List[str],
+        loadings: np.ndarray,
+        factor_cov: np.ndarray,
+        specific_var: np.ndarray,
+        factor_names: Optional[List[str]] = None
+    ):
+        """
+        Initialize model
+
+        Args:
+            tickers: Row labels of the loadings
+            loadings: Factor loadings B, shape (n, k)
+            factor_cov: Factor covariance F, shape (k, k)
+            specific_var: Specific variances d, shape (n,)
+            factor_names: Labels of the k factors
+        """
+        self.tickers = pd.Index(tickers)
+        self.loadings = np.asarray(loadings, dtype=np.float64)
+        self.factor_cov = np.asarray(factor_cov, dtype=np.float64)
+        self.specific_var = np.maximum(np.asarray(specific_var, dtype=np.float64), SPECIFIC_VARIANCE_FLOOR)
+        self.factor_names = list(factor_names) if factor_names is not None else [
+            f"factor_{j}" for j in range(self.factor_cov.shape[0])
+        ]
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    @property
+    def n_factors(self) -> int:
+        return self.factor_cov.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the model's arrays"""
+        return self.loadings.nbytes + self.factor_cov.nbytes + self.specific_var.nbytes
+
+    def subset(self, tickers: List[str]) -> "FactorCovariance":
+        """Model restricted to some tickers (same factors)"""
+        rows = self.tickers.get_indexer(tickers)
+        if (rows < 0).any():
+            missing = [t for t, r in zip(tickers, rows) if r < 0]
+            raise KeyError(f"Tickers not in factor model: {missing}")
+        return FactorCovariance(
+            list(tickers), self.loadings[rows], self.factor_cov, self.specific_var[rows], self.factor_names
+        )
+
+    def variance(self, w: np.ndarray) -> float:
+        """Portfolio variance of a weight vector in ``tickers`` order"""
+        exposure = self.loadings.T @ w
+        return float(exposure @ self.factor_cov @ exposure + np.sum(self.specific_var * w * w))
+
+    def portfolio_variance(self, weights: Dict[str, float]) -> float:
+        """Portfolio variance of weights by ticker (missing tickers weigh 0)"""
+        w = pd.Series(weights, dtype=np.float64).reindex(self.tickers, fill_value=0.0).to_numpy()
+        return self.variance(w)
+
+    def to_dense(self) -> pd.DataFrame:
+        """Full n x n covariance matrix (O(n^2) memory; for small universes)"""
+        dense = self.loadings @ self.factor_cov @ self.loadings.T
+        dense[np.diag_indices_from(dense)] += self.specific_var
+        return pd.DataFrame(dense, index=self.tickers, columns=self.tickers)
+
+    @staticmethod
+    def _returns(prices: pd.DataFrame) -> np.ndarray:
+        """Demeaned daily returns; missing returns count as zero"""
+        returns = prices.pct_change().iloc[1:].fillna(0.0).to_numpy(dtype=np.float64)
+        return returns - returns.mean(axis=0)
+
+    @classmethod
+    def from_sectors(
+        cls,
+        prices: pd.DataFrame,
+        sector_mapping: Dict[str, str],
+        frequency: int = 252
+    ) -> "FactorCovariance":
+        """
+        Sector factor model
+
+        Each sector's factor is the equal-weighted average return of its
+        tickers; every ticker loads on its own sector's factor with its
+        regression beta, and the residual variance is its specific variance.
+
+        Args:
+            prices: Daily prices (dates x tickers)
+            sector_mapping: Ticker to sector ('Unknown' if missing)
+            frequency: Periods per year for annualization
+
+        Returns:
+            Annualized FactorCovariance with one factor per sector
+        """
+        tickers = prices.columns.tolist()
+        returns = cls._returns(prices)
+        sectors = pd.Index(sorted({sector_mapping.get(t, 'Unknown') for t in tickers}))
+        codes = sectors.get_indexer([sector_mapping.get(t, 'Unknown') for t in tickers])
+
+        # Sector averages as one sparse product: (T x n) @ (n x k)
+        membership = sp.csr_matrix(
+            (np.ones(len(tickers)), (np.arange(len(tickers)), codes)), shape=(len(tickers), len(sectors))
+        )
+        counts = np.asarray(membership.sum(axis=0)).ravel()
+        factors = np.asarray((membership.T @ returns.T).T) / counts
+
+        own_factor = factors[:, codes]
+        factor_var = np.einsum('ij,ij->j', own_factor, own_factor)
+        beta = np.divide(
+            np.einsum('ij,ij->j', returns, own_factor), factor_var,
+            out=np.zeros(len(tickers)), where=factor_var > 0
+        )
+        residuals = returns - own_factor * beta
+        dof = max(len(returns) - 1, 1)
+
+        loadings = np.zeros((len(tickers), len(sectors)))
+        loadings[np.arange(len(tickers)), codes] = beta
+        return cls(
+            tickers,
+            loadings,
+            factors.T @ factors / dof * frequency,
+            np.einsum('ij,ij->j', residuals, residuals) / dof * frequency,
+            sectors.tolist()
+        )
+
+    @classmethod
+    def from_pca(cls, prices: pd.DataFrame, n_components: int = 10, frequency: int = 252) -> "FactorCovariance":
+        """
+        Statistical factor model from the leading principal components
+
+        Args:
+            prices: Daily prices (dates x tickers)
+            n_components: Number of factors k
+            frequency: Periods per year for annualization
+
+        Returns:
+            Annualized FactorCovariance with k orthogonal factors
+        """
+        tickers = prices.columns.tolist()
+        returns = cls._returns(prices)
+        dof = max(len(returns) - 1, 1)
+        k = max(1, min(n_components, *returns.shape))
+
+        _, singular_values, vt = np.linalg.svd(returns, full_matrices=False)
+        loadings = vt[:k].T
+        factor_var = singular_values[:k] ** 2 / dof
+        total_var = np.einsum('ij,ij->j', returns, returns) / dof
+        specific_var = total_var - (loadings ** 2) @ factor_var
+        return cls(
+            tickers,
+            loadings,
+            np.diag(factor_var * frequency),
+            specific_var * frequency,
+            [f"pc_{j + 1}" for j in range(k)]
+        )
+
+
+def factor_variance(cov: FactorCovariance, w: cp.Expression) -> cp.Expression:
+    """cvxpy portfolio variance ||chol(F)' B' w||^2 + ||sqrt(d) * w||^2"""
+    chol = np.linalg.cholesky(cov.factor_cov + 1e-12 * np.eye(cov.n_factors))
+    exposure = chol.T @ (cov.loadings.T @ w)
+    return cp.sum_squares(exposure) + cp.sum_squares(cp.multiply(np.sqrt(cov.specific_var), w))
@@ -0,0 +1,181 @@
+"""
+Efficient Frontier Cache for F2 Portfolio Recommender
+Solves a grid of frontier portfolios once per (universe, constraints, estimates)
+and answers target-volatility / target-return queries by interpolation
+"""
+import hashlib
+import logging
+from typing import Callable, Dict, Hashable, List, Tuple
+
+import numpy as np
+import pandas as pd
+from pypfopt import EfficientFrontier
+from pypfopt.exceptions import OptimizationError
+
+from config_new import FRONTIER_CACHE_SIZE, FRONTIER_GRID_POINTS
+from estimation_cache import VersionedLRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class FrontierGrid:
+    """
+    Efficient portfolios sorted by volatility
+
+    Any two frontier portfolios satisfy the same linear constraints (budget,
+    sector caps, minimum weights), so a linear blend of neighbouring points is
+    itself feasible. Its return is the blend of the two returns and its
+    volatility is at most the blend of the two volatilities.
+    """
+
+    def __init__(
+        self,
+        mu: pd.Series,
+        S: pd.DataFrame,
+        weights: np.ndarray,
+    ):
+        """
+        Initialize grid from solved frontier portfolios
+
+        Args:
+            mu: Expected returns the grid was solved for
+            S: Covariance matrix the grid was solved for
+            weights: One row of weights (in ``mu.index`` order) per frontier point
+        """
+        self.tickers: List[str] = mu.index.tolist()
+        self._mu = mu.to_numpy(dtype=np.float64)
+        self._cov = S.loc[self.tickers, self.tickers].to_numpy(dtype=np.float64)
+
+        returns = weights @ self._mu
+        volatilities = np.sqrt(np.einsum('ij,jk,ik->i', weights, self._cov, weights))
+        order = np.argsort(volatilities, kind='stable')
+        self.weights = weights[order]
+        self.returns = returns[order]
+        self.volatilities = volatilities[order]
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    @staticmethod
+    def _interpolate(axis: np.ndarray, weights: np.ndarray, target: float) -> Tuple[np.ndarray, bool]:
+        """Blend the two grid rows bracketing ``target`` (clamped to the grid's ends)"""
+        if target <= axis[0]:
+            return weights[0].copy(), bool(target < axis[0])
+        if target >= axis[-1]:
+            return weights[-1].copy(), bool(target > axis[-1])
+
+        upper = int(np.searchsorted(axis, target, side='left'))
+        lower = upper - 1
+        span = axis[upper] - axis[lower]
+        t = (target - axis[lower]) / span if span > 0 else 0.0
+        return (1.0 - t) * weights[lower] + t * weights[upper], False
+
+    def weights_for_volatility(self, target_volatility: float) -> Tuple[Dict[str, float], bool]:
+        """
+        Frontier portfolio with (approximately) the requested volatility
+
+        Args:
+            target_volatility: Annual volatility, e.g. 0.15
+
+        Returns:
+            (weights by ticker, True if the target lay outside the frontier)
+        """
+        weights, clamped = self._interpolate(self.volatilities, self.weights, target_volatility)
+        return dict(zip(self.tickers, weights.tolist())), clamped
+
+    def weights_for_return(self, target_return: float) -> Tuple[Dict[str, float], bool]:
+        """
+        Frontier portfolio with the requested expected return
+
+        Args:
+            target_return: Annual expected return, e.g. 0.12
+
+        Returns:
+            (weights by ticker, True if the target lay outside the frontier)
+        """
+        weights, clamped = self._interpolate(self.returns, self.weights, target_return)
+        return dict(zip(self.tickers, weights.tolist())), clamped
+
+    def performance(self, weights: Dict[str, float], risk_free_rate: float) -> Tuple[float, float, float]:
+        """Expected return, volatility and Sharpe ratio of a weight vector"""
+        w = np.array([weights.get(ticker, 0.0) for ticker in self.tickers])
+        expected_return = float(w @ self._mu)
+        volatility = float(np.sqrt(w @ self._cov @ w))
+        sharpe = (expected_return - risk_free_rate) / volatility if volatility > 0 else 0.0
+        return expected_return, volatility, sharpe
+
+    @classmethod
+    def solve(
+        cls,
+        make_frontier: Callable[[], EfficientFrontier],
+        n_points: int = FRONTIER_GRID_POINTS
+    ) -> "FrontierGrid":
+        """
+        Trace the frontier between its minimum-volatility and maximum-return ends
+
+        Args:
+            make_frontier: Builds a fresh, fully constrained EfficientFrontier
+            n_points: Number of target returns to solve for
+
+        Returns:
+            Solved grid
+        """
+        ef = make_frontier()
+        mu, S = ef.expected_returns, ef.cov_matrix
+        tickers = ef.tickers
+
+        min_vol = ef.min_volatility()
+        rows = [np.array([min_vol[t] for t in tickers])]
+        min_return = float(rows[0] @ mu)
+        max_return = make_frontier()._max_return()
+
+        # One instance for the sweep: efficient_return only updates the
+        # target_return parameter after the first call, so the problem is
+        # compiled once
+        sweep = make_frontier()
+        for target in np.linspace(min_return, max_return, n_points)[1:]:
+            try:
+                # Stay a hair inside the maximum so the last solve is feasible
+                solved = sweep.efficient_return(min(target, max_return * (1 - 1e-6)))
+            except (OptimizationError, ValueError) as e:
+                logger.debug(f"Frontier point at return {target:.4f} skipped: {e}")
+                continue
+            rows.append(np.array([solved[t] for t in tickers]))
+
+        weights = np.clip(np.vstack(rows), 0.0, None)
+        weights /= weights.sum(axis=1, keepdims=True)
+
+        mu = pd.Series(mu, index=tickers)
+        S = pd.DataFrame(S, index=tickers, columns=tickers)
+        logger.info(f"Solved efficient frontier: {len(weights)} points, {len(tickers)} tickers")
+        return cls(mu, S, weights)
+
+
+class FrontierCache(VersionedLRUCache):
+    """
+    LRU cache of solved FrontierGrids
+
+    Keys identify the optimization problem: universe, sector constraints and
+    a digest of the (mu, S) estimates the frontier was solved for.
+    """
+
+    def __init__(self, maxsize: int = FRONTIER_CACHE_SIZE):
+        super().__init__(maxsize)
+
+    @staticmethod
+    def make_key(
+        mu: pd.Series,
+        S: pd.DataFrame,
+        sector_mapper: Dict[str, str],
+        max_sector_weight: float
+    ) -> Hashable:
+        """Build a cache key from the estimates and the constraint set"""
+        digest = hashlib.sha1()
+        digest.update(np.ascontiguousarray(mu.to_numpy(dtype=np.float64)).tobytes())
+        digest.update(np.ascontiguousarray(S.to_numpy(dtype=np.float64)).tobytes())
+        return (
+            tuple(mu.index),
+            tuple(sorted(sector_mapper.items())),
+            max_sector_weight,
+            digest.hexdigest(),
+        )
@@ -3,15 +3,21 @@ Guardrails System for F2 Portfolio Recommender Agent
 Implements safety controls: PII detection, disclaimer enforcement, output validation
 Ensures regulatory compliance and responsible AI practices
 """
-import re
 import json
+from collections import deque
 from typing import Dict, List, Tuple, Any, Optional
 
 # Try to import from new config, fall back to old config
 try:
-    from config_new import PII_PATTERNS, MANDATORY_DISCLAIMER
+    from config_new import PII_PATTERNS, MANDATORY_DISCLAIMER, VIOLATION_LOG_SIZE
 except ImportError:
     from config import PII_PATTERNS, MANDATORY_DISCLAIMER
+    VIOLATION_LOG_SIZE = 1000
+
+from text_scanner import TextScanner
+
+PII_KEYWORDS = ['ssn', 'social security', 'credit card', 'pan card', 'aadhaar', 'passport']
+MALICIOUS_KEYWORDS = ['hack', 'exploit', 'bypass', 'manipulate system']
 
 
 class GuardrailSystem:
@@ -21,34 +27,38 @@ class GuardrailSystem:
     """
     
     def __init__(self):
-        self.pii_patterns = [re.compile(pattern) for pattern in PII_PATTERNS]
+        # PII patterns and both keyword lists in one scan of the text
+        self.scanner = TextScanner(
+            {"PII": PII_PATTERNS},
+            {"PII": PII_KEYWORDS, "MALICIOUS": MALICIOUS_KEYWORDS}
+        )
         self.disclaimer = MANDATORY_DISCLAIMER
-        self.violation_log = []
+        # Bounded: one agent (and its guardrails) serves every app session
+        self.violation_log = deque(maxlen=VIOLATION_LOG_SIZE)
     
-    def detect_pii(self, text: str) -> Tuple[bool, List[str]]:
+    def detect_pii(self, text: str, matches: Optional[List[Dict]] = None) -> Tuple[bool, List[str]]:
         """
         Detect Personal Identifiable Information in user input
         
         Args:
             text: User input text to scan
+            matches: Result of self.scanner.scan(text), if already available
             
         Returns:
             Tuple of (has_pii: bool, detected_patterns: List[str])
         """
-        detected = []
+        if matches is None:
+            matches = self.scanner.scan(text)
         
-        for pattern in self.pii_patterns:
-            matches = pattern.findall(text)
-            if matches:
-                detected.extend([f"PII Pattern: {m[:4]}***" for m in matches])
-        
-        # Additional keyword-based detection
-        pii_keywords = ['ssn', 'social security', 'credit card', 'pan card', 'aadhaar', 'passport']
-        text_lower = text.lower()
-        
-        for keyword in pii_keywords:
-            if keyword in text_lower:
-                detected.append(f"PII Keyword: {keyword}")
+        detected = []
+        for match in matches:
+            if match["category"] != "PII":
+                continue
+            if match["source"] == "pattern":
+                detected.append(f"PII Pattern: {match['match'][:4]}***")
+            else:
+                # Additional keyword-based detection
+                detected.append(f"PII Keyword: {match['match']}")
         
         has_pii = len(detected) > 0
         
@@ -77,8 +87,10 @@ class GuardrailSystem:
             "sanitized_input": user_input
         }
         
+        matches = self.scanner.scan(user_input)
+        
         # PII check
-        has_pii, pii_detected = self.detect_pii(user_input)
+        has_pii, pii_detected = self.detect_pii(user_input, matches)
         if has_pii:
             result["is_valid"] = False
             result["violations"].append({
@@ -95,8 +107,7 @@ class GuardrailSystem:
             })
         
         # Check for malicious patterns
-        malicious_keywords = ['hack', 'exploit', 'bypass', 'manipulate system']
-        if any(keyword in user_input.lower() for keyword in malicious_keywords):
+        if any(match["category"] == "MALICIOUS" for match in matches):
             result["is_valid"] = False
             result["violations"].append({
                 "type": "SUSPICIOUS_INTENT",
@@ -236,7 +247,7 @@ class GuardrailSystem:
         """
         return {
             "total_violations": len(self.violation_log),
-            "violations": self.violation_log
+            "violations": list(self.violation_log)
         }
 
 
@@ -0,0 +1,185 @@
+"""
+Background Jobs for F2 Portfolio Recommender
+Thread-pool job queue for recommendation requests, so app reruns never block
+on (or throw away) a running LLM call or solve
+
+A job is submitted once and identified by its id; a rerun of the app script
+looks the job up again and shows its progress instead of starting over.
+Submitting a request whose identical twin is still queued or running returns
+the existing job. Results that carry a "stream" of text chunks (see
+CerebrasPortfolioAgent.process_query_stream) are consumed by the worker, so
+the text so far can be shown while it arrives. Generator functions publish
+each yielded value as the job's result so far (e.g. the solve before the
+projections that follow it); the last one is the final result.
+
+Usage:
+    job = jobs.submit(agent.recommend, params, key=JobQueue.make_key("recommend", params))
+    ...
+    job = jobs.get(job_id)
+    if job.wait(0.25):
+        show(job.result)
+"""
+import contextvars
+import hashlib
+import inspect
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional
+
+from config_new import JOB_HISTORY_SIZE, JOB_WORKERS
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, STREAMING, DONE, FAILED = "queued", "running", "streaming", "done", "failed"
+
+
+class Job:
+    """One submitted request and its (partial) outcome"""
+
+    def __init__(self, key: Optional[Hashable]):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.status = QUEUED
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.chunks: List[str] = []
+        self.submitted_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._done = threading.Event()
+
+    def done(self) -> bool:
+        """True once the job finished or failed"""
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the job finishes or the timeout passes
+
+        Returns:
+            True if the job finished
+        """
+        return self._done.wait(timeout)
+
+    def text(self) -> str:
+        """Streamed text received so far"""
+        return "".join(self.chunks)
+
+    def _finish(self, status: str) -> None:
+        self.status = status
+        self.finished_at = time.time()
+        self._done.set()
+
+
+class JobQueue:
+    """
+    Thread pool running submitted jobs, with de-duplication of in-flight requests
+
+    Finished jobs stay retrievable until JOB_HISTORY_SIZE newer jobs have
+    finished; queued and running jobs are always kept.
+    """
+
+    def __init__(self, max_workers: int = JOB_WORKERS, history_size: int = JOB_HISTORY_SIZE):
+        """
+        Initialize queue
+
+        Args:
+            max_workers: Jobs running at once (work is mostly LLM round trips)
+            history_size: Finished jobs kept for lookup
+        """
+        self.history_size = history_size
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._inflight: Dict[Hashable, Job] = {}
+        self._finished: Deque[str] = deque()
+        self.submitted = 0
+        self.deduplicated = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """De-duplication key from JSON-serializable request parts"""
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def submit(self, fn: Callable, *args: Any, key: Optional[Hashable] = None, **kwargs: Any) -> Job:
+        """
+        Run fn(*args, **kwargs) in the background
+
+        Args:
+            fn: Callable to run
+            key: Identifies the request; while a job with the same key is
+                 queued or running it is returned instead (None: never shared)
+
+        Returns:
+            The new or the identical in-flight job
+        """
+        with self._lock:
+            if key is not None and key in self._inflight:
+                self.deduplicated += 1
+                return self._inflight[key]
+            job = Job(key)
+            self.submitted += 1
+            self._jobs[job.id] = job
+            if key is not None:
+                self._inflight[key] = job
+
+        # The worker records its spans in the submitter's trace, if any
+        self._pool.submit(contextvars.copy_context().run, self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """The job with this id, or None if unknown or expired"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: Job, fn: Callable, args: tuple, kwargs: Dict) -> None:
+        job.status = RUNNING
+        try:
+            result = fn(*args, **kwargs)
+            if inspect.isgenerator(result):
+                stages, result = result, None
+                for stage in stages:
+                    result = stage
+                    job.result = stage
+                    job.status = STREAMING
+            if isinstance(result, dict) and "stream" in result:
+                stream = result["stream"]
+                job.result = {k: v for k, v in result.items() if k != "stream"}
+                job.status = STREAMING
+                for chunk in stream:
+                    job.chunks.append(chunk)
+                # The finished stream has filled in the final text
+                result = {k: v for k, v in result.items() if k != "stream"}
+            job.result = result
+            status = DONE
+        except Exception as e:
+            logger.exception(f"Job {job.id} failed")
+            job.error = e
+            status = FAILED
+
+        with self._lock:
+            if job.key is not None and self._inflight.get(job.key) is job:
+                del self._inflight[job.key]
+            self._finished.append(job.id)
+            while len(self._finished) > self.history_size:
+                self._jobs.pop(self._finished.popleft(), None)
+        job._finish(status)
+
+    def stats(self) -> Dict:
+        """Submission, de-duplication and occupancy counters"""
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "deduplicated": self.deduplicated,
+                "in_flight": sum(1 for job in self._jobs.values() if not job.done()),
+                "kept": len(self._jobs),
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting jobs; optionally wait for the running ones"""
+        self._pool.shutdown(wait=wait)
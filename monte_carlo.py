@@ -0,0 +1,195 @@
+"""
+Monte Carlo Simulator for F2 Portfolio Recommender
+Vectorized wealth-path projections for an optimized portfolio
+"""
+import logging
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from config_new import MC_CHUNK_ELEMENTS, MC_PATHS, MC_PERCENTILES, MC_STEPS_PER_YEAR
+from factor_model import FactorCovariance
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+class MonteCarloSimulator:
+    """
+    Simulates a constantly rebalanced portfolio over an investment horizon
+
+    With fixed weights the portfolio's return each step is w . r, so paths are
+    generated at portfolio level: a lognormal walk matching w . mu and
+    sqrt(w' S w), or a bootstrap of the portfolio's historical daily returns.
+    Paths are produced in chunks of whole paths so memory stays bounded by
+    ``chunk_elements`` regardless of horizon and path count.
+    """
+
+    def __init__(
+        self,
+        n_paths: int = MC_PATHS,
+        seed: Optional[int] = None,
+        chunk_elements: int = MC_CHUNK_ELEMENTS,
+        percentiles: Sequence[float] = MC_PERCENTILES
+    ):
+        """
+        Initialize simulator
+
+        Args:
+            n_paths: Number of simulated paths
+            seed: Random seed (same seed and settings give identical results)
+            chunk_elements: Maximum path x step values held in memory at once
+            percentiles: Wealth percentiles reported for each year
+        """
+        self.n_paths = n_paths
+        self.seed = seed
+        self.chunk_elements = chunk_elements
+        self.percentiles = list(percentiles)
+
+    def simulate(
+        self,
+        weights: Dict[str, float],
+        mu: pd.Series,
+        S: pd.DataFrame,
+        horizon_years: int,
+        initial_value: float = 1.0,
+        steps_per_year: int = MC_STEPS_PER_YEAR
+    ) -> Dict:
+        """
+        Project wealth from annual expected returns and covariance
+
+        Log-returns are normal with the portfolio's variance and a drift chosen
+        so that expected wealth grows at the portfolio's expected return.
+
+        Args:
+            weights: Portfolio weights by ticker
+            mu: Annual expected returns
+            S: Annual covariance matrix (or FactorCovariance)
+            horizon_years: Investment horizon in years
+            initial_value: Starting portfolio value
+            steps_per_year: Simulation steps per year
+
+        Returns:
+            Simulation summary (see _simulate)
+        """
+        tickers = list(weights)
+        w = np.array([weights[t] for t in tickers])
+        expected_return = float(w @ mu.reindex(tickers).to_numpy())
+        if isinstance(S, FactorCovariance):
+            variance = S.portfolio_variance(weights)
+        else:
+            variance = float(w @ S.loc[tickers, tickers].to_numpy() @ w)
+
+        step_variance = variance / steps_per_year
+        step_drift = np.log1p(expected_return) / steps_per_year - step_variance / 2
+        step_std = np.sqrt(step_variance)
+
+        def sample(rng: np.random.Generator, shape) -> np.ndarray:
+            steps = rng.standard_normal(shape)
+            steps *= step_std
+            steps += step_drift
+            return steps
+
+        return self._simulate(sample, horizon_years, steps_per_year, initial_value)
+
+    def simulate_bootstrap(
+        self,
+        weights: Dict[str, float],
+        returns: pd.DataFrame,
+        horizon_years: int,
+        initial_value: float = 1.0
+    ) -> Dict:
+        """
+        Project wealth by resampling historical daily returns
+
+        Args:
+            weights: Portfolio weights by ticker
+            returns: Daily returns (e.g. PortfolioDataLoader.get_returns)
+            horizon_years: Investment horizon in years
+            initial_value: Starting portfolio value
+
+        Returns:
+            Simulation summary (see _simulate)
+        """
+        tickers = [t for t in weights if t in returns.columns]
+        if not tickers:
+            raise ValueError("No return history for any portfolio ticker")
+        w = np.array([weights[t] for t in tickers])
+        daily = returns[tickers].fillna(0.0).to_numpy() @ w
+        log_daily = np.log1p(daily)
+
+        def sample(rng: np.random.Generator, shape) -> np.ndarray:
+            return log_daily[rng.integers(0, len(log_daily), size=shape)]
+
+        return self._simulate(sample, horizon_years, TRADING_DAYS_PER_YEAR, initial_value)
+
+    def _simulate(
+        self,
+        sample: Callable[[np.random.Generator, tuple], np.ndarray],
+        horizon_years: int,
+        steps_per_year: int,
+        initial_value: float
+    ) -> Dict:
+        """
+        Generate paths chunk by chunk and summarize them
+
+        Args:
+            sample: Draws a (paths, steps) array of per-step log-returns
+            horizon_years: Investment horizon in years
+            steps_per_year: Steps per year drawn by ``sample``
+            initial_value: Starting portfolio value
+
+        Returns:
+            Dictionary with yearly percentile wealth bands, probability of loss,
+            final-wealth statistics and the max-drawdown distribution
+        """
+        if horizon_years < 1:
+            raise ValueError("horizon_years must be at least 1")
+
+        rng = np.random.default_rng(self.seed)
+        n_steps = horizon_years * steps_per_year
+        chunk_paths = max(1, self.chunk_elements // n_steps)
+        year_ends = np.arange(1, horizon_years + 1) * steps_per_year - 1
+
+        yearly_log_wealth = np.empty((self.n_paths, horizon_years))
+        max_drawdowns = np.empty(self.n_paths)
+
+        for start in range(0, self.n_paths, chunk_paths):
+            stop = min(start + chunk_paths, self.n_paths)
+            log_wealth = sample(rng, (stop - start, n_steps))
+            np.cumsum(log_wealth, axis=1, out=log_wealth)
+            yearly_log_wealth[start:stop] = log_wealth[:, year_ends]
+
+            # Drawdown from the running peak (the starting value counts as a peak)
+            peak = np.maximum.accumulate(log_wealth, axis=1)
+            np.maximum(peak, 0.0, out=peak)
+            np.subtract(log_wealth, peak, out=peak)
+            max_drawdowns[start:stop] = -np.expm1(peak.min(axis=1))
+
+        wealth = initial_value * np.exp(yearly_log_wealth)
+        final = wealth[:, -1]
+        bands = np.percentile(wealth, self.percentiles, axis=0)
+
+        logger.info(f"Simulated {self.n_paths} paths over {horizon_years} years ({n_steps} steps)")
+
+        return {
+            "years": list(range(horizon_years + 1)),
+            "percentile_bands": {
+                p: [initial_value] + band.tolist() for p, band in zip(self.percentiles, bands)
+            },
+            "probability_of_loss": float(np.mean(final < initial_value)),
+            "final_value": {
+                "mean": float(final.mean()),
+                "median": float(np.median(final)),
+            },
+            "max_drawdown": {
+                "mean": float(max_drawdowns.mean()),
+                "percentiles": {
+                    p: float(v) for p, v in zip(self.percentiles, np.percentile(max_drawdowns, self.percentiles))
+                },
+            },
+            "n_paths": self.n_paths,
+            "horizon_years": horizon_years,
+        }
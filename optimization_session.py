@@ -0,0 +1,263 @@
+"""
+Optimization Sessions for F2 Portfolio Recommender
+Compiled cvxpy problems kept per (universe, estimates, constraint set) so that
+re-optimizing with a new target return, target volatility, risk aversion or
+risk-free rate only updates a parameter and warm-starts the solver
+
+Building an EfficientFrontier and canonicalizing its problem dominates the
+cost of a small solve; a session pays it once per objective and every later
+call goes straight to the solver from the previous solution.
+
+Usage:
+    session = OptimizationSession(mu, S, sector_mapper, max_sector_weight=0.35)
+    weights, performance = session.efficient_return(0.12)
+    weights, performance = session.efficient_return(0.14)   # parameter update + warm start
+"""
+import hashlib
+import logging
+import threading
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+import cvxpy as cp
+import numpy as np
+import pandas as pd
+from pypfopt.exceptions import OptimizationError
+
+from config_new import SESSION_CACHE_SIZE
+from estimation_cache import VersionedLRUCache
+from factor_model import SOLVER as FACTOR_SOLVER, FactorCovariance, factor_variance
+
+logger = logging.getLogger(__name__)
+
+Solution = Tuple[Dict[str, float], Tuple[float, float, float]]
+
+
+class _CompiledProblem:
+    """One objective's problem with its variables and parameters"""
+
+    def __init__(
+        self,
+        problem: cp.Problem,
+        weights: Callable[[], np.ndarray],
+        parameters: Optional[Dict[str, cp.Parameter]] = None
+    ):
+        self.problem = problem
+        self.weights = weights
+        self.parameters = parameters or {}
+
+
+class OptimizationSession:
+    """
+    Long-only mean-variance problems for one universe, estimate and constraint set
+
+    Each objective is compiled on first use; afterwards only its parameters
+    change and the solver is warm-started. Calls on one session are
+    serialized, since cvxpy problems hold solver state.
+    """
+
+    def __init__(
+        self,
+        mu: pd.Series,
+        S,
+        sector_mapper: Dict[str, str],
+        max_sector_weight: float,
+        min_weight: float = 0.01,
+        solver: Optional[str] = None
+    ):
+        """
+        Initialize session
+
+        Args:
+            mu: Annual expected returns by ticker
+            S: Annual covariance (DataFrame or FactorCovariance)
+            sector_mapper: Ticker to sector
+            max_sector_weight: Upper bound on every sector's total weight
+            min_weight: Lower bound on every weight
+            solver: cvxpy solver (default: cvxpy's choice for dense
+                    covariances, as EfficientFrontier does; Clarabel for factor models)
+        """
+        self.tickers: List[str] = mu.index.tolist()
+        self.max_sector_weight = max_sector_weight
+        self.min_weight = min_weight
+        self._mu = mu.to_numpy(dtype=np.float64)
+
+        if isinstance(S, FactorCovariance):
+            self._factor = S.subset(self.tickers)
+            self._cov = None
+            self.solver = solver or FACTOR_SOLVER
+        else:
+            self._factor = None
+            self._cov = S.loc[self.tickers, self.tickers].to_numpy(dtype=np.float64)
+            self.solver = solver
+
+        sectors = sorted({sector_mapper[t] for t in self.tickers if t in sector_mapper})
+        self._sector_members = [
+            np.flatnonzero([sector_mapper.get(t) == sector for t in self.tickers]) for sector in sectors
+        ]
+
+        self.compiles = 0
+        self.solves = 0
+        self._problems: Dict[str, _CompiledProblem] = {}
+        self._max_return: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _risk(self, w: cp.Variable) -> cp.Expression:
+        """Portfolio variance"""
+        if self._factor is None:
+            return cp.quad_form(w, cp.psd_wrap(self._cov))
+        return factor_variance(self._factor, w)
+
+    def _variance(self, w: np.ndarray) -> float:
+        if self._factor is None:
+            return float(w @ self._cov @ w)
+        return self._factor.variance(w)
+
+    def _constraints(self, w: cp.Variable, budget) -> List[cp.Constraint]:
+        """Budget, weight bounds and sector caps, all scaled by budget"""
+        constraints = [cp.sum(w) == budget, w >= self.min_weight * budget, w <= budget]
+        for members in self._sector_members:
+            constraints.append(cp.sum(w[members]) <= self.max_sector_weight * budget)
+        return constraints
+
+    def _compile(self, objective: str) -> _CompiledProblem:
+        """Build the problem for an objective"""
+        n = len(self.tickers)
+        w = cp.Variable(n)
+
+        if objective == "max_sharpe":
+            # Homogenized: min y'Sy with (mu - rf)'y = 1 and the weights y / sum(y)
+            kappa = cp.Variable()
+            rf = cp.Parameter(name="risk_free_rate")
+            constraints = self._constraints(w, kappa) + [self._mu @ w - rf * cp.sum(w) == 1, kappa >= 0]
+            return _CompiledProblem(
+                cp.Problem(cp.Minimize(self._risk(w)), constraints),
+                lambda: None if w.value is None else w.value / kappa.value,
+                {"risk_free_rate": rf}
+            )
+        if objective == "min_volatility":
+            return _CompiledProblem(cp.Problem(cp.Minimize(self._risk(w)), self._constraints(w, 1.0)), lambda: w.value)
+        if objective == "efficient_return":
+            target = cp.Parameter(name="target_return")
+            problem = cp.Problem(cp.Minimize(self._risk(w)), self._constraints(w, 1.0) + [self._mu @ w >= target])
+            return _CompiledProblem(problem, lambda: w.value, {"target_return": target})
+        if objective == "efficient_risk":
+            target = cp.Parameter(name="target_variance", nonneg=True)
+            problem = cp.Problem(cp.Maximize(self._mu @ w), self._constraints(w, 1.0) + [self._risk(w) <= target])
+            return _CompiledProblem(problem, lambda: w.value, {"target_variance": target})
+        if objective == "max_quadratic_utility":
+            delta = cp.Parameter(name="risk_aversion", nonneg=True)
+            problem = cp.Problem(cp.Maximize(self._mu @ w - 0.5 * delta * self._risk(w)), self._constraints(w, 1.0))
+            return _CompiledProblem(problem, lambda: w.value, {"risk_aversion": delta})
+        if objective == "max_return":
+            return _CompiledProblem(cp.Problem(cp.Maximize(self._mu @ w), self._constraints(w, 1.0)), lambda: w.value)
+        raise ValueError(f"Unknown objective: {objective}")
+
+    def _run(self, objective: str, **values: float) -> np.ndarray:
+        """Set the objective's parameters, solve (warm) and return the raw weights"""
+        compiled = self._problems.get(objective)
+        if compiled is None:
+            compiled = self._compile(objective)
+            self._problems[objective] = compiled
+            self.compiles += 1
+        for name, value in values.items():
+            compiled.parameters[name].value = value
+
+        try:
+            compiled.problem.solve(solver=self.solver, warm_start=True)
+        except cp.error.SolverError as e:
+            raise OptimizationError(f"Solver failed: {e}") from e
+        self.solves += 1
+        if compiled.problem.status not in (cp.OPTIMAL, cp.OPTIMAL_INACCURATE):
+            raise OptimizationError(f"Solver status: {compiled.problem.status}")
+        weights = compiled.weights()
+        if weights is None:
+            raise OptimizationError("Solver returned no weights")
+        return np.asarray(weights, dtype=np.float64).round(16) + 0.0
+
+    def _solution(self, weights: np.ndarray, risk_free_rate: float) -> Solution:
+        """Cleaned weights (as EfficientFrontier.clean_weights) and performance of the raw weights"""
+        expected_return = float(weights @ self._mu)
+        volatility = float(np.sqrt(max(self._variance(weights), 0.0)))
+        sharpe = (expected_return - risk_free_rate) / volatility if volatility > 0 else 0.0
+
+        cleaned = weights.copy()
+        cleaned[np.abs(cleaned) < 1e-4] = 0
+        cleaned = np.round(cleaned, 5)
+        return dict(zip(self.tickers, cleaned.tolist())), (expected_return, volatility, sharpe)
+
+    def max_return(self) -> float:
+        """Highest expected return any feasible portfolio reaches (solved once)"""
+        with self._lock:
+            if self._max_return is None:
+                self._max_return = float(self._run("max_return") @ self._mu)
+            return self._max_return
+
+    def min_volatility(self, risk_free_rate: float = 0.02) -> Solution:
+        """Minimum-variance portfolio"""
+        with self._lock:
+            return self._solution(self._run("min_volatility"), risk_free_rate)
+
+    def max_sharpe(self, risk_free_rate: float = 0.02) -> Solution:
+        """Maximum Sharpe ratio portfolio"""
+        if self._mu.max() <= risk_free_rate:
+            raise ValueError("at least one of the assets must have an expected return exceeding the risk-free rate")
+        with self._lock:
+            return self._solution(self._run("max_sharpe", risk_free_rate=risk_free_rate), risk_free_rate)
+
+    def efficient_return(self, target_return: float, risk_free_rate: float = 0.02) -> Solution:
+        """Minimum-variance portfolio with at least the target expected return"""
+        if target_return > self.max_return():
+            raise ValueError("target_return must be lower than the maximum possible return")
+        with self._lock:
+            return self._solution(self._run("efficient_return", target_return=target_return), risk_free_rate)
+
+    def efficient_risk(self, target_volatility: float, risk_free_rate: float = 0.02) -> Solution:
+        """Maximum-return portfolio with at most the target volatility"""
+        with self._lock:
+            weights = self._run("efficient_risk", target_variance=target_volatility ** 2)
+            return self._solution(weights, risk_free_rate)
+
+    def max_quadratic_utility(self, risk_aversion: float = 1.0, risk_free_rate: float = 0.02) -> Solution:
+        """Portfolio maximizing mu'w - risk_aversion / 2 * w'Sw"""
+        if risk_aversion <= 0:
+            raise ValueError("risk_aversion must be greater than zero")
+        with self._lock:
+            weights = self._run("max_quadratic_utility", risk_aversion=risk_aversion)
+            return self._solution(weights, risk_free_rate)
+
+
+class SessionCache(VersionedLRUCache):
+    """
+    LRU cache of OptimizationSessions
+
+    Keys identify the compiled problems: universe, sector constraints,
+    weight floor and a digest of the (mu, S) estimates.
+    """
+
+    def __init__(self, maxsize: int = SESSION_CACHE_SIZE):
+        super().__init__(maxsize)
+
+    @staticmethod
+    def make_key(
+        mu: pd.Series,
+        S,
+        sector_mapper: Dict[str, str],
+        max_sector_weight: float,
+        min_weight: float
+    ) -> Hashable:
+        """Build a cache key from the estimates and the constraint set"""
+        digest = hashlib.sha1()
+        digest.update(np.ascontiguousarray(mu.to_numpy(dtype=np.float64)).tobytes())
+        if isinstance(S, FactorCovariance):
+            S = S.subset(mu.index.tolist())
+            for array in (S.loadings, S.factor_cov, S.specific_var):
+                digest.update(np.ascontiguousarray(array).tobytes())
+        else:
+            digest.update(np.ascontiguousarray(S.loc[mu.index, mu.index].to_numpy(dtype=np.float64)).tobytes())
+        return (
+            tuple(mu.index),
+            tuple(sorted(sector_mapper.items())),
+            max_sector_weight,
+            min_weight,
+            digest.hexdigest(),
+        )
@@ -0,0 +1,208 @@
+"""
+Parallel Optimizer for F2 Portfolio Recommender
+Fans batches of optimization requests out to a pool of pre-warmed worker processes
+"""
+import logging
+import multiprocessing
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor, wait as wait_futures
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from config_new import (
+    LOOKBACK_PERIOD_DAYS, PARALLEL_BATCH_TIMEOUT, PARALLEL_CHUNK_SIZE, PARALLEL_WORKERS
+)
+from data_loader import PortfolioDataLoader
+from portfolio_optimizer_csv import CSVPortfolioOptimizer
+
+logger = logging.getLogger(__name__)
+
+# Per-process optimizer, created once by _init_worker
+_worker_optimizer: Optional[CSVPortfolioOptimizer] = None
+
+
+def _init_worker(
+    portfolio_csv: Path,
+    prices_csv: Path,
+    store_dir: Optional[Path],
+    worker_pids: multiprocessing.SimpleQueue
+) -> None:
+    """Register the worker's pid, then build its optimizer and map the shared price matrix once"""
+    global _worker_optimizer
+    worker_pids.put(os.getpid())
+    loader = PortfolioDataLoader(portfolio_csv, prices_csv, store_dir=store_dir)
+    loader.get_price_matrix()
+    _worker_optimizer = CSVPortfolioOptimizer(loader)
+
+
+def _run_chunk(requests: List[Dict]) -> List[Dict]:
+    """Optimize one chunk of requests inside a worker"""
+    return _worker_optimizer.optimize_many(requests)
+
+
+class ParallelOptimizer:
+    """
+    Process-pool front end to CSVPortfolioOptimizer.optimize_many
+
+    Every worker opens the binary price store itself, so the price history is
+    memory-mapped from the same file (one copy in the OS page cache) and only
+    the small request dictionaries cross the process boundary. Requests with
+    the same universe are chunked together so workers still share (mu, S)
+    estimates and solves within a chunk.
+
+    Usage:
+        with ParallelOptimizer(PORTFOLIO_CSV, PORTFOLIO_PRICES_CSV) as pool:
+            results = pool.optimize_many(requests)
+    """
+
+    def __init__(
+        self,
+        portfolio_csv: Path,
+        prices_csv: Path,
+        store_dir: Optional[Path] = None,
+        max_workers: int = PARALLEL_WORKERS,
+        batch_timeout: Optional[float] = PARALLEL_BATCH_TIMEOUT,
+        chunk_size: int = PARALLEL_CHUNK_SIZE
+    ):
+        """
+        Initialize the executor settings (workers start on first use)
+
+        Args:
+            portfolio_csv: Path to Portfolio.csv
+            prices_csv: Path to Portfolio_prices.csv
+            store_dir: Location of the binary price store (default: next to the CSV)
+            max_workers: Number of worker processes
+            batch_timeout: Seconds to wait for a whole batch (None waits forever)
+            chunk_size: Maximum requests sent to a worker per task
+        """
+        self.portfolio_csv = Path(portfolio_csv)
+        self.prices_csv = Path(prices_csv)
+        self.store_dir = store_dir
+        self.max_workers = max(1, max_workers)
+        self.batch_timeout = batch_timeout
+        self.chunk_size = max(1, chunk_size)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pid_queue: Optional[multiprocessing.SimpleQueue] = None
+        self._pids: List[int] = []
+
+    def __enter__(self) -> "ParallelOptimizer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """Build the price store once, then start and pre-warm the workers"""
+        if self._executor is not None:
+            return
+
+        # Build/refresh the store in the parent so workers do not race to write it
+        PortfolioDataLoader(self.portfolio_csv, self.prices_csv, store_dir=self.store_dir).get_price_matrix()
+
+        # Workers report their pids, so stuck ones can be killed without pool internals
+        self._pid_queue = multiprocessing.SimpleQueue()
+        self._pids = []
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(self.portfolio_csv, self.prices_csv, self.store_dir, self._pid_queue)
+        )
+        logger.info(f"Started {self.max_workers} optimizer worker processes")
+
+    def close(self, wait: bool = True) -> None:
+        """Shut the worker pool down"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+            self._pid_queue.close()
+            self._pid_queue = None
+
+    def worker_pids(self) -> List[int]:
+        """Pids of the worker processes started so far"""
+        if self._pid_queue is not None:
+            while not self._pid_queue.empty():
+                self._pids.append(self._pid_queue.get())
+        return list(self._pids)
+
+    def _terminate(self) -> None:
+        """Kill the worker processes and drop the pool (a running solve cannot be cancelled)"""
+        if self._executor is None:
+            return
+        for pid in self.worker_pids():
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass  # Already exited
+        executor, self._executor = self._executor, None
+        # The pool notices its dead workers, reaps them and stops; a worker
+        # still starting up finishes its initializer and exits
+        executor.shutdown(wait=True, cancel_futures=True)
+        self._pid_queue.close()
+        self._pid_queue = None
+
+    def _chunks(self, requests: List[Dict]) -> List[List[int]]:
+        """Group request indices by universe and lookback, then split into chunks"""
+        groups: Dict[Tuple, List[int]] = {}
+        for i, request in enumerate(requests):
+            key = (
+                tuple(sorted(request.get('sector_preferences') or [])),
+                tuple(sorted(request.get('exclude_tickers') or [])),
+                request.get('lookback_days', LOOKBACK_PERIOD_DAYS)
+            )
+            groups.setdefault(key, []).append(i)
+
+        return [
+            indices[start:start + self.chunk_size]
+            for indices in groups.values()
+            for start in range(0, len(indices), self.chunk_size)
+        ]
+
+    def optimize_many(self, requests: List[Dict]) -> List[Dict]:
+        """
+        Optimize requests in parallel
+
+        Args:
+            requests: Dictionaries of optimize_portfolio keyword arguments
+
+        Returns:
+            One result per request, in input order; failed requests, and
+            requests not finished within batch_timeout of the batch starting,
+            get {"error": message}
+        """
+        self.start()
+        results: List[Optional[Dict]] = [None] * len(requests)
+        chunks = self._chunks(requests)
+
+        futures = [
+            (indices, self._executor.submit(_run_chunk, [requests[i] for i in indices]))
+            for indices in chunks
+        ]
+
+        # One deadline for the whole batch, however many chunks are slow
+        _, not_done = wait_futures([future for _, future in futures], timeout=self.batch_timeout)
+
+        recycle = bool(not_done)
+        for indices, future in futures:
+            if future in not_done:
+                chunk_results = [{"error": f"Optimization timed out after {self.batch_timeout}s"}] * len(indices)
+            else:
+                try:
+                    chunk_results = future.result()
+                except Exception as e:
+                    recycle = recycle or isinstance(e, BrokenProcessPool)
+                    logger.warning(f"Worker failed on a chunk of {len(indices)} requests: {e}")
+                    chunk_results = [{"error": f"Worker failed: {e}"}] * len(indices)
+
+            for i, result in zip(indices, chunk_results):
+                results[i] = dict(result)
+
+        if recycle:
+            # A stuck solve holds its worker and a crash breaks the pool; start afresh next time
+            logger.warning("Recycling optimizer worker pool")
+            self._terminate()
+
+        logger.info(f"Parallel optimization complete: {len(requests)} requests, {len(chunks)} chunks")
+        return results
@@ -4,16 +4,36 @@ Uses PyPortfolioOpt with real historical data from CSV files
 """
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 from datetime import datetime
 import logging
 
 from pypfopt import EfficientFrontier, risk_models, expected_returns
 from pypfopt import objective_functions
-from pypfopt.discrete_allocation import DiscreteAllocation, get_latest_prices
 
 from data_loader import PortfolioDataLoader
-from config_new import RISK_PROFILES, RISK_FREE_RATE, LOOKBACK_PERIOD_DAYS
+from estimation_cache import EstimateCache
+from factor_model import FactorCovariance
+from frontier_cache import FrontierCache, FrontierGrid
+from optimization_session import OptimizationSession, SessionCache
+from share_allocation import greedy_allocation
+from single_flight import SingleFlight
+from tracing import span, start_trace, traced
+from config_new import (
+    RISK_PROFILES, RISK_FREE_RATE, LOOKBACK_PERIOD_DAYS,
+    COVARIANCE_MODEL, FACTOR_MODEL_MIN_TICKERS, FACTOR_PCA_COMPONENTS
+)
+
+TRADING_DAYS_PER_YEAR = 252
+DEFAULT_ESTIMATOR = "mean_historical_return+sample_cov"
+COVARIANCE_MODELS = ("sample", "sector", "pca", "auto")
+
+# Objective optimize_portfolio runs for each risk profile
+PROFILE_OBJECTIVES = {
+    "low": "min_volatility",
+    "medium": "max_sharpe",
+    "high": "efficient_return",
+}
 
 logger = logging.getLogger(__name__)
 
@@ -24,15 +44,35 @@ class CSVPortfolioOptimizer:
     Integrates PyPortfolioOpt with real historical price data
     """
     
-    def __init__(self, data_loader: PortfolioDataLoader):
+    def __init__(
+        self,
+        data_loader: PortfolioDataLoader,
+        estimate_cache: Optional[EstimateCache] = None,
+        frontier_cache: Optional[FrontierCache] = None,
+        covariance_model: str = COVARIANCE_MODEL,
+        session_cache: Optional[SessionCache] = None,
+        single_flight: Optional[SingleFlight] = None
+    ):
         """
         Initialize optimizer with data loader
         
         Args:
             data_loader: Configured PortfolioDataLoader instance
+            estimate_cache: Cache of (mu, S) estimates (a private one by default)
+            frontier_cache: Cache of solved efficient frontiers (a private one by default)
+            covariance_model: 'sample', 'sector', 'pca' or 'auto' (see config_new.COVARIANCE_MODEL)
+            session_cache: Cache of compiled optimization sessions (a private one by default)
+            single_flight: Coalesces identical concurrent solves (a private one by default)
         """
+        if covariance_model not in COVARIANCE_MODELS:
+            raise ValueError(f"Invalid covariance model: {covariance_model}. Choose from {list(COVARIANCE_MODELS)}")
         self.data_loader = data_loader
         self.sector_mapping = data_loader.get_sector_mapping()
+        self.estimate_cache = estimate_cache or EstimateCache()
+        self.frontier_cache = frontier_cache or FrontierCache()
+        self.covariance_model = covariance_model
+        self.session_cache = session_cache or SessionCache()
+        self.single_flight = single_flight or SingleFlight()
         
     def optimize_portfolio(
         self,
@@ -40,7 +80,8 @@ class CSVPortfolioOptimizer:
         horizon_years: int,
         sector_preferences: Optional[List[str]] = None,
         exclude_tickers: Optional[List[str]] = None,
-        lookback_days: int = LOOKBACK_PERIOD_DAYS
+        lookback_days: int = LOOKBACK_PERIOD_DAYS,
+        estimates: Optional[Tuple[pd.Series, pd.DataFrame]] = None
     ) -> Dict:
         """
         Optimize portfolio allocation based on risk profile and preferences
@@ -51,43 +92,294 @@ class CSVPortfolioOptimizer:
             sector_preferences: Preferred sectors (optional)
             exclude_tickers: Tickers to exclude (optional)
             lookback_days: Historical data lookback period
+            estimates: Precomputed (mu, S), e.g. RollingCovariance.estimates();
+                       skips loading prices and estimation
             
         Returns:
             Optimization results dictionary with weights, metrics, and explanations
+            (concurrent identical requests share one solve)
         """
+        if estimates is not None:
+            return self._optimize_portfolio(
+                risk_profile, horizon_years, sector_preferences, exclude_tickers, lookback_days, estimates
+            )
+        key = (
+            "optimize_portfolio", risk_profile, horizon_years,
+            tuple(sector_preferences or ()), tuple(exclude_tickers or ()), lookback_days
+        )
+        return self.single_flight.do(
+            key,
+            lambda: self._optimize_portfolio(
+                risk_profile, horizon_years, sector_preferences, exclude_tickers, lookback_days
+            )
+        )
+    
+    def _optimize_portfolio(
+        self,
+        risk_profile: str,
+        horizon_years: int,
+        sector_preferences: Optional[List[str]],
+        exclude_tickers: Optional[List[str]],
+        lookback_days: int,
+        estimates: Optional[Tuple[pd.Series, pd.DataFrame]] = None
+    ) -> Dict:
         logger.info(f"Starting optimization: risk={risk_profile}, horizon={horizon_years}y")
         
+        with start_trace("optimize_portfolio"):
+            mu, S = self._prepare_estimates(
+                risk_profile, sector_preferences, exclude_tickers, lookback_days, estimates
+            )
+            weights, performance, sector_mapper = self._solve(risk_profile, mu, S)
+            
+            result = self._build_result(
+                weights, performance, sector_mapper, risk_profile, horizon_years, sector_preferences
+            )
+        
+        logger.info(
+            f"Optimization complete: {len(result['weights'])} holdings, "
+            f"Sharpe={result['metrics']['sharpe_ratio']:.2f}"
+        )
+        
+        return result
+    
+    def optimize_many(self, requests: List[Dict]) -> List[Dict]:
+        """
+        Optimize a batch of requests, sharing work between them
+        
+        Requests are grouped by stock universe and lookback: each group loads
+        prices and estimates (mu, S) once, and each risk profile within a group
+        is solved once. Horizons only change the explanation text.
+        
+        Args:
+            requests: Dictionaries of optimize_portfolio keyword arguments
+                      (risk_profile and horizon_years required)
+            
+        Returns:
+            One result per request, in input order; failed requests get
+            {"error": message}
+        """
+        results: List[Optional[Dict]] = [None] * len(requests)
+        groups: Dict[Tuple, List[int]] = {}
+        
+        for i, request in enumerate(requests):
+            universe = self._select_universe(
+                request.get('sector_preferences'), request.get('exclude_tickers')
+            )
+            key = (tuple(sorted(universe)), request.get('lookback_days', LOOKBACK_PERIOD_DAYS))
+            groups.setdefault(key, []).append(i)
+        
+        logger.info(f"Batch optimization: {len(requests)} requests in {len(groups)} universe groups")
+        
+        for (universe, lookback_days), indices in groups.items():
+            try:
+                estimates = self._estimate(list(universe), lookback_days)
+            except Exception as e:
+                logger.warning(f"Estimation failed for a group of {len(indices)} requests: {e}")
+                for i in indices:
+                    results[i] = {"error": str(e)}
+                continue
+            
+            solves: Dict[str, Tuple] = {}
+            for i in indices:
+                request = requests[i]
+                try:
+                    risk_profile = request['risk_profile']
+                    mu, S = self._prepare_estimates(
+                        risk_profile,
+                        request.get('sector_preferences'),
+                        request.get('exclude_tickers'),
+                        lookback_days,
+                        estimates
+                    )
+                    if risk_profile not in solves:
+                        solves[risk_profile] = self._solve(risk_profile, mu, S)
+                    weights, performance, sector_mapper = solves[risk_profile]
+                    results[i] = self._build_result(
+                        weights, performance, sector_mapper, risk_profile,
+                        request['horizon_years'], request.get('sector_preferences')
+                    )
+                except Exception as e:
+                    logger.warning(f"Batch request {i} failed: {e}")
+                    results[i] = {"error": str(e)}
+        
+        return results
+    
+    def optimize_for_target(
+        self,
+        risk_profile: str,
+        horizon_years: int,
+        target_return: Optional[float] = None,
+        target_volatility: Optional[float] = None,
+        risk_aversion: Optional[float] = None,
+        sector_preferences: Optional[List[str]] = None,
+        exclude_tickers: Optional[List[str]] = None,
+        lookback_days: int = LOOKBACK_PERIOD_DAYS,
+        estimates: Optional[Tuple[pd.Series, pd.DataFrame]] = None
+    ) -> Dict:
+        """
+        Exact re-optimization for an interactive target
+
+        Solved in the cached session for the universe and the risk profile's
+        constraints, so moving a target only updates a solver parameter and
+        warm-starts from the previous solution.
+
+        Args:
+            risk_profile: 'low', 'medium', or 'high' (sets the sector cap)
+            horizon_years: Investment horizon in years
+            target_return: Minimum annual expected return (minimum volatility above it)
+            target_volatility: Maximum annual volatility (maximum return below it)
+            risk_aversion: Risk aversion of a quadratic utility mu'w - delta/2 w'Sw
+            sector_preferences: Preferred sectors (optional)
+            exclude_tickers: Tickers to exclude (optional)
+            lookback_days: Historical data lookback period
+            estimates: Precomputed (mu, S) (optional)
+
+        Returns:
+            Same dictionary as optimize_portfolio, plus an 'objective' entry
+        """
+        targets = {
+            "target_return": target_return,
+            "target_volatility": target_volatility,
+            "risk_aversion": risk_aversion
+        }
+        given = {name: value for name, value in targets.items() if value is not None}
+        if len(given) != 1:
+            raise ValueError("Specify exactly one of target_return, target_volatility or risk_aversion")
+        (objective, value), = given.items()
+
+        with start_trace("optimize_for_target"):
+            mu, S = self._prepare_estimates(
+                risk_profile, sector_preferences, exclude_tickers, lookback_days, estimates
+            )
+            sector_mapper = self._sector_mapper(mu.index)
+            session = self._session(mu, S, sector_mapper, RISK_PROFILES[risk_profile])
+
+            with span("solve"):
+                if objective == "target_return":
+                    weights, performance = session.efficient_return(value, risk_free_rate=RISK_FREE_RATE)
+                elif objective == "target_volatility":
+                    weights, performance = session.efficient_risk(value, risk_free_rate=RISK_FREE_RATE)
+                else:
+                    weights, performance = session.max_quadratic_utility(value, risk_free_rate=RISK_FREE_RATE)
+
+            result = self._build_result(
+                weights, performance, sector_mapper, risk_profile, horizon_years, sector_preferences
+            )
+        result["objective"] = {"type": objective, "value": value}
+        return result
+
+    def optimize_on_frontier(
+        self,
+        risk_profile: str,
+        horizon_years: int,
+        target_volatility: Optional[float] = None,
+        target_return: Optional[float] = None,
+        sector_preferences: Optional[List[str]] = None,
+        exclude_tickers: Optional[List[str]] = None,
+        lookback_days: int = LOOKBACK_PERIOD_DAYS,
+        estimates: Optional[Tuple[pd.Series, pd.DataFrame]] = None
+    ) -> Dict:
+        """
+        Pick a portfolio from the precomputed efficient frontier
+        
+        The frontier for the universe and the risk profile's constraints is solved
+        once and cached; each call then only interpolates between neighbouring
+        frontier points, so moving a volatility slider needs no new solve.
+        
+        Args:
+            risk_profile: 'low', 'medium', or 'high' (sets the sector cap)
+            horizon_years: Investment horizon in years
+            target_volatility: Annual volatility to aim for
+                               (default: the risk profile's target_volatility)
+            target_return: Annual expected return to aim for instead of a volatility
+            sector_preferences: Preferred sectors (optional)
+            exclude_tickers: Tickers to exclude (optional)
+            lookback_days: Historical data lookback period
+            estimates: Precomputed (mu, S) (optional)
+            
+        Returns:
+            Same dictionary as optimize_portfolio, plus a 'frontier' entry
+        """
+        if target_volatility is not None and target_return is not None:
+            raise ValueError("Specify either target_volatility or target_return, not both")
+        
+        with start_trace("optimize_on_frontier"):
+            mu, S = self._prepare_estimates(
+                risk_profile, sector_preferences, exclude_tickers, lookback_days, estimates
+            )
+            if isinstance(S, FactorCovariance):
+                # The frontier grid interpolates on a dense matrix
+                S = S.to_dense()
+            profile_config = RISK_PROFILES[risk_profile]
+            sector_mapper = self._sector_mapper(mu.index)
+            grid = self._frontier_grid(mu, S, sector_mapper, profile_config)
+            
+            if target_return is not None:
+                weights, clamped = grid.weights_for_return(target_return)
+            else:
+                if target_volatility is None:
+                    target_volatility = profile_config['target_volatility']
+                weights, clamped = grid.weights_for_volatility(target_volatility)
+            
+            performance = grid.performance(weights, RISK_FREE_RATE)
+            result = self._build_result(
+                weights, performance, sector_mapper, risk_profile, horizon_years, sector_preferences
+            )
+        result["frontier"] = {
+            "target_volatility": target_volatility,
+            "target_return": target_return,
+            "clamped": clamped,
+            "volatility_range": (round(float(grid.volatilities[0]), 4), round(float(grid.volatilities[-1]), 4)),
+            "points": len(grid)
+        }
+        return result
+    
+    def _frontier_grid(
+        self,
+        mu: pd.Series,
+        S: pd.DataFrame,
+        sector_mapper: Dict[str, str],
+        profile_config: Dict
+    ) -> FrontierGrid:
+        """Cached efficient frontier for the estimates and constraint set"""
+        self.frontier_cache.bind(self.data_loader.data_version)
+        key = FrontierCache.make_key(mu, S, sector_mapper, profile_config['max_sector_weight'])
+        
+        def solve() -> FrontierGrid:
+            with span("frontier_solve"):
+                return FrontierGrid.solve(lambda: self._build_frontier(mu, S, sector_mapper, profile_config))
+        
+        return self.frontier_cache.get_or_compute(key, solve)
+    
+    def _prepare_estimates(
+        self,
+        risk_profile: str,
+        sector_preferences: Optional[List[str]],
+        exclude_tickers: Optional[List[str]],
+        lookback_days: int,
+        estimates: Optional[Tuple[pd.Series, pd.DataFrame]] = None
+    ) -> Tuple[pd.Series, pd.DataFrame]:
+        """Validate the request, select the universe and return its (mu, S)"""
         # Validate risk profile
         if risk_profile not in RISK_PROFILES:
             raise ValueError(f"Invalid risk profile: {risk_profile}. Choose from {list(RISK_PROFILES.keys())}")
         
         profile_config = RISK_PROFILES[risk_profile]
         
-        # Get stock universe
-        all_tickers = self.data_loader.get_stock_universe()
-        
-        # Apply exclusions
-        if exclude_tickers:
-            all_tickers = [t for t in all_tickers if t not in exclude_tickers]
-        
-        # Filter by sector preferences if specified
-        if sector_preferences:
-            all_tickers = [
-                t for t in all_tickers 
-                if self.sector_mapping.get(t) in sector_preferences
-            ]
+        all_tickers = self._select_universe(sector_preferences, exclude_tickers)
         
         logger.info(f"Optimizing for {len(all_tickers)} tickers")
         
-        # Load historical data
-        prices = self.data_loader.get_historical_prices(
-            tickers=all_tickers,
-            lookback_days=lookback_days
-        )
-        
-        # Drop tickers with insufficient data
-        prices = prices.dropna(axis=1, thresh=int(0.8 * len(prices)))
-        available_tickers = prices.columns.tolist()
+        # Expected returns and risk (served from the estimate cache when possible)
+        if estimates is None:
+            mu, S = self._estimate(all_tickers, lookback_days)
+        else:
+            universe = set(all_tickers)
+            selected = [t for t in estimates[0].index if t in universe]
+            S = estimates[1]
+            mu = estimates[0][selected]
+            S = S.subset(selected) if isinstance(S, FactorCovariance) else S.loc[selected, selected]
+        available_tickers = mu.index.tolist()
         
         logger.info(f"Using {len(available_tickers)} tickers with sufficient data")
         
@@ -97,45 +389,111 @@ class CSVPortfolioOptimizer:
                 f"(minimum {profile_config['min_diversification']} required)"
             )
         
-        # Calculate expected returns and risk
-        mu = expected_returns.mean_historical_return(prices, frequency=252)
-        S = risk_models.sample_cov(prices, frequency=252)
-        
-        # Create efficient frontier
-        ef = EfficientFrontier(mu, S)
-        
-        # Apply sector constraints
-        sector_mapper = {ticker: self.sector_mapping.get(ticker, 'Unknown') 
-                        for ticker in available_tickers}
-        sector_lower = {}
-        sector_upper = {sector: profile_config['max_sector_weight'] 
-                       for sector in set(sector_mapper.values())}
+        return mu, S
+    
+    @traced("solve")
+    def _solve(
+        self,
+        risk_profile: str,
+        mu: pd.Series,
+        S: pd.DataFrame
+    ) -> Tuple[Dict[str, float], Tuple[float, float, float], Dict[str, str]]:
+        """
+        Run the risk profile's objective on the constrained frontier
         
-        ef.add_sector_constraints(sector_mapper, sector_lower, sector_upper)
+        Returns:
+            (cleaned weights, (return, volatility, Sharpe), sector mapper)
+        """
+        profile_config = RISK_PROFILES[risk_profile]
         
-        # Apply weight constraints (min 1% per stock to avoid too many positions)
-        ef.add_constraint(lambda w: w >= 0.01)
+        # Compiled problem for the universe and constraint set (reused across calls)
+        sector_mapper = self._sector_mapper(mu.index)
+        session = self._session(mu, S, sector_mapper, profile_config)
         
         # Optimize based on risk profile
-        if risk_profile == "low":
+        objective = PROFILE_OBJECTIVES[risk_profile]
+        if objective == "min_volatility":
             # Minimize volatility for low risk
-            ef.min_volatility()
-        elif risk_profile == "medium":
+            weights, performance = session.min_volatility(risk_free_rate=RISK_FREE_RATE)
+        elif objective == "max_sharpe":
             # Maximize Sharpe ratio for balanced approach
-            ef.max_sharpe(risk_free_rate=RISK_FREE_RATE)
+            weights, performance = session.max_sharpe(risk_free_rate=RISK_FREE_RATE)
         else:  # high
             # Maximize returns with volatility constraint
-            ef.efficient_return(target_return=mu.max() * 0.9)
-        
-        # Get cleaned weights
-        weights = ef.clean_weights()
+            weights, performance = session.efficient_return(mu.max() * 0.9, risk_free_rate=RISK_FREE_RATE)
         
-        # Calculate performance metrics
-        performance = ef.portfolio_performance(
-            verbose=False,
-            risk_free_rate=RISK_FREE_RATE
+        return weights, performance, sector_mapper
+    
+    def _session(
+        self,
+        mu: pd.Series,
+        S,
+        sector_mapper: Dict[str, str],
+        profile_config: Dict
+    ) -> OptimizationSession:
+        """Cached optimization session for the estimates and constraint set"""
+        self.session_cache.bind(self.data_loader.data_version)
+        min_weight = self._min_weight(len(mu))
+        key = SessionCache.make_key(mu, S, sector_mapper, profile_config['max_sector_weight'], min_weight)
+        return self.session_cache.get_or_compute(
+            key,
+            lambda: OptimizationSession(mu, S, sector_mapper, profile_config['max_sector_weight'], min_weight)
         )
+    
+    @staticmethod
+    def _min_weight(n_tickers: int) -> float:
+        """
+        Per-stock weight floor (min 1% per stock to avoid too many positions)
         
+        Past 50 stocks the floor shrinks so that it never commits more than
+        half the budget (a 1% floor is infeasible past 100 stocks). It only
+        depends on the universe size, so every covariance model solves the
+        same constraint set.
+        """
+        return min(0.01, 0.5 / max(1, n_tickers))
+    
+    def _sector_mapper(self, tickers: List[str]) -> Dict[str, str]:
+        """Map each ticker to its sector ('Unknown' if missing)"""
+        return {ticker: self.sector_mapping.get(ticker, 'Unknown') for ticker in tickers}
+    
+    def _build_frontier(
+        self,
+        mu: pd.Series,
+        S: pd.DataFrame,
+        sector_mapper: Dict[str, str],
+        profile_config: Dict
+    ):
+        """
+        Create an EfficientFrontier with the risk profile's constraints applied
+        
+        Only the frontier grid builds one, on a dense covariance; the risk
+        profile solves (dense or factor) go through OptimizationSession.
+        """
+        sector_lower = {}
+        sector_upper = {sector: profile_config['max_sector_weight'] 
+                       for sector in set(sector_mapper.values())}
+        
+        ef = EfficientFrontier(mu, S)
+        
+        # Apply sector constraints
+        ef.add_sector_constraints(sector_mapper, sector_lower, sector_upper)
+        
+        # Apply weight constraints (min 1% per stock to avoid too many positions)
+        min_weight = self._min_weight(len(mu))
+        ef.add_constraint(lambda w: w >= min_weight)
+        
+        return ef
+    
+    def _build_result(
+        self,
+        weights: Dict[str, float],
+        performance: Tuple[float, float, float],
+        sector_mapper: Dict[str, str],
+        risk_profile: str,
+        horizon_years: int,
+        sector_preferences: Optional[List[str]]
+    ) -> Dict:
+        """Assemble the optimization result dictionary"""
         expected_annual_return, annual_volatility, sharpe_ratio = performance
         
         # Get sector allocation
@@ -153,7 +511,7 @@ class CSVPortfolioOptimizer:
             sector_preferences=sector_preferences
         )
         
-        result = {
+        return {
             "weights": {k: round(v, 4) for k, v in weights.items() if v > 0.001},
             "metrics": {
                 "expected_annual_return": round(expected_annual_return, 4),
@@ -167,10 +525,86 @@ class CSVPortfolioOptimizer:
             "horizon_years": horizon_years,
             "optimization_date": datetime.now().isoformat()
         }
+    
+    def _select_universe(
+        self,
+        sector_preferences: Optional[List[str]] = None,
+        exclude_tickers: Optional[List[str]] = None
+    ) -> List[str]:
+        """Apply exclusions and sector preferences to the stock universe"""
+        all_tickers = self.data_loader.get_stock_universe()
         
-        logger.info(f"Optimization complete: {len(result['weights'])} holdings, Sharpe={sharpe_ratio:.2f}")
+        # Apply exclusions
+        if exclude_tickers:
+            all_tickers = [t for t in all_tickers if t not in exclude_tickers]
         
-        return result
+        # Filter by sector preferences if specified
+        if sector_preferences:
+            all_tickers = [
+                t for t in all_tickers 
+                if self.sector_mapping.get(t) in sector_preferences
+            ]
+        
+        return all_tickers
+    
+    def _estimate(
+        self,
+        tickers: List[str],
+        lookback_days: int = LOOKBACK_PERIOD_DAYS
+    ) -> Tuple[pd.Series, pd.DataFrame]:
+        """
+        Annualized expected returns and covariance for a universe
+        
+        Results are cached per (universe, end date, lookback, estimator,
+        frequency); the cache is emptied when the loader's data version
+        changes. Checking the CSV for new data is left to the loader's owner
+        (shared resources, or an explicit data_loader.refresh()), so
+        requests never re-read the store manifest or rehash the CSV.
+        
+        Args:
+            tickers: Candidate tickers (those with <80% history are dropped)
+            lookback_days: Historical data lookback period
+            
+        Returns:
+            (mu, S) indexed by the tickers with sufficient data; S is a
+            FactorCovariance under the 'sector' and 'pca' covariance models
+        """
+        self.estimate_cache.bind(self.data_loader.data_version)
+        
+        model = self._resolve_covariance_model(len(tickers))
+        estimator = DEFAULT_ESTIMATOR if model == "sample" else f"mean_historical_return+{model}_factor"
+        end_date = self.data_loader.get_latest_date(tickers)
+        key = EstimateCache.make_key(
+            tickers, end_date, lookback_days, estimator, TRADING_DAYS_PER_YEAR
+        )
+        
+        @traced("estimation")
+        def compute() -> Tuple[pd.Series, pd.DataFrame]:
+            prices = self.data_loader.get_historical_prices(
+                tickers=tickers,
+                end_date=end_date,
+                lookback_days=lookback_days
+            )
+            
+            # Drop tickers with insufficient data
+            prices = prices.dropna(axis=1, thresh=int(0.8 * len(prices)))
+            
+            mu = expected_returns.mean_historical_return(prices, frequency=TRADING_DAYS_PER_YEAR)
+            if model == "sector":
+                S = FactorCovariance.from_sectors(prices, self.sector_mapping, TRADING_DAYS_PER_YEAR)
+            elif model == "pca":
+                S = FactorCovariance.from_pca(prices, FACTOR_PCA_COMPONENTS, TRADING_DAYS_PER_YEAR)
+            else:
+                S = risk_models.sample_cov(prices, frequency=TRADING_DAYS_PER_YEAR)
+            return mu, S
+        
+        return self.estimate_cache.get_or_compute(key, compute)
+    
+    def _resolve_covariance_model(self, n_tickers: int) -> str:
+        """Covariance model for a universe size ('auto' picks by size)"""
+        if self.covariance_model != "auto":
+            return self.covariance_model
+        return "sector" if n_tickers >= FACTOR_MODEL_MIN_TICKERS else "sample"
     
     def _calculate_sector_allocation(
         self,
@@ -278,21 +712,32 @@ class CSVPortfolioOptimizer:
         """
         logger.info(f"Calculating discrete allocation for ${total_portfolio_value:,.2f}")
         
-        tickers = list(weights.keys())
-        latest_prices = self.data_loader.get_historical_prices(tickers=tickers)
-        latest_prices = get_latest_prices(latest_prices)
-        
-        da = DiscreteAllocation(
-            weights,
-            latest_prices,
-            total_portfolio_value=total_portfolio_value
-        )
-        
-        allocation, leftover = da.greedy_portfolio()
+        allocation, leftover = self.discrete_allocations(weights, [total_portfolio_value])[0]
         
         logger.info(f"Discrete allocation: {len(allocation)} positions, ${leftover:.2f} leftover")
         
         return allocation, leftover
+    
+    def discrete_allocations(
+        self,
+        weights: Dict[str, float],
+        portfolio_values: Sequence[float]
+    ) -> List[Tuple[Dict[str, int], float]]:
+        """
+        Convert percentage weights to discrete share quantities for several amounts
+        
+        Uses the loader's latest-price index and allocates all amounts in one
+        vectorized greedy pass (same shares as pypfopt's greedy_portfolio).
+        
+        Args:
+            weights: Optimized portfolio weights
+            portfolio_values: Amounts to invest ($)
+            
+        Returns:
+            (allocation_dict, leftover_cash) per amount, in input order
+        """
+        latest_prices = self.data_loader.get_latest_prices(list(weights.keys()))
+        return greedy_allocation(weights, latest_prices, portfolio_values)
 
 
 def create_optimizer() -> CSVPortfolioOptimizer:
@@ -313,18 +758,20 @@ if __name__ == "__main__":
     
     optimizer = create_optimizer()
     
-    # Test optimization for different risk profiles
-    for risk_profile in ['low', 'medium', 'high']:
+    # Test optimization for different risk profiles (one shared data load and estimate)
+    risk_profiles = ['low', 'medium', 'high']
+    results = optimizer.optimize_many(
+        [{"risk_profile": risk_profile, "horizon_years": 5} for risk_profile in risk_profiles]
+    )
+    
+    for risk_profile, result in zip(risk_profiles, results):
         print(f"\n{'='*60}")
         print(f"OPTIMIZING FOR {risk_profile.upper()} RISK")
         print(f"{'='*60}\n")
         
-        try:
-            result = optimizer.optimize_portfolio(
-                risk_profile=risk_profile,
-                horizon_years=5
-            )
-            
+        if "error" in result:
+            print(f"❌ Error: {result['error']}")
+        else:
             print("ALLOCATION:")
             for ticker, weight in sorted(result['weights'].items(), key=lambda x: x[1], reverse=True)[:10]:
                 print(f"  {ticker}: {weight*100:.2f}%")
@@ -338,6 +785,3 @@ if __name__ == "__main__":
             print(f"\nSECTOR ALLOCATION:")
             for sector, weight in sorted(result['sector_allocation'].items(), key=lambda x: x[1], reverse=True):
                 print(f"  {sector}: {weight*100:.2f}%")
-            
-        except Exception as e:
-            print(f"❌ Error: {e}")
@@ -0,0 +1,301 @@
+"""
+Columnar Price Store for F2 Portfolio Recommender
+Persists Portfolio_prices.csv as NumPy .npy columns plus a JSON manifest so
+processes can skip the full CSV parse on start-up, and a pre-pivoted
+Date x Ticker matrix that every session/process memory-maps read-only
+"""
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+STORE_FORMAT_VERSION = 2
+HASH_CHUNK_BYTES = 1 << 20
+
+
+def file_sha256(path: Path) -> str:
+    """Compute the SHA-256 digest of a file in fixed-size chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_price_matrix(prices_df: pd.DataFrame) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Pivot long-format prices into a dense Date x Ticker matrix
+
+    Args:
+        prices_df: Long table with Date, Ticker and Adjusted columns
+
+    Returns:
+        (matrix with sorted dates and tickers, last-valid row per ticker or -1)
+    """
+    wide = prices_df.pivot(index='Date', columns='Ticker', values='Adjusted').sort_index()
+    values = np.ascontiguousarray(wide.to_numpy(dtype=np.float64))
+    matrix = pd.DataFrame(values, index=wide.index, columns=wide.columns, copy=False)
+
+    notna = ~np.isnan(values)
+    last_from_end = np.argmax(notna[::-1], axis=0)
+    last_valid = np.where(notna.any(axis=0), len(values) - 1 - last_from_end, -1).astype(np.int64)
+    return matrix, last_valid
+
+
+class PriceStore:
+    """
+    Binary, column-per-file copy of the long-format prices CSV
+
+    Layout of ``store_dir``:
+        manifest.json          source fingerprint, row count and column specs
+        <column>.<hash>.npy    one array per CSV column
+        matrix.<hash>.npy      Date x Ticker adjusted closes (float64)
+        dates.<hash>.npy       sorted row dates of the matrix
+        last_valid.<hash>.npy  row of each ticker's latest price (-1 if none)
+
+    The matrix files are opened with ``mmap_mode='r'``, so any number of
+    loaders (Streamlit sessions, worker processes) share one copy of the
+    price history through the OS page cache instead of each holding its own.
+
+    The store is rebuilt automatically whenever the CSV's size/mtime change
+    and its SHA-256 no longer matches the manifest. A touched-but-identical
+    CSV only refreshes the recorded stat fields.
+    """
+
+    def __init__(self, prices_csv: Path, store_dir: Optional[Path] = None):
+        """
+        Initialize price store
+
+        Args:
+            prices_csv: Path to Portfolio_prices.csv
+            store_dir: Directory holding the binary copy
+                       (default: <csv dir>/.price_store/<csv stem>)
+        """
+        self.prices_csv = Path(prices_csv)
+        self.store_dir = Path(store_dir) if store_dir else (
+            self.prices_csv.parent / ".price_store" / self.prices_csv.stem
+        )
+        self._manifest: Optional[Dict] = None
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.store_dir / MANIFEST_NAME
+
+    @property
+    def version(self) -> str:
+        """Content hash of the CSV the store currently reflects"""
+        return self.ensure_fresh()["source"]["sha256"]
+
+    def _read_manifest(self) -> Optional[Dict]:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as handle:
+                manifest = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("format_version") != STORE_FORMAT_VERSION:
+            return None
+        return manifest
+
+    def _write_manifest(self, manifest: Dict) -> None:
+        """Atomically replace the manifest (readers never see a partial file)"""
+        tmp_path = self.store_dir / f".{MANIFEST_NAME}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(manifest, handle, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def is_fresh(self) -> bool:
+        """Check whether the store matches the current CSV without rebuilding"""
+        manifest = self._read_manifest()
+        if manifest is None:
+            return False
+        stat = self.prices_csv.stat()
+        source = manifest["source"]
+        if source["size"] == stat.st_size and source["mtime_ns"] == stat.st_mtime_ns:
+            return True
+        return source["size"] == stat.st_size and source["sha256"] == file_sha256(self.prices_csv)
+
+    def ensure_fresh(self) -> Dict:
+        """
+        Return a manifest that reflects the current CSV, rebuilding if needed
+
+        Returns:
+            Manifest dictionary
+        """
+        manifest = self._read_manifest()
+        stat = self.prices_csv.stat()
+
+        if manifest is not None:
+            source = manifest["source"]
+            if source["size"] == stat.st_size and source["mtime_ns"] == stat.st_mtime_ns:
+                self._manifest = manifest
+                return manifest
+
+            # mtime changed: only rebuild if the content actually changed
+            sha256 = file_sha256(self.prices_csv)
+            if sha256 == source["sha256"]:
+                logger.info("Prices CSV touched but unchanged, refreshing store fingerprint")
+                source["mtime_ns"] = stat.st_mtime_ns
+                try:
+                    self._write_manifest(manifest)
+                except OSError as e:
+                    logger.warning(f"Could not update price store manifest: {e}")
+                self._manifest = manifest
+                return manifest
+            return self.build(sha256=sha256)
+
+        return self.build()
+
+    def build(self, sha256: Optional[str] = None) -> Dict:
+        """
+        Parse the CSV once and write every column as a .npy file
+
+        Args:
+            sha256: Precomputed CSV digest (computed if omitted)
+
+        Returns:
+            Manifest of the freshly written store
+        """
+        logger.info(f"Building price store for {self.prices_csv} in {self.store_dir}")
+        stat = self.prices_csv.stat()
+        sha256 = sha256 or file_sha256(self.prices_csv)
+
+        prices_df = pd.read_csv(self.prices_csv, parse_dates=['Date'])
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+
+        tag = sha256[:12]
+        columns: List[Dict] = []
+        for position, name in enumerate(prices_df.columns):
+            series = prices_df[name]
+            file_name = f"col{position}.{tag}.npy"
+            spec = {"name": name, "file": file_name}
+
+            if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_dtype(series):
+                values = series.to_numpy()
+                spec["kind"] = "datetime" if pd.api.types.is_datetime64_dtype(series) else "numeric"
+            else:
+                # Strings are dictionary-encoded: int32 codes + categories in the manifest
+                codes, categories = pd.factorize(series, use_na_sentinel=True)
+                values = codes.astype(np.int32)
+                spec["kind"] = "category"
+                spec["categories"] = [str(c) for c in categories]
+
+            spec["dtype"] = str(values.dtype)
+            self._save_array(file_name, values)
+            columns.append(spec)
+
+        matrix_spec = None
+        if {'Date', 'Ticker', 'Adjusted'} <= set(prices_df.columns):
+            matrix_spec = self._write_matrix(prices_df, tag)
+
+        manifest = {
+            "format_version": STORE_FORMAT_VERSION,
+            "source": {
+                "path": str(self.prices_csv),
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": sha256,
+            },
+            "rows": int(len(prices_df)),
+            "columns": columns,
+            "matrix": matrix_spec,
+            "built_at": datetime.now().isoformat(),
+        }
+        self._write_manifest(manifest)
+        self._remove_stale_files(manifest)
+        self._manifest = manifest
+
+        logger.info(f"Price store built: {manifest['rows']} rows, {len(columns)} columns")
+        return manifest
+
+    def _write_matrix(self, prices_df: pd.DataFrame, tag: str) -> Dict:
+        """Pivot adjusted closes once and persist them for memory-mapping"""
+        wide, last_valid = build_price_matrix(prices_df)
+        values = wide.to_numpy()
+
+        spec = {
+            "values": f"matrix.{tag}.npy",
+            "dates": f"dates.{tag}.npy",
+            "last_valid": f"last_valid.{tag}.npy",
+            "tickers": [str(t) for t in wide.columns],
+            "shape": list(values.shape),
+        }
+        self._save_array(spec["values"], values)
+        self._save_array(spec["dates"], wide.index.to_numpy())
+        self._save_array(spec["last_valid"], last_valid)
+        return spec
+
+    def _save_array(self, file_name: str, values: np.ndarray) -> None:
+        """Write an array via rename so processes mapping the old file are unaffected"""
+        tmp_path = self.store_dir / f".{file_name}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as handle:
+            np.save(handle, values, allow_pickle=False)
+        os.replace(tmp_path, self.store_dir / file_name)
+
+    def _remove_stale_files(self, manifest: Dict) -> None:
+        """Delete column files left behind by previous builds"""
+        keep = {spec["file"] for spec in manifest["columns"]}
+        if manifest.get("matrix"):
+            matrix = manifest["matrix"]
+            keep |= {matrix["values"], matrix["dates"], matrix["last_valid"]}
+        for path in self.store_dir.glob("*.npy"):
+            if path.name not in keep:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def load(self) -> pd.DataFrame:
+        """
+        Load the long-format price table from the binary store
+
+        Returns:
+            DataFrame equivalent to pd.read_csv(prices_csv, parse_dates=['Date'])
+        """
+        manifest = self.ensure_fresh()
+        data = {}
+        for spec in manifest["columns"]:
+            values = np.load(self.store_dir / spec["file"], allow_pickle=False)
+            if spec["kind"] == "category":
+                categories = pd.Index(spec["categories"])
+                data[spec["name"]] = pd.Categorical.from_codes(values, categories=categories) \
+                    .astype(categories.dtype)
+            else:
+                data[spec["name"]] = values
+        return pd.DataFrame(data)
+
+    def load_matrix(self) -> Tuple[pd.DataFrame, np.ndarray]:
+        """
+        Memory-map the pre-pivoted price matrix
+
+        Returns:
+            (Date x Ticker DataFrame backed by a read-only memmap,
+             last-valid row position per ticker)
+
+        Raises:
+            KeyError: If the CSV lacks the Date/Ticker/Adjusted columns
+        """
+        manifest = self.ensure_fresh()
+        spec = manifest.get("matrix")
+        if not spec:
+            raise KeyError("Price store has no matrix (Date/Ticker/Adjusted columns required)")
+
+        values = np.load(self.store_dir / spec["values"], mmap_mode='r', allow_pickle=False)
+        dates = np.load(self.store_dir / spec["dates"], allow_pickle=False)
+        last_valid = np.load(self.store_dir / spec["last_valid"], allow_pickle=False)
+
+        matrix = pd.DataFrame(
+            values,
+            index=pd.DatetimeIndex(dates, name='Date'),
+            columns=pd.Index(spec["tickers"], name='Ticker'),
+            copy=False
+        )
+        return matrix, last_valid
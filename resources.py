@@ -0,0 +1,137 @@
+"""
+Shared Resources for F2 Portfolio Recommender
+Process-wide data loader, optimizer, agent and background job queue shared
+by every app session
+
+The loader, optimizer (with its estimate, frontier and session caches) and
+the Cerebras agent are read-only from a session's point of view, so one set
+serves all browser sessions; per-session state is left with the chat history
+and the last recommendation. Everything is built lazily on first use, under
+a lock, and the loader is checked for new price data at most once per
+RESOURCE_REFRESH_INTERVAL_SECONDS (the optimizer's caches follow its data
+version).
+
+Usage:
+    resources = get_shared_resources()
+    resources.agent.recommend(params)
+    resources.sector_mapping()
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from agent_cerebras import CerebrasPortfolioAgent
+from config_new import RESOURCE_REFRESH_INTERVAL_SECONDS
+from data_loader import PortfolioDataLoader, get_data_loader
+from job_queue import JobQueue
+from portfolio_optimizer_csv import CSVPortfolioOptimizer
+
+logger = logging.getLogger(__name__)
+
+
+class SharedResources:
+    """
+    Lazily built, thread-safe bundle of the app's heavy objects
+
+    Attributes are created on first access; concurrent first accesses build
+    each object once.
+    """
+
+    def __init__(
+        self,
+        loader_factory: Callable[[], PortfolioDataLoader] = get_data_loader,
+        agent_factory: Callable[..., CerebrasPortfolioAgent] = CerebrasPortfolioAgent,
+        refresh_interval: float = RESOURCE_REFRESH_INTERVAL_SECONDS
+    ):
+        """
+        Initialize resources (nothing is built yet)
+
+        Args:
+            loader_factory: Builds the data loader
+            agent_factory: Builds the agent, called with optimizer=...
+            refresh_interval: Minimum seconds between checks for new price data
+        """
+        self._loader_factory = loader_factory
+        self._agent_factory = agent_factory
+        self.refresh_interval = refresh_interval
+
+        self._data_loader: Optional[PortfolioDataLoader] = None
+        self._optimizer: Optional[CSVPortfolioOptimizer] = None
+        self._agent: Optional[CerebrasPortfolioAgent] = None
+        self._jobs: Optional[JobQueue] = None
+        self._sector_mapping: Optional[Dict[str, str]] = None
+        self._sector_mapping_version: Optional[str] = None
+        self._last_refresh = float("-inf")
+        self._lock = threading.RLock()
+
+    @property
+    def data_loader(self) -> PortfolioDataLoader:
+        """The shared loader, checked for new price data at most once per refresh interval"""
+        with self._lock:
+            if self._data_loader is None:
+                logger.info("Building shared data loader")
+                self._data_loader = self._loader_factory()
+                self._last_refresh = time.monotonic()
+            elif time.monotonic() - self._last_refresh >= self.refresh_interval:
+                self._last_refresh = time.monotonic()
+                if self._data_loader.refresh():
+                    logger.info(f"Shared resources now serve data version {self._data_loader.data_version}")
+            return self._data_loader
+
+    @property
+    def optimizer(self) -> CSVPortfolioOptimizer:
+        """The shared optimizer (its caches are bound to the loader's data version)"""
+        with self._lock:
+            if self._optimizer is None:
+                self._optimizer = CSVPortfolioOptimizer(self.data_loader)
+            return self._optimizer
+
+    @property
+    def agent(self) -> CerebrasPortfolioAgent:
+        """The shared agent, using the shared optimizer"""
+        with self._lock:
+            if self._agent is None:
+                logger.info("Building shared agent")
+                self._agent = self._agent_factory(optimizer=self.optimizer)
+            return self._agent
+
+    @property
+    def jobs(self) -> JobQueue:
+        """The shared background job queue (kept across reset, so in-flight jobs finish)"""
+        with self._lock:
+            if self._jobs is None:
+                self._jobs = JobQueue()
+            return self._jobs
+
+    def sector_mapping(self) -> Dict[str, str]:
+        """Ticker to sector, rebuilt when the data version changes (do not mutate)"""
+        loader = self.data_loader
+        with self._lock:
+            if self._sector_mapping is None or self._sector_mapping_version != loader.data_version:
+                self._sector_mapping = loader.get_sector_mapping()
+                self._sector_mapping_version = loader.data_version
+            return self._sector_mapping
+
+    def reset(self) -> None:
+        """Drop every object; the next access rebuilds them"""
+        with self._lock:
+            self._data_loader = None
+            self._optimizer = None
+            self._agent = None
+            self._sector_mapping = None
+            self._sector_mapping_version = None
+
+
+_shared: Optional[SharedResources] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_resources() -> SharedResources:
+    """The process-wide SharedResources, created on first call"""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = SharedResources()
+    return _shared
@@ -0,0 +1,168 @@
+"""
+Incremental Rolling Estimator for F2 Portfolio Recommender
+Sliding-window expected returns and sample covariance updated in O(n^2) per new day
+"""
+import logging
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from config_new import LOOKBACK_PERIOD_DAYS
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+class RollingCovariance:
+    """
+    Running-sum estimator over the last ``window`` daily returns
+
+    Keeps, per ticker and ticker pair:
+        sum of returns          -> sample mean / covariance
+        sum of log(1 + r)       -> compounded (CAGR) mean return
+        sum of outer products   -> covariance
+
+    Adding a day and dropping the oldest costs O(n^2), instead of the
+    O(T * n^2) of re-estimating the whole window. Estimates match PyPortfolioOpt's
+    ``mean_historical_return`` and ``sample_cov`` on the same window.
+
+    Missing prices are carried forward (a zero return for that ticker), so
+    feed it tickers with complete history in the window.
+    """
+
+    def __init__(
+        self,
+        tickers: Sequence[str],
+        window: int = LOOKBACK_PERIOD_DAYS,
+        frequency: int = TRADING_DAYS_PER_YEAR,
+        resync_every: Optional[int] = None
+    ):
+        """
+        Initialize an empty estimator
+
+        Args:
+            tickers: Column order of the estimates
+            window: Number of daily returns in the sliding window
+            frequency: Periods per year used for annualization
+            resync_every: Recompute the sums from the window buffer after this
+                          many updates to bound floating-point drift
+                          (default: once per full window)
+        """
+        self.tickers: List[str] = list(tickers)
+        self.window = window
+        self.frequency = frequency
+        self.resync_every = resync_every or window
+
+        n = len(self.tickers)
+        self._returns = np.zeros((window, n))  # ring buffer of the window's returns
+        self._head = 0                          # slot the next return is written to
+        self.count = 0
+        self._sum = np.zeros(n)
+        self._sum_log = np.zeros(n)
+        self._cross = np.zeros((n, n))
+        self._last_prices: Optional[np.ndarray] = None
+        self._updates_since_resync = 0
+        self.last_date: Optional[pd.Timestamp] = None
+
+    @classmethod
+    def from_prices(
+        cls,
+        prices: pd.DataFrame,
+        window: Optional[int] = None,
+        frequency: int = TRADING_DAYS_PER_YEAR
+    ) -> "RollingCovariance":
+        """
+        Seed an estimator from a Date x Ticker price history
+
+        Args:
+            prices: Price matrix (e.g. from PortfolioDataLoader.get_historical_prices)
+            window: Returns kept in the window (default: all returns in ``prices``)
+            frequency: Periods per year used for annualization
+
+        Returns:
+            Estimator whose window ends at the last row of ``prices``
+        """
+        window = window or max(len(prices) - 1, 1)
+        engine = cls(prices.columns, window=window, frequency=frequency)
+        for date, row in zip(prices.index, prices.ffill().to_numpy()):
+            engine.push_prices(row, date=date)
+        return engine
+
+    def push_prices(self, prices: Union[pd.Series, np.ndarray], date: Optional[pd.Timestamp] = None) -> None:
+        """
+        Add one day of prices (the first call only records the base prices)
+
+        Args:
+            prices: Prices in ``self.tickers`` order (a Series is aligned by ticker)
+            date: Date of the observation, kept for bookkeeping
+        """
+        if isinstance(prices, pd.Series):
+            prices = prices.reindex(self.tickers)
+        prices = np.asarray(prices, dtype=np.float64)
+
+        if self._last_prices is not None:
+            prices = np.where(np.isnan(prices), self._last_prices, prices)
+            self.push_returns(prices / self._last_prices - 1.0)
+        self._last_prices = prices
+        if date is not None:
+            self.last_date = pd.Timestamp(date)
+
+    def push_returns(self, returns: np.ndarray) -> None:
+        """
+        Slide the window forward by one day of returns
+
+        Args:
+            returns: Daily simple returns in ``self.tickers`` order
+        """
+        returns = np.nan_to_num(np.asarray(returns, dtype=np.float64), nan=0.0)
+
+        if self.count == self.window:
+            oldest = self._returns[self._head]
+            self._sum -= oldest
+            self._sum_log -= np.log1p(oldest)
+            self._cross -= np.outer(oldest, oldest)
+        else:
+            self.count += 1
+
+        self._returns[self._head] = returns
+        self._head = (self._head + 1) % self.window
+        self._sum += returns
+        self._sum_log += np.log1p(returns)
+        self._cross += np.outer(returns, returns)
+
+        self._updates_since_resync += 1
+        if self._updates_since_resync >= self.resync_every:
+            self.resync()
+
+    def resync(self) -> None:
+        """Recompute the running sums exactly from the window buffer"""
+        window = self._window_returns()
+        self._sum = window.sum(axis=0)
+        self._sum_log = np.log1p(window).sum(axis=0)
+        self._cross = window.T @ window
+        self._updates_since_resync = 0
+
+    def _window_returns(self) -> np.ndarray:
+        if self.count < self.window:
+            return self._returns[:self.count]
+        return self._returns
+
+    def mean_return(self) -> pd.Series:
+        """Annualized compounded mean return (PyPortfolioOpt mean_historical_return)"""
+        if self.count == 0:
+            raise ValueError("RollingCovariance has no observations yet")
+        cagr = np.expm1(self._sum_log * (self.frequency / self.count))
+        return pd.Series(cagr, index=self.tickers)
+
+    def covariance(self) -> pd.DataFrame:
+        """Annualized sample covariance (PyPortfolioOpt sample_cov)"""
+        if self.count < 2:
+            raise ValueError("RollingCovariance needs at least two observations")
+        cov = (self._cross - np.outer(self._sum, self._sum) / self.count) / (self.count - 1)
+        return pd.DataFrame(cov * self.frequency, index=self.tickers, columns=self.tickers)
+
+    def estimates(self) -> Tuple[pd.Series, pd.DataFrame]:
+        """(mu, S) ready for CSVPortfolioOptimizer.optimize_portfolio(estimates=...)"""
+        return self.mean_return(), self.covariance()
@@ -0,0 +1,132 @@
+"""
+Share Allocation for F2 Portfolio Recommender
+Vectorized greedy conversion of portfolio weights into whole-share counts,
+for one or many portfolio values in a single call
+
+Follows pypfopt's DiscreteAllocation.greedy_portfolio step for step (same
+shares and leftover for long-only weights), but works on arrays: the first
+round is one floor division for all values, and each pass of the second
+round buys the next share for every portfolio value still holding cash, so
+its loop runs as often as the longest single allocation needs rather than
+once per share of every allocation.
+"""
+import logging
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# greedy_portfolio gives up when this many higher-deficit tickers are unaffordable
+MAX_UNAFFORDABLE_SKIPS = 10
+
+
+def _top_candidates(deficit: np.ndarray) -> np.ndarray:
+    """
+    Column indices of each row's largest deficits, largest first
+
+    Matches a stable descending argsort truncated to MAX_UNAFFORDABLE_SKIPS
+    (ties go to the lower index) without sorting whole rows.
+
+    Args:
+        deficit: Portfolio values x tickers
+
+    Returns:
+        Portfolio values x min(tickers, MAX_UNAFFORDABLE_SKIPS) indices
+    """
+    k = MAX_UNAFFORDABLE_SKIPS
+    if deficit.shape[1] <= k:
+        return np.argsort(-deficit, axis=1, kind="stable")
+
+    # k-th largest deficit per row; keep everything above it and the lowest-index ties
+    kth = -np.partition(-deficit, k - 1, axis=1)[:, k - 1:k]
+    above = deficit > kth
+    ties = deficit == kth
+    keep = above | (ties & (np.cumsum(ties, axis=1) <= k - above.sum(axis=1, keepdims=True)))
+    top = np.nonzero(keep)[1].reshape(len(deficit), k)
+
+    # Index order already; a stable sort by deficit puts ties lowest index first
+    order = np.argsort(-np.take_along_axis(deficit, top, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1)
+
+
+def greedy_allocation(
+    weights: Dict[str, float],
+    latest_prices: pd.Series,
+    portfolio_values: Sequence[float]
+) -> List[Tuple[Dict[str, int], float]]:
+    """
+    Whole-share allocations of long-only weights for several portfolio values
+
+    Round one buys floor(weight * value / price) shares of every ticker.
+    Round two repeatedly buys one share of the ticker furthest below its
+    target weight that the leftover cash can still pay for.
+
+    Args:
+        weights: Target weights by ticker (non-negative)
+        latest_prices: Price of each ticker
+        portfolio_values: Amounts to invest ($), one allocation each
+
+    Returns:
+        One (shares by ticker, leftover cash) per portfolio value, tickers in
+        descending weight order and without zero positions
+    """
+    if not weights:
+        raise ValueError("weights must not be empty")
+    values = np.asarray(portfolio_values, dtype=np.float64)
+    if values.ndim != 1 or (values <= 0).any():
+        raise ValueError("portfolio_values must be positive amounts")
+
+    # Descending weight order, ties in input order (as greedy_portfolio's stable sort)
+    tickers = list(weights)
+    target = np.array([weights[t] for t in tickers], dtype=np.float64)
+    if np.isnan(target).any() or (target < 0).any():
+        raise ValueError("weights must be non-negative numbers")
+    order = np.argsort(-target, kind="stable")
+    tickers = [tickers[i] for i in order]
+    target = target[order]
+
+    prices = latest_prices.reindex(tickers).to_numpy(dtype=np.float64)
+    if np.isnan(prices).any() or (prices <= 0).any():
+        missing = [t for t, p in zip(tickers, prices) if not p > 0]
+        raise ValueError(f"No valid latest price for: {missing}")
+
+    # Round one: round every target position down to whole shares
+    shares = np.floor(target * values[:, None] / prices).astype(np.int64)
+    funds = values.copy()
+    for j in range(len(tickers)):
+        # Ticker by ticker, so the leftover rounds exactly as greedy_portfolio's
+        funds -= shares[:, j] * prices[j]
+
+    # Round two: one share per still-active portfolio value per iteration
+    rows = np.arange(len(values))
+    active = funds > 0
+    while active.any():
+        live = rows[active]
+        holdings = shares[live] * prices
+        totals = holdings.sum(axis=1, keepdims=True)
+        current = np.divide(holdings, totals, out=np.zeros_like(holdings), where=totals > 0)
+        deficit = target - current
+
+        # Candidates by descending deficit; only the first few may be skipped for price
+        ranked = _top_candidates(deficit)
+        ranked_deficit = np.take_along_axis(deficit, ranked, axis=1)
+        # Nothing bought yet: greedy_portfolio's weights are NaN and it walks the tickers in order
+        wanted = (ranked_deficit > 0) | (totals == 0)
+        affordable = (prices[ranked] <= funds[live, None]) & wanted
+
+        can_buy = affordable.any(axis=1)
+        active[live[~can_buy]] = False
+        buyers = live[can_buy]
+        if not len(buyers):
+            break
+        picks = ranked[can_buy, affordable[can_buy].argmax(axis=1)]
+        shares[buyers, picks] += 1
+        funds[buyers] -= prices[picks]
+        active[buyers] = funds[buyers] > 0
+
+    return [
+        ({t: int(n) for t, n in zip(tickers, row) if n != 0}, float(leftover))
+        for row, leftover in zip(shares, funds)
+    ]
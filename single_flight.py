@@ -0,0 +1,170 @@
+"""
+Request Coalescing for F2 Portfolio Recommender
+Single-flight execution: concurrent calls with the same key share one computation
+
+The first caller for a key runs the computation; callers arriving while it
+is in flight wait for it and receive its result (a deep copy, so callers can
+modify what they get) or its exception. Nothing is kept afterwards, so this
+collapses bursts of identical requests without serving stale results; the
+estimate, frontier and session caches handle reuse over time.
+
+Threads and event loops share the same flights: a coroutine can follow a
+computation started by a thread and vice versa, and coroutines wait without
+blocking their event loop.
+
+Usage:
+    flights = SingleFlight()
+    result = flights.do(("optimize_portfolio", "medium", 10), lambda: solve("medium", 10))
+    params = await flights.do_async(("extract", query), lambda: extract_async(query))
+"""
+import asyncio
+import copy
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    """One in-flight computation and its outcome"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+        # Coroutines following the flight, woken on their own event loop
+        self.waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def outcome(self) -> Any:
+        """A follower's copy of the result (or the leader's exception)"""
+        if self.error is not None:
+            raise self.error
+        return copy.deepcopy(self.result)
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():  # The follower may have been cancelled
+        waiter.set_result(None)
+
+
+class SingleFlight:
+    """
+    Thread-safe coalescing of identical concurrent calls
+
+    Keys must be hashable and identify everything the result depends on.
+    """
+
+    def __init__(self):
+        self.leaders = 0
+        self.followers = 0
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def _join(
+        self,
+        key: Hashable,
+        loop: Optional[asyncio.AbstractEventLoop] = None
+    ) -> Tuple[_Flight, bool, Optional[asyncio.Future]]:
+        """The key's flight, whether the caller leads it, and an async follower's waiter"""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = _Flight()
+                self._flights[key] = flight
+                self.leaders += 1
+                return flight, True, None
+            flight.followers += 1
+            self.followers += 1
+            waiter = None
+            if loop is not None:
+                waiter = loop.create_future()
+                flight.waiters.append((loop, waiter))
+            return flight, False, waiter
+
+    def _land(
+        self,
+        key: Hashable,
+        flight: _Flight,
+        result: Any = None,
+        error: Optional[BaseException] = None
+    ) -> None:
+        """Publish the leader's outcome and wake every follower"""
+        with self._lock:
+            del self._flights[key]
+        # Nobody can join any more; followers copy a snapshot the leader never touches
+        if flight.followers:
+            logger.info(f"Coalesced {flight.followers} concurrent duplicate request(s)")
+            if error is None:
+                flight.result = copy.deepcopy(result)
+        flight.error = error
+        flight.done.set()
+        for loop, waiter in flight.waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                pass  # The follower's event loop is closed
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Return fn()'s result, sharing the computation with concurrent callers of the same key
+
+        Args:
+            key: Identifies the computation
+            fn: Computes the result (run by the first caller only)
+
+        Returns:
+            The result (followers each get their own deep copy)
+
+        Raises:
+            Whatever fn raised, in every waiting caller
+        """
+        flight, leader, _ = self._join(key)
+        if not leader:
+            flight.done.wait()
+            return flight.outcome()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self._land(key, flight, error=e)
+            raise
+        self._land(key, flight, result)
+        return result
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Async do(): the first caller awaits fn(); followers wait without blocking their loop
+
+        Args:
+            key: Identifies the computation (shared with do())
+            fn: Returns an awaitable of the result (awaited by the first caller only)
+
+        Returns:
+            The result (followers each get their own deep copy)
+
+        Raises:
+            Whatever fn raised, in every waiting caller
+        """
+        flight, leader, waiter = self._join(key, asyncio.get_running_loop())
+        if not leader:
+            await waiter
+            return flight.outcome()
+
+        try:
+            result = await fn()
+        except BaseException as e:
+            self._land(key, flight, error=e)
+            raise
+        self._land(key, flight, result)
+        return result
+
+    def stats(self) -> Dict:
+        """Computations run, calls that joined one, and keys in flight"""
+        with self._lock:
+            return {
+                "leaders": self.leaders,
+                "followers": self.followers,
+                "in_flight": len(self._flights),
+            }
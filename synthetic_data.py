@@ -0,0 +1,245 @@
+"""
+Synthetic Market Data Generator for F2 Portfolio Recommender
+Writes Portfolio.csv / Portfolio_prices.csv-compatible files of any size with a
+correlated factor structure, streaming the prices so memory stays bounded
+
+Daily log returns follow
+
+    r[t, i] = alpha[i] + beta[i] * market[t] + gamma[i] * sector[t, s(i)]
+              + loadings[i] @ style[t] + vol[i] * noise[t, i]
+
+Every random component has its own generator, so the output for a seed
+does not depend on the chunk size.
+
+Usage:
+    python synthetic_data.py OUTPUT_DIR --tickers 5000 --sectors 20 --years 20
+"""
+import argparse
+import logging
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS_PER_YEAR = 252
+DEFAULT_CHUNK_DAYS = 63  # Trading days generated and written per block
+
+# Sector names of the production universe, extended with numbered sectors
+BASE_SECTORS = ["IT", "Finance", "Healthcare", "Engineering", "Food & Beverages"]
+
+PRICE_COLUMNS = ["Date", "Ticker", "Open", "High", "Low", "Close", "Adjusted", "Volume"]
+
+
+class SyntheticMarket:
+    """
+    Factor model of daily prices for a synthetic stock universe
+
+    Per-ticker parameters are drawn once at construction (O(tickers) memory);
+    prices are produced in blocks of days by iter_chunks().
+    """
+
+    def __init__(
+        self,
+        n_tickers: int = 27,
+        n_sectors: int = 5,
+        n_days: int = 5 * TRADING_DAYS_PER_YEAR,
+        n_factors: int = 3,
+        seed: int = 0,
+        start_date: str = "2020-01-03",
+        sectors: Optional[Dict[str, List[str]]] = None
+    ):
+        """
+        Initialize market
+
+        Args:
+            n_tickers: Number of stocks (ignored if sectors is given)
+            n_sectors: Number of sectors (ignored if sectors is given)
+            n_days: Trading days of history
+            n_factors: Style factors on top of the market and sector factors
+            seed: Random seed
+            start_date: First trading date
+            sectors: Explicit {sector: [tickers]} universe
+        """
+        if sectors is None:
+            width = max(4, len(str(n_tickers - 1)))
+            sector_names = [
+                BASE_SECTORS[k] if k < len(BASE_SECTORS) else f"Sector {k + 1}" for k in range(n_sectors)
+            ]
+            self.tickers = [f"T{i:0{width}d}" for i in range(n_tickers)]
+            self.sector_names = sector_names
+            sector_index = np.arange(n_tickers) % n_sectors
+        else:
+            self.sector_names = list(sectors)
+            self.tickers = [ticker for tickers in sectors.values() for ticker in tickers]
+            sector_index = np.array([k for k, tickers in enumerate(sectors.values()) for _ in tickers])
+
+        self.sector_index = sector_index
+        self.n_days = n_days
+        self.n_factors = n_factors
+        self.dates = pd.bdate_range(start_date, periods=n_days)
+
+        seeds = np.random.SeedSequence(seed).spawn(4)
+        params = np.random.default_rng(seeds[0])
+        self._factor_rng = np.random.default_rng(seeds[1])
+        self._noise_rng = np.random.default_rng(seeds[2])
+        self._volume_rng = np.random.default_rng(seeds[3])
+
+        n = len(self.tickers)
+        self.alpha = params.uniform(0.0001, 0.0009, n)
+        self.beta = params.uniform(0.6, 1.4, n)
+        self.gamma = params.uniform(0.4, 1.2, n)
+        self.loadings = params.normal(0.0, 0.5, (n, n_factors))
+        self.vol = params.uniform(0.008, 0.025, n)
+        self.start_price = params.uniform(20.0, 500.0, n)
+        self.market_vol = 0.01
+        self.sector_vol = 0.006
+        self.style_vol = 0.004
+
+    @property
+    def sectors(self) -> List[str]:
+        """Sector of each ticker"""
+        return [self.sector_names[k] for k in self.sector_index]
+
+    def iter_chunks(self, chunk_days: int = DEFAULT_CHUNK_DAYS) -> Iterator[Tuple[pd.DatetimeIndex, np.ndarray]]:
+        """
+        Generate prices block by block
+
+        Args:
+            chunk_days: Trading days per block
+
+        Yields:
+            (dates, closes) with closes of shape (days in block, tickers)
+        """
+        n = len(self.tickers)
+        n_sectors = len(self.sector_names)
+        log_price = np.log(self.start_price)
+        for start in range(0, self.n_days, chunk_days):
+            days = min(chunk_days, self.n_days - start)
+            factors = self._factor_rng.standard_normal((days, 1 + n_sectors + self.n_factors))
+            market = factors[:, 0] * self.market_vol
+            sector = factors[:, 1:1 + n_sectors] * self.sector_vol
+            style = factors[:, 1 + n_sectors:] * self.style_vol
+
+            returns = self._noise_rng.standard_normal((days, n))
+            returns *= self.vol
+            returns += self.alpha
+            returns += market[:, None] * self.beta
+            returns += sector[:, self.sector_index] * self.gamma
+            if self.n_factors:
+                returns += style @ self.loadings.T
+
+            log_prices = log_price + np.cumsum(returns, axis=0)
+            log_price = log_prices[-1]
+            yield self.dates[start:start + days], np.exp(log_prices)
+
+    def write(self, directory: Path, chunk_days: int = DEFAULT_CHUNK_DAYS) -> Tuple[Path, Path]:
+        """
+        Write Portfolio.csv and Portfolio_prices.csv into a directory
+
+        Prices are long format (one row per date and ticker, ordered by date)
+        and are written one block of days at a time.
+
+        Args:
+            directory: Output directory (created if missing)
+            chunk_days: Trading days generated and written per block
+
+        Returns:
+            (portfolio_csv, prices_csv)
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        portfolio_csv = directory / "Portfolio.csv"
+        prices_csv = directory / "Portfolio_prices.csv"
+
+        n = len(self.tickers)
+        tickers = np.array(self.tickers, dtype=object)
+        closes = None
+        with open(prices_csv, "w", newline="", encoding="utf-8") as f:
+            f.write(",".join(PRICE_COLUMNS) + "\n")
+            for dates, closes in self.iter_chunks(chunk_days):
+                days = len(dates)
+                flat = closes.ravel()
+                spread = 1.0 + 0.01 * self._volume_rng.random(flat.shape)
+                pd.DataFrame({
+                    "Date": np.repeat(dates.strftime("%Y-%m-%d").to_numpy(), n),
+                    "Ticker": np.tile(tickers, days),
+                    "Open": flat,
+                    "High": flat * spread,
+                    "Low": flat / spread,
+                    "Close": flat,
+                    "Adjusted": flat,
+                    "Volume": self._volume_rng.integers(1_000, 5_000_000, flat.shape),
+                }).to_csv(f, header=False, index=False, float_format="%.4f")
+
+        pd.DataFrame({
+            "Ticker": self.tickers,
+            "Sector": self.sectors,
+            "Price": closes[-1].round(2),
+            "Weight": np.full(n, 1.0 / n).round(6),
+        }).to_csv(portfolio_csv, index=False)
+
+        return portfolio_csv, prices_csv
+
+
+def write_dataset(
+    directory: Path,
+    n_tickers: int = 27,
+    n_sectors: int = 5,
+    n_days: int = 5 * TRADING_DAYS_PER_YEAR,
+    n_factors: int = 3,
+    seed: int = 0,
+    start_date: str = "2020-01-03",
+    sectors: Optional[Dict[str, List[str]]] = None,
+    chunk_days: int = DEFAULT_CHUNK_DAYS
+) -> Tuple[Path, Path]:
+    """
+    Write a synthetic Portfolio.csv / Portfolio_prices.csv pair
+
+    Args:
+        directory: Output directory
+        n_tickers: Number of stocks (ignored if sectors is given)
+        n_sectors: Number of sectors (ignored if sectors is given)
+        n_days: Trading days of history
+        n_factors: Style factors on top of the market and sector factors
+        seed: Random seed
+        start_date: First trading date
+        sectors: Explicit {sector: [tickers]} universe
+        chunk_days: Trading days generated and written per block
+
+    Returns:
+        (portfolio_csv, prices_csv)
+    """
+    market = SyntheticMarket(n_tickers, n_sectors, n_days, n_factors, seed, start_date, sectors)
+    return market.write(directory, chunk_days)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output_dir", type=Path)
+    parser.add_argument("--tickers", type=int, default=27)
+    parser.add_argument("--sectors", type=int, default=5)
+    parser.add_argument("--years", type=float, default=5)
+    parser.add_argument("--factors", type=int, default=3, help="Style factors besides market and sector")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start-date", default="2005-01-03")
+    parser.add_argument("--chunk-days", type=int, default=DEFAULT_CHUNK_DAYS)
+    args = parser.parse_args()
+
+    n_days = int(args.years * TRADING_DAYS_PER_YEAR)
+    start = time.perf_counter()
+    portfolio_csv, prices_csv = write_dataset(
+        args.output_dir, args.tickers, args.sectors, n_days, args.factors, args.seed, args.start_date,
+        chunk_days=args.chunk_days
+    )
+    print(
+        f"Wrote {args.tickers} tickers x {n_days} days to {prices_csv} "
+        f"({prices_csv.stat().st_size / 1e6:.1f} MB) and {portfolio_csv} in {time.perf_counter() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
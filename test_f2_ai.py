@@ -17,14 +17,15 @@ def test_age_groups():
     print("F2 PORTFOLIO AI - CONTEXT-AWARE TESTING")
     print("=" * 100)
     
-    for category, query in test_cases:
+    # All queries are sent concurrently; results come back in input order
+    results = agent.process_queries([query for _, query in test_cases])
+    
+    for (category, query), result in zip(test_cases, results):
         print(f"\n{'='*100}")
         print(f"🎯 {category.upper()} TEST")
         print(f"Query: \"{query}\"")
         print(f"{'='*100}\n")
         
-        result = agent.process_query(query)
-        
         if result["success"]:
             params = result["parameters"]
             metrics = result["recommendation"]["metrics"]
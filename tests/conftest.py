@@ -0,0 +1,31 @@
+"""
+Shared fixtures: small synthetic Portfolio.csv / Portfolio_prices.csv pair
+so data and optimizer tests run offline and deterministically
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from synthetic_data import write_dataset  # noqa: E402
+
+SECTORS = {
+    "IT": ["AAPL", "MSFT", "CSCO"],
+    "Finance": ["JPM", "V", "MS"],
+    "Healthcare": ["JNJ", "UNH", "PFE"],
+    "Engineering": ["CAT", "GE", "DE"],
+    "Food & Beverages": ["KO", "PG"],
+}
+
+
+def write_synthetic_dataset(directory, n_days: int = 400, seed: int = 7):
+    """Write a deterministic long-format price history and portfolio file"""
+    return write_dataset(directory, n_days=n_days, seed=seed, start_date="2022-01-03", sectors=SECTORS)
+
+
+@pytest.fixture
+def synthetic_csvs(tmp_path):
+    """(portfolio_csv, prices_csv) paths in a fresh temporary directory"""
+    return write_synthetic_dataset(tmp_path)
@@ -0,0 +1,268 @@
+"""
+Tests for CerebrasPortfolioAgent entry points (offline, stubbed LLM client)
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from agent_cerebras import CerebrasPortfolioAgent
+from cerebras_stub import STUB_EXPLANATION, StubCerebrasServer, default_responder
+from config_new import MANDATORY_DISCLAIMER
+from data_loader import PortfolioDataLoader
+from extraction_cache import ExtractionCache
+from portfolio_optimizer_csv import CSVPortfolioOptimizer
+
+
+class RecordingCompletions:
+    """Stands in for client.chat.completions and records requests"""
+
+    def __init__(self, content="Your portfolio is balanced."):
+        self.content = content
+        self.requests = []
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs)
+        message = SimpleNamespace(content=self.content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+@pytest.fixture
+def agent(synthetic_csvs, tmp_path):
+    agent = CerebrasPortfolioAgent(
+        optimizer=CSVPortfolioOptimizer(PortfolioDataLoader(*synthetic_csvs)),
+        extraction_cache=ExtractionCache(tmp_path / "cache.sqlite3")
+    )
+    agent.client = SimpleNamespace(chat=SimpleNamespace(completions=RecordingCompletions()))
+    return agent
+
+
+class TestRecommend:
+    """Test suite for the structured recommend() fast path"""
+
+    def test_no_llm_calls(self, agent):
+        """Test: Structured requests go straight to the optimizer"""
+        result = agent.recommend({"risk_profile": "Medium", "horizon_years": 7})
+
+        assert result["success"]
+        assert agent.client.chat.completions.requests == []
+        assert result["parameters"]["risk_profile"] == "medium"
+        assert result["metadata"]["explanation_source"] == "optimizer"
+        assert MANDATORY_DISCLAIMER in result["recommendation"]["explanation"]
+        assert abs(sum(result["recommendation"]["allocation"].values()) - 1.0) < 0.01
+
+    def test_target_volatility_uses_frontier(self, agent):
+        """Test: A volatility target is answered from the cached frontier"""
+        result = agent.recommend({"risk_profile": "low", "horizon_years": 5, "target_volatility": 0.14})
+
+        assert result["success"]
+        assert "frontier" in result["recommendation"]
+        assert agent.optimizer.frontier_cache.stats()["size"] == 1
+
+    def test_optional_llm_explanation(self, agent):
+        """Test: explain=True adds exactly one LLM call for the commentary"""
+        result = agent.recommend({"risk_profile": "low", "horizon_years": 5}, explain=True)
+
+        assert len(agent.client.chat.completions.requests) == 1
+        assert result["recommendation"]["explanation"].startswith("Your portfolio is balanced.")
+        assert result["metadata"]["explanation_source"] == "llm"
+
+    def test_reports_objective(self, agent):
+        """Test: Metadata names the objective that was actually solved"""
+        objectives = [
+            agent.recommend(params)["metadata"]["objective"] for params in (
+                {"risk_profile": "low", "horizon_years": 5},
+                {"risk_profile": "medium", "horizon_years": 5},
+                {"risk_profile": "medium", "horizon_years": 5, "target_volatility": 0.2},
+                {"risk_profile": "medium", "horizon_years": 5, "risk_aversion": 2.0},
+            )
+        ]
+
+        assert objectives == ["min_volatility", "max_sharpe", "frontier", "risk_aversion"]
+
+    def test_invalid_risk_profile(self, agent):
+        """Test: Unknown risk profiles are rejected without optimizing"""
+        result = agent.recommend({"risk_profile": "reckless", "horizon_years": 5})
+
+        assert not result["success"]
+        assert "reckless" in result["message"]
+
+
+@pytest.fixture
+def stub_server():
+    with StubCerebrasServer(latency=0.2) as server:
+        yield server
+
+
+def make_stub_agent(synthetic_csvs, tmp_path, server, **kwargs):
+    return CerebrasPortfolioAgent(
+        api_key="test-key",
+        optimizer=CSVPortfolioOptimizer(PortfolioDataLoader(*synthetic_csvs)),
+        extraction_cache=ExtractionCache(tmp_path / "cache.sqlite3"),
+        base_url=server.base_url,
+        **kwargs
+    )
+
+
+class TestAsyncQueries:
+    """Test suite for concurrent query processing against the local stub API"""
+
+    QUERIES = [
+        "Build me a medium risk portfolio for 12 years",
+        "Conservative portfolio for 5 years please",
+        "I'm 40 and want a low risk portfolio for 20 years",
+    ]
+
+    def test_batch_preserves_order(self, synthetic_csvs, tmp_path, stub_server):
+        """Test: Batched queries run concurrently and return in input order"""
+        agent = make_stub_agent(synthetic_csvs, tmp_path, stub_server, requests_per_second=None)
+        results = agent.process_queries(self.QUERIES)
+
+        assert [r["parameters"]["risk_profile"] for r in results] == ["medium", "low", "low"]
+        assert [r["parameters"]["horizon_years"] for r in results] == [12, 5, 20]
+        assert all(STUB_EXPLANATION in r["recommendation"]["explanation"] for r in results)
+        assert stub_server.max_in_flight > 1
+
+    def test_concurrency_limit(self, synthetic_csvs, tmp_path, stub_server):
+        """Test: No more than max_concurrency requests are in flight"""
+        agent = make_stub_agent(
+            synthetic_csvs, tmp_path, stub_server, max_concurrency=2, requests_per_second=None
+        )
+        agent.process_queries([f"Medium risk portfolio for {years} years" for years in range(3, 9)])
+
+        assert stub_server.requests == 12
+        assert stub_server.max_in_flight == 2
+
+    def test_rate_limit_spaces_requests(self, synthetic_csvs, tmp_path):
+        """Test: Request starts are spaced by 1 / requests_per_second"""
+        starts = []
+
+        def responder(request):
+            starts.append(time.monotonic())
+            return default_responder(request)
+
+        with StubCerebrasServer(responder=responder) as server:
+            agent = make_stub_agent(synthetic_csvs, tmp_path, server, requests_per_second=20)
+            agent.process_queries(["Tell me about diversification"] * 4)
+
+        gaps = np.diff(sorted(starts))
+        assert len(starts) == 4
+        assert gaps.min() > 0.04
+
+    def test_async_matches_sync(self, synthetic_csvs, tmp_path, stub_server):
+        """Test: process_query_async returns the same recommendation as process_query"""
+        agent = make_stub_agent(synthetic_csvs, tmp_path, stub_server)
+        query = "Low risk portfolio for 8 years"
+
+        sync_result = agent.process_query(query)
+        agent.extraction_cache.clear()
+        async_result = asyncio.run(agent.process_query_async(query))
+
+        assert async_result["parameters"] == sync_result["parameters"]
+        assert async_result["recommendation"]["allocation"] == sync_result["recommendation"]["allocation"]
+
+
+class FailingCompletions:
+    def create(self, **kwargs):
+        raise ConnectionError("API unavailable")
+
+
+class TestStreaming:
+    """Test suite for streamed explanations"""
+
+    def test_portfolio_results_before_explanation(self, synthetic_csvs, tmp_path):
+        """Test: Metrics are returned before the explanation is requested, which then streams in chunks"""
+        with StubCerebrasServer(token_interval=0.001) as server:
+            agent = make_stub_agent(synthetic_csvs, tmp_path, server)
+            result = agent.process_query_stream("Low risk portfolio for 8 years")
+
+            assert result["success"]
+            assert result["recommendation"]["metrics"]["annual_volatility"] > 0
+            assert result["recommendation"]["explanation"] == ""
+            assert server.requests == 1  # extraction only
+
+            chunks = list(result["stream"])
+
+        assert len(chunks) > 5
+        assert "".join(chunks) == result["recommendation"]["explanation"]
+        assert result["recommendation"]["explanation"].startswith(STUB_EXPLANATION)
+        assert MANDATORY_DISCLAIMER in result["recommendation"]["explanation"]
+        assert result["metadata"]["explanation_source"] == "llm"
+
+    def test_chat_stream_fills_message(self, synthetic_csvs, tmp_path, stub_server):
+        """Test: Streamed chat replies end up in the response message"""
+        agent = make_stub_agent(synthetic_csvs, tmp_path, stub_server)
+        result = agent.process_query_stream("hello there")
+
+        assert result["is_chat"]
+        assert "".join(result["stream"]) == result["message"] == STUB_EXPLANATION
+
+    def test_failed_stream_falls_back(self, agent):
+        """Test: The optimizer's explanation is streamed if the LLM call fails"""
+        params = {"risk_profile": "low", "horizon_years": 5}
+        optimization_result = agent.optimizer.optimize_portfolio("low", 5)
+        agent.client = SimpleNamespace(chat=SimpleNamespace(completions=FailingCompletions()))
+
+        assert "".join(agent.stream_explanation(params, optimization_result)) == optimization_result["explanation"]
+
+
+class TestSpeculativeOptimization:
+    """Test suite for overlapping the optimizer with the extraction call"""
+
+    def test_hit_reuses_solution(self, synthetic_csvs, tmp_path):
+        """Test: A speculative solve that matches the LLM parameters is reused"""
+        with StubCerebrasServer(latency=0.3) as server:
+            agent = make_stub_agent(synthetic_csvs, tmp_path, server)
+            result = agent.process_query("Conservative portfolio for 8 years")
+
+        timings = result["metadata"]["timings"]
+        assert result["metadata"]["speculation"] == "hit"
+        assert result["parameters"]["horizon_years"] == 8
+        assert timings["extraction"] >= 0.3
+        # The solve finished while the extraction call was in flight
+        assert timings["optimization"] < timings["speculative_solve"] + 0.05
+        assert {"input_guardrail", "intent", "solve", "explanation", "output_guardrail", "total"} <= set(timings)
+        assert {s["name"] for s in result["metadata"]["spans"]} >= {"speculative_solve", "estimation"}
+
+    def test_miss_discards_solution(self, synthetic_csvs, tmp_path):
+        """Test: The LLM's parameters win when they disagree with the regex guess"""
+        def responder(request):
+            reply = default_responder(request)
+            return reply.replace('"low"', '"medium"') if reply.startswith("{") else reply
+
+        with StubCerebrasServer(responder=responder) as server:
+            agent = make_stub_agent(synthetic_csvs, tmp_path, server)
+            speculative = agent.process_query("Conservative portfolio for 8 years")
+            agent.extraction_cache.clear()
+            agent.speculative_optimization = False
+            sequential = agent.process_query("Conservative portfolio for 8 years")
+
+        assert speculative["metadata"]["speculation"] == "miss"
+        assert sequential["metadata"]["speculation"] == "off"
+        assert speculative["parameters"]["risk_profile"] == "medium"
+        assert speculative["recommendation"]["allocation"] == sequential["recommendation"]["allocation"]
+
+    def test_busy_workers_skip_speculation(self, synthetic_csvs, tmp_path, stub_server):
+        """Test: Requests do not queue behind running speculative solves"""
+        agent = make_stub_agent(synthetic_csvs, tmp_path, stub_server, speculation_workers=2)
+        assert agent._speculation_slots.acquire(blocking=False)
+        assert agent._speculation_slots.acquire(blocking=False)
+
+        busy = agent.process_query("Conservative portfolio for 8 years")
+        agent._speculation_slots.release()
+        agent.extraction_cache.clear()
+        free = agent.process_query("Conservative portfolio for 8 years")
+
+        assert busy["metadata"]["speculation"] == "busy"
+        assert free["metadata"]["speculation"] == "hit"
+        assert busy["recommendation"]["allocation"] == free["recommendation"]["allocation"]
+
+    def test_cached_extraction_skips_speculation(self, synthetic_csvs, tmp_path, stub_server):
+        """Test: No speculation when the extraction comes from the cache"""
+        agent = make_stub_agent(synthetic_csvs, tmp_path, stub_server)
+        agent.process_query("Low risk portfolio for 8 years")
+        result = agent.process_query("Low risk portfolio for 8 years")
+
+        assert result["metadata"]["speculation"] == "cached"
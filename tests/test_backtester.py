@@ -0,0 +1,105 @@
+"""
+Tests for the walk-forward backtester
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtester import WalkForwardBacktester
+from data_loader import PortfolioDataLoader
+from portfolio_optimizer_csv import CSVPortfolioOptimizer
+
+
+@pytest.fixture
+def backtester(synthetic_csvs):
+    optimizer = CSVPortfolioOptimizer(PortfolioDataLoader(*synthetic_csvs))
+    return WalkForwardBacktester(optimizer, window=120)
+
+
+class TestWalkForwardBacktester:
+    """Test suite for WalkForwardBacktester"""
+
+    def test_rebalance_positions_are_period_ends(self):
+        """Test: Rebalances fall on the last trading day of each period"""
+        dates = pd.bdate_range("2023-01-02", "2023-12-29")
+
+        quarterly = WalkForwardBacktester.rebalance_positions(dates, "Quarterly")
+
+        assert [d.strftime("%Y-%m-%d") for d in dates[quarterly]] == ["2023-03-31", "2023-06-30", "2023-09-29"]
+        assert len(WalkForwardBacktester.rebalance_positions(dates, "Monthly")) == 11
+        with pytest.raises(ValueError):
+            WalkForwardBacktester.rebalance_positions(dates, "Weekly")
+
+    def test_returns_match_buy_and_hold_between_rebalances(self, backtester):
+        """Test: Vectorized P&L equals a day-by-day drift of the held weights"""
+        result = backtester.run("low", "Quarterly")
+        prices = backtester.optimizer.data_loader.get_historical_prices().ffill().dropna(axis=1)
+        returns = prices.pct_change().iloc[1:]
+
+        first, second = result["rebalances"][:2]
+        period = returns.loc[(returns.index > first["date"]) & (returns.index <= second["date"])]
+        weights = pd.Series(first["weights"])[period.columns].to_numpy()
+        weights = weights / weights.sum()
+
+        expected = []
+        for row in period.to_numpy():
+            daily = float(weights @ row)
+            expected.append(daily)
+            weights = weights * (1 + row) / (1 + daily)
+
+        np.testing.assert_allclose(result["daily_returns"].loc[period.index], expected, atol=1e-5)
+
+    def test_reports_metrics(self, backtester):
+        """Test: Turnover, drawdown and Sharpe are reported and consistent"""
+        result = backtester.run("medium", "Monthly")
+        metrics = result["metrics"]
+
+        assert metrics["rebalances"] == len(result["rebalances"]) > 5
+        assert 0.0 <= metrics["max_drawdown"] < 1.0
+        assert metrics["max_drawdown"] == pytest.approx(-result["drawdown"].min(), abs=1e-4)
+        assert metrics["average_turnover"] > 0.0
+        assert result["equity_curve"].iloc[-1] == pytest.approx(1 + metrics["total_return"], abs=1e-4)
+
+    def test_leaves_callers_caches_alone(self, synthetic_csvs):
+        """Test: Rebalance solves do not fill or evict the given optimizer's caches"""
+        optimizer = CSVPortfolioOptimizer(PortfolioDataLoader(*synthetic_csvs))
+        optimizer.optimize_portfolio("medium", 5)
+        sessions = optimizer.session_cache.stats()
+        frontiers = optimizer.frontier_cache.stats()
+
+        WalkForwardBacktester(optimizer, window=120).run("medium", "Monthly")
+
+        assert optimizer.session_cache.stats() == sessions
+        assert optimizer.frontier_cache.stats() == frontiers
+
+    def test_replays_sector_covariance_model(self, synthetic_csvs):
+        """Test: A sector-model optimizer is backtested on sector-model estimates, not sample covariance"""
+        runs = {
+            model: WalkForwardBacktester(
+                CSVPortfolioOptimizer(PortfolioDataLoader(*synthetic_csvs), covariance_model=model), window=120
+            ).run("low", "Quarterly")
+            for model in ("sample", "sector")
+        }
+
+        assert runs["sector"]["covariance_model"] == "sector"
+        assert runs["sector"]["metrics"]["failed_rebalances"] == 0
+        first = {model: pd.Series(run["rebalances"][0]["weights"]) for model, run in runs.items()}
+        assert (first["sector"] - first["sample"]).abs().max() > 1e-3
+
+    def test_late_listing_joins_once_priced(self, synthetic_csvs):
+        """Test: A ticker listed partway through is left out only until it has a full window"""
+        portfolio_csv, prices_csv = synthetic_csvs
+        prices = pd.read_csv(prices_csv)
+        listing = sorted(prices["Date"].unique())[200]
+        prices = prices[(prices["Ticker"] != "PG") | (prices["Date"] >= listing)]
+        prices.to_csv(prices_csv, index=False)
+
+        result = WalkForwardBacktester(
+            CSVPortfolioOptimizer(PortfolioDataLoader(portfolio_csv, prices_csv)), window=120
+        ).run("low", "Monthly")
+
+        assert "PG" in result["tickers"] and result["unpriced_tickers"] == []
+        early, late = result["rebalances"][0], result["rebalances"][-1]
+        assert early["unpriced_tickers"] == ["PG"] and early["weights"]["PG"] == 0.0
+        assert late["unpriced_tickers"] == [] and late["weights"]["PG"] > 0.0
+        assert np.isfinite(result["daily_returns"]).all()
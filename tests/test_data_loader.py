@@ -0,0 +1,148 @@
+"""
+Tests for the CSV data loader and its binary price store
+"""
+import os
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from data_loader import PortfolioDataLoader
+from price_store import PriceStore
+
+
+def pivot_reference(prices_df, tickers=None, start_date=None, end_date=None, lookback_days=None):
+    """Original filter-then-pivot implementation of get_historical_prices"""
+    if tickers is not None:
+        prices_df = prices_df[prices_df['Ticker'].isin(tickers)]
+    if end_date is None:
+        end_date = prices_df['Date'].max()
+    if lookback_days is not None and start_date is None:
+        start_date = end_date - timedelta(days=lookback_days)
+    if start_date is not None:
+        prices_df = prices_df[prices_df['Date'] >= start_date]
+    prices_df = prices_df[prices_df['Date'] <= end_date]
+    return prices_df.pivot(index='Date', columns='Ticker', values='Adjusted')
+
+
+class TestPriceStore:
+    """Test suite for the columnar on-disk price store"""
+
+    def test_store_matches_csv(self, synthetic_csvs):
+        """Test: Loading from the store reproduces the CSV parse"""
+        _, prices_csv = synthetic_csvs
+        expected = pd.read_csv(prices_csv, parse_dates=['Date'])
+
+        loaded = PriceStore(prices_csv).load()
+
+        pd.testing.assert_frame_equal(loaded, expected)
+
+    def test_store_built_once(self, synthetic_csvs):
+        """Test: A second load reuses the manifest instead of rebuilding"""
+        _, prices_csv = synthetic_csvs
+        store = PriceStore(prices_csv)
+        built_at = store.ensure_fresh()["built_at"]
+
+        assert PriceStore(prices_csv).ensure_fresh()["built_at"] == built_at
+
+    def test_touched_csv_not_rebuilt(self, synthetic_csvs):
+        """Test: An mtime change with identical content keeps the store"""
+        _, prices_csv = synthetic_csvs
+        store = PriceStore(prices_csv)
+        built_at = store.ensure_fresh()["built_at"]
+
+        stat = prices_csv.stat()
+        os.utime(prices_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        assert store.ensure_fresh()["built_at"] == built_at
+        assert store.is_fresh()
+
+    def test_changed_csv_rebuilds(self, synthetic_csvs):
+        """Test: Editing the CSV invalidates and rebuilds the store"""
+        _, prices_csv = synthetic_csvs
+        store = PriceStore(prices_csv)
+        old_version = store.version
+
+        df = pd.read_csv(prices_csv)
+        df.loc[0, 'Adjusted'] = 1.0
+        df.to_csv(prices_csv, index=False)
+
+        assert not store.is_fresh()
+        assert store.version != old_version
+        assert store.load()['Adjusted'].iloc[0] == 1.0
+
+
+class TestPortfolioDataLoader:
+    """Test suite for PortfolioDataLoader"""
+
+    def test_loader_uses_store(self, synthetic_csvs):
+        """Test: Store-backed and CSV-backed loaders return the same prices"""
+        portfolio_csv, prices_csv = synthetic_csvs
+        stored = PortfolioDataLoader(portfolio_csv, prices_csv).get_historical_prices(lookback_days=60)
+        parsed = PortfolioDataLoader(portfolio_csv, prices_csv, use_store=False) \
+            .get_historical_prices(lookback_days=60)
+
+        pd.testing.assert_frame_equal(stored, parsed)
+        assert (prices_csv.parent / ".price_store").exists()
+
+    def test_matrix_queries_match_pivot(self, synthetic_csvs):
+        """Test: Sliced price matrix equals the filter-then-pivot result"""
+        loader = PortfolioDataLoader(*synthetic_csvs)
+        prices_df = loader.load_prices()
+        dates = loader.get_price_matrix().index
+
+        queries = [
+            {},
+            {"tickers": ["MSFT", "AAPL", "KO"]},
+            {"tickers": ["JPM", "UNKNOWN"], "lookback_days": 90},
+            {"start_date": dates[10], "end_date": dates[50]},
+            {"tickers": ["PG"], "end_date": dates[200], "lookback_days": 30},
+        ]
+        for query in queries:
+            pd.testing.assert_frame_equal(
+                loader.get_historical_prices(**query),
+                pivot_reference(prices_df, **query),
+                check_freq=False,
+            )
+
+    def test_full_universe_slice_is_view(self, synthetic_csvs):
+        """Test: All-ticker date-range queries share memory with the cached matrix"""
+        loader = PortfolioDataLoader(*synthetic_csvs)
+        prices = loader.get_historical_prices(lookback_days=30)
+
+        assert np.shares_memory(prices.to_numpy(), loader.get_price_matrix().to_numpy())
+
+    def test_matrix_is_shared_memory_map(self, synthetic_csvs):
+        """Test: Loaders map the store's read-only matrix instead of copying it"""
+        first = PortfolioDataLoader(*synthetic_csvs).get_price_matrix()
+        second = PortfolioDataLoader(*synthetic_csvs).get_price_matrix()
+
+        for matrix in (first, second):
+            values = matrix.to_numpy()
+            assert not values.flags.writeable
+            base = values
+            while not isinstance(base, np.memmap) and base.base is not None:
+                base = base.base
+            assert isinstance(base, np.memmap)
+
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_queries_during_refresh(self, synthetic_csvs):
+        """Test: A refresh right after a reader took the matrix does not break the read"""
+        loader = PortfolioDataLoader(*synthetic_csvs)
+        expected_date = loader.get_latest_date(["AAPL", "KO"])
+        expected_prices = loader.get_latest_prices()
+        expected_history = loader.get_historical_prices(["AAPL"], lookback_days=30)
+        get_price_data = loader._get_price_data
+
+        def then_refresh():
+            price_data = get_price_data()
+            loader._data_version = "previous"  # The CSV changed under the reader
+            assert loader.refresh()
+            return price_data
+
+        loader._get_price_data = then_refresh
+
+        assert loader.get_latest_date(["AAPL", "KO"]) == expected_date
+        pd.testing.assert_series_equal(loader.get_latest_prices(), expected_prices)
+        pd.testing.assert_frame_equal(loader.get_historical_prices(["AAPL"], lookback_days=30), expected_history)
@@ -0,0 +1,98 @@
+"""
+Tests for the persistent LLM extraction cache
+"""
+import json
+import time
+from types import SimpleNamespace
+
+from agent_cerebras import CerebrasPortfolioAgent
+from data_loader import PortfolioDataLoader
+from extraction_cache import ExtractionCache, normalize_query
+from portfolio_optimizer_csv import CSVPortfolioOptimizer
+
+PARAMS = {"risk_profile": "medium", "horizon_years": 5, "sector_preferences": [],
+          "constraints": {}, "confidence": 0.9, "reasoning": "test"}
+
+
+class FakeCompletions:
+    """Stands in for client.chat.completions and counts round trips"""
+
+    def __init__(self, content):
+        self.content = content
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content=self.content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class TestExtractionCache:
+    """Test suite for ExtractionCache"""
+
+    def test_normalized_queries_share_entry(self, tmp_path):
+        """Test: Case, spacing and trailing punctuation do not change the key"""
+        cache = ExtractionCache(tmp_path / "cache.sqlite3")
+        cache.put("Generate an optimal portfolio with medium risk.", "model-a", PARAMS)
+
+        assert cache.get("  generate an OPTIMAL portfolio   with medium risk ", "model-a") == PARAMS
+        assert cache.get("Generate an optimal portfolio with medium risk.", "model-b") is None
+        assert normalize_query("Hi!  There?") == "hi! there"
+        assert cache.stats()["hit_rate"] == 0.5
+
+    def test_persists_and_respects_prompt_version(self, tmp_path):
+        """Test: Entries survive reopening but not a prompt change"""
+        ExtractionCache(tmp_path / "cache.sqlite3", prompt_version="v1").put("q", "m", PARAMS)
+
+        assert ExtractionCache(tmp_path / "cache.sqlite3", prompt_version="v1").get("q", "m") == PARAMS
+        assert ExtractionCache(tmp_path / "cache.sqlite3", prompt_version="v2").get("q", "m") is None
+
+    def test_ttl_and_lru_eviction(self, tmp_path):
+        """Test: Expired entries are not served and the size bound holds"""
+        cache = ExtractionCache(tmp_path / "cache.sqlite3", ttl_seconds=0.05, max_entries=2)
+        cache.put("a", "m", PARAMS)
+        time.sleep(0.1)
+        assert cache.get("a", "m") is None
+
+        cache.ttl_seconds = 60
+        for query in ("a", "b"):
+            cache.put(query, "m", PARAMS)
+        cache.get("a", "m")
+        cache.put("c", "m", PARAMS)
+
+        assert cache.stats()["size"] == 2
+        assert cache.get("b", "m") is None
+        assert cache.get("a", "m") == PARAMS
+
+
+class TestAgentExtractionCaching:
+    """Test suite for cached parameter extraction in the agent"""
+
+    def test_hit_skips_llm_call(self, synthetic_csvs, tmp_path):
+        """Test: A repeated templated query makes a single LLM call"""
+        agent = CerebrasPortfolioAgent(
+            optimizer=CSVPortfolioOptimizer(PortfolioDataLoader(*synthetic_csvs)),
+            extraction_cache=ExtractionCache(tmp_path / "cache.sqlite3")
+        )
+        completions = FakeCompletions(f"```json\n{json.dumps(PARAMS)}\n```")
+        agent.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+        query = "Generate an optimal portfolio with medium risk tolerance for a 5-year horizon."
+        first = agent._extract_parameters(query)
+        second = agent._extract_parameters(query)
+
+        assert completions.calls == 1
+        assert first == second == PARAMS
+
+    def test_fallback_is_not_cached(self, synthetic_csvs, tmp_path):
+        """Test: Unparseable LLM output falls back without poisoning the cache"""
+        agent = CerebrasPortfolioAgent(
+            optimizer=CSVPortfolioOptimizer(PortfolioDataLoader(*synthetic_csvs)),
+            extraction_cache=ExtractionCache(tmp_path / "cache.sqlite3")
+        )
+        agent.client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions("not json")))
+
+        params = agent._extract_parameters("low risk for 3 years")
+
+        assert params["risk_profile"] == "low"
+        assert agent.extraction_cache.stats()["size"] == 0
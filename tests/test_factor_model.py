@@ -0,0 +1,135 @@
+"""
+Tests for the factor covariance model and factor-model solves
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from pypfopt import EfficientFrontier, risk_models
+
+from data_loader import PortfolioDataLoader
+from factor_model import FactorCovariance
+from optimization_session import OptimizationSession
+from portfolio_optimizer_csv import CSVPortfolioOptimizer
+from synthetic_data import write_dataset
+
+
+@pytest.fixture
+def large_csvs(tmp_path):
+    return write_dataset(tmp_path, n_tickers=300, n_sectors=6, n_days=300, seed=11)
+
+
+@pytest.fixture
+def prices(synthetic_csvs):
+    return PortfolioDataLoader(*synthetic_csvs).get_historical_prices()
+
+
+class TestFactorCovariance:
+    """Test suite for FactorCovariance"""
+
+    def test_full_pca_matches_sample_cov(self, prices):
+        """Test: With as many components as tickers the PCA model is the sample covariance"""
+        model = FactorCovariance.from_pca(prices, n_components=prices.shape[1])
+        expected = risk_models.sample_cov(prices, frequency=252)
+
+        np.testing.assert_allclose(model.to_dense().to_numpy(), expected.to_numpy(), atol=1e-6)
+
+    def test_sector_model_structure(self, prices, synthetic_csvs):
+        """Test: One factor per sector, one loading per ticker, variance agrees with the dense form"""
+        loader = PortfolioDataLoader(*synthetic_csvs)
+        model = FactorCovariance.from_sectors(prices, loader.get_sector_mapping())
+
+        assert model.loadings.shape == (14, 5)
+        assert ((model.loadings != 0).sum(axis=1) == 1).all()
+        assert model.nbytes < model.to_dense().to_numpy().nbytes
+
+        weights = {ticker: 1 / 14 for ticker in model.tickers}
+        w = np.full(14, 1 / 14)
+        assert model.portfolio_variance(weights) == pytest.approx(float(w @ model.to_dense().to_numpy() @ w))
+
+    def test_subset(self, prices):
+        """Test: subset keeps the factors and reorders the tickers"""
+        model = FactorCovariance.from_pca(prices, n_components=3)
+        tickers = ["MSFT", "AAPL"]
+        dense = model.to_dense()
+
+        subset = model.subset(tickers)
+        assert list(subset.tickers) == tickers
+        np.testing.assert_allclose(subset.to_dense().to_numpy(), dense.loc[tickers, tickers].to_numpy())
+        with pytest.raises(KeyError):
+            model.subset(["NOPE"])
+
+
+class TestFactorSession:
+    """Test suite for OptimizationSession on a FactorCovariance"""
+
+    def test_matches_dense_frontier(self, prices, synthetic_csvs):
+        """Test: Same portfolios as EfficientFrontier on the equivalent dense matrix"""
+        sector_mapper = PortfolioDataLoader(*synthetic_csvs).get_sector_mapping()
+        model = FactorCovariance.from_sectors(prices, sector_mapper)
+        mu = pd.Series(np.linspace(0.05, 0.3, prices.shape[1]), index=prices.columns)
+        upper = {sector: 0.35 for sector in set(sector_mapper.values())}
+        session = OptimizationSession(mu, model, sector_mapper, max_sector_weight=0.35, min_weight=0.0)
+
+        for objective, kwargs in (("min_volatility", {}), ("max_sharpe", {"risk_free_rate": 0.04}),
+                                  ("efficient_return", {"target_return": 0.2})):
+            dense_ef = EfficientFrontier(mu, model.to_dense())
+            dense_ef.add_sector_constraints(sector_mapper, {}, upper)
+
+            factor_weights, perf = getattr(session, objective)(**{"risk_free_rate": 0.04, **kwargs})
+            dense_weights = getattr(dense_ef, objective)(**kwargs)
+            for ticker in mu.index:
+                assert factor_weights[ticker] == pytest.approx(dense_weights[ticker], abs=1e-3), objective
+            np.testing.assert_allclose(perf, dense_ef.portfolio_performance(risk_free_rate=0.04), atol=1e-3)
+
+
+class TestOptimizerFactorMode:
+    """Test suite for the optimizer's covariance models"""
+
+    def test_auto_keeps_sample_cov_for_small_universe(self, synthetic_csvs):
+        """Test: The 14-stock test universe keeps the dense sample covariance"""
+        optimizer = CSVPortfolioOptimizer(PortfolioDataLoader(*synthetic_csvs), covariance_model="auto")
+        _, S = optimizer._estimate(optimizer.data_loader.get_stock_universe())
+        assert isinstance(S, pd.DataFrame)
+
+    def test_large_universe_uses_factor_model(self, large_csvs):
+        """Test: auto switches to sector factors and the result respects the constraints"""
+        optimizer = CSVPortfolioOptimizer(PortfolioDataLoader(*large_csvs), covariance_model="auto")
+        result = optimizer.optimize_portfolio(risk_profile='medium', horizon_years=10)
+
+        _, S = optimizer._estimate(optimizer.data_loader.get_stock_universe())
+        assert isinstance(S, FactorCovariance)
+        assert sum(result["weights"].values()) == pytest.approx(1.0, abs=1e-2)
+        assert max(result["sector_allocation"].values()) <= 0.35 + 1e-3
+        assert result["metrics"]["annual_volatility"] > 0
+
+    def test_estimates_argument_accepts_factor_model(self, large_csvs):
+        """Test: Precomputed factor estimates are subset to the requested sectors"""
+        optimizer = CSVPortfolioOptimizer(PortfolioDataLoader(*large_csvs), covariance_model="sector")
+        estimates = optimizer._estimate(optimizer.data_loader.get_stock_universe())
+
+        result = optimizer.optimize_portfolio(
+            risk_profile='medium', horizon_years=5, sector_preferences=['IT', 'Finance', 'Healthcare'],
+            estimates=estimates
+        )
+        assert set(result["sector_allocation"]) <= {'IT', 'Finance', 'Healthcare'}
+
+    def test_sample_covariance_above_100_tickers(self, tmp_path):
+        """Test: The weight floor stays feasible for a large dense universe, as in factor mode"""
+        csvs = write_dataset(tmp_path, n_tickers=120, n_sectors=6, n_days=300, seed=5)
+        results = {
+            model: CSVPortfolioOptimizer(PortfolioDataLoader(*csvs), covariance_model=model).optimize_portfolio(
+                risk_profile='medium', horizon_years=10
+            )
+            for model in ("sample", "sector")
+        }
+
+        for result in results.values():
+            assert sum(result["weights"].values()) == pytest.approx(1.0, abs=1e-2)
+            assert min(result["weights"].values()) >= 0.5 / 120 - 1e-3
+            assert max(result["sector_allocation"].values()) <= 0.35 + 1e-3
+        assert CSVPortfolioOptimizer._min_weight(14) == 0.01
+
+    def test_invalid_model_rejected(self, synthetic_csvs):
+        """Test: Unknown covariance models are rejected"""
+        with pytest.raises(ValueError):
+            CSVPortfolioOptimizer(PortfolioDataLoader(*synthetic_csvs), covariance_model="shrunk")
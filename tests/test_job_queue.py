@@ -0,0 +1,113 @@
+"""
+Tests for the background job queue
+"""
+import threading
+
+import pytest
+
+from job_queue import DONE, FAILED, STREAMING, JobQueue
+
+
+@pytest.fixture
+def jobs():
+    queue = JobQueue(max_workers=2, history_size=3)
+    yield queue
+    queue.shutdown()
+
+
+class TestJobQueue:
+    """Test suite for JobQueue"""
+
+    def test_runs_in_background(self, jobs):
+        """Test: submit returns at once; the job can be looked up and waited on"""
+        release = threading.Event()
+        job = jobs.submit(lambda x: release.wait() and x * 2, 21)
+
+        assert not job.done()
+        assert jobs.get(job.id) is job
+        release.set()
+        assert job.wait(5)
+        assert job.status == DONE and job.result == 42
+
+    def test_identical_in_flight_requests_share_a_job(self, jobs):
+        """Test: Same key while in flight joins the running job; afterwards it runs again"""
+        release = threading.Event()
+        calls = []
+
+        def solve(params):
+            calls.append(params)
+            release.wait()
+            return {"success": True}
+
+        key = JobQueue.make_key("recommend", {"risk_profile": "low", "horizon_years": 5})
+        first = jobs.submit(solve, {"risk_profile": "low"}, key=key)
+        second = jobs.submit(solve, {"risk_profile": "low"}, key=JobQueue.make_key(
+            "recommend", {"horizon_years": 5, "risk_profile": "low"}
+        ))
+        assert second is first
+        release.set()
+        first.wait(5)
+
+        third = jobs.submit(solve, {"risk_profile": "low"}, key=key)
+        third.wait(5)
+        assert third is not first and len(calls) == 2
+        assert jobs.stats()["deduplicated"] == 1
+
+    def test_stream_consumed_with_partial_text(self, jobs):
+        """Test: Streamed chunks are visible while arriving; the final result has no stream"""
+        step = threading.Event()
+        seen = threading.Event()
+
+        def stream_query():
+            response = {"success": True, "message": ""}
+
+            def chunks():
+                yield "Hello"
+                seen.set()
+                step.wait()
+                yield " world"
+                response["message"] = "Hello world"
+
+            response["stream"] = chunks()
+            return response
+
+        job = jobs.submit(stream_query)
+        assert seen.wait(5)
+        assert job.text() == "Hello" and "stream" not in job.result
+        step.set()
+        job.wait(5)
+        assert job.result == {"success": True, "message": "Hello world"}
+
+    def test_generator_publishes_each_stage(self, jobs):
+        """Test: Each yielded stage is the partial result; the last one is final"""
+        step = threading.Event()
+        seen = threading.Event()
+
+        def pipeline():
+            result = {"success": True, "weights": {"A": 1.0}}
+            yield result
+            seen.set()
+            step.wait()
+            yield {**result, "monte_carlo": {"median": 1.1}}
+
+        job = jobs.submit(pipeline)
+        assert seen.wait(5)
+        assert job.status == STREAMING and job.result == {"success": True, "weights": {"A": 1.0}}
+        step.set()
+        job.wait(5)
+        assert job.status == DONE and job.result["monte_carlo"] == {"median": 1.1}
+
+    def test_failures_and_history(self, jobs):
+        """Test: Exceptions mark the job failed; only the latest finished jobs are kept"""
+        def boom():
+            raise RuntimeError("solver down")
+
+        failed = jobs.submit(boom)
+        failed.wait(5)
+        assert failed.status == FAILED and isinstance(failed.error, RuntimeError)
+
+        later = [jobs.submit(lambda: None) for _ in range(3)]
+        for job in later:
+            job.wait(5)
+        assert jobs.get(failed.id) is None
+        assert all(jobs.get(job.id) is job for job in later)
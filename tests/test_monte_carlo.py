@@ -0,0 +1,46 @@
+"""
+Tests for the vectorized Monte Carlo simulator
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from monte_carlo import MonteCarloSimulator
+
+TICKERS = ["A", "B"]
+WEIGHTS = {"A": 0.6, "B": 0.4}
+MU = pd.Series([0.08, 0.12], index=TICKERS)
+COV = pd.DataFrame([[0.04, 0.01], [0.01, 0.09]], index=TICKERS, columns=TICKERS)
+
+
+class TestMonteCarloSimulator:
+    """Test suite for MonteCarloSimulator"""
+
+    def test_seeded_and_chunk_invariant(self):
+        """Test: Same seed gives identical results whatever the chunk size"""
+        whole = MonteCarloSimulator(n_paths=500, seed=3, chunk_elements=10**9).simulate(WEIGHTS, MU, COV, 5)
+        chunked = MonteCarloSimulator(n_paths=500, seed=3, chunk_elements=1000).simulate(WEIGHTS, MU, COV, 5)
+
+        assert whole == chunked
+
+    def test_expected_wealth_matches_expected_return(self):
+        """Test: Mean final wealth grows at the portfolio's expected return"""
+        result = MonteCarloSimulator(n_paths=20000, seed=0).simulate(WEIGHTS, MU, COV, 10)
+        expected = (1 + 0.6 * 0.08 + 0.4 * 0.12) ** 10
+
+        assert result["final_value"]["mean"] == pytest.approx(expected, rel=0.03)
+        assert len(result["percentile_bands"][50]) == 11
+        bands = [result["percentile_bands"][p][-1] for p in sorted(result["percentile_bands"])]
+        assert bands == sorted(bands)
+
+    def test_bootstrap_without_losses(self):
+        """Test: Strictly positive history never loses or draws down"""
+        returns = pd.DataFrame(np.full((100, 2), 0.001), columns=TICKERS)
+
+        result = MonteCarloSimulator(n_paths=200, seed=1).simulate_bootstrap(
+            WEIGHTS, returns, 2, initial_value=1000.0
+        )
+
+        assert result["probability_of_loss"] == 0.0
+        assert result["max_drawdown"]["mean"] == 0.0
+        assert result["final_value"]["median"] == pytest.approx(1000.0 * 1.001 ** 504)
@@ -0,0 +1,113 @@
+"""
+Tests for warm-started optimization sessions
+"""
+import numpy as np
+import pytest
+
+from config_new import RISK_FREE_RATE, RISK_PROFILES
+from data_loader import PortfolioDataLoader
+from optimization_session import OptimizationSession
+from portfolio_optimizer_csv import CSVPortfolioOptimizer
+
+
+@pytest.fixture
+def optimizer(synthetic_csvs):
+    return CSVPortfolioOptimizer(PortfolioDataLoader(*synthetic_csvs))
+
+
+@pytest.fixture
+def problem(optimizer):
+    mu, S = optimizer._prepare_estimates('medium', None, None, 252)
+    return mu, S, optimizer._sector_mapper(mu.index)
+
+
+def make_session(problem, max_sector_weight=0.35):
+    mu, S, sector_mapper = problem
+    return OptimizationSession(mu, S, sector_mapper, max_sector_weight)
+
+
+class TestOptimizationSession:
+    """Test suite for OptimizationSession"""
+
+    def test_matches_efficient_frontier(self, optimizer, problem):
+        """Test: Same portfolios as a freshly built EfficientFrontier"""
+        mu, S, sector_mapper = problem
+        session = make_session(problem)
+
+        for objective, args in (("min_volatility", ()), ("max_sharpe", ()),
+                                ("efficient_return", (float(mu.mean()),))):
+            ef = optimizer._build_frontier(mu, S, sector_mapper, RISK_PROFILES['medium'])
+            if objective == "max_sharpe":
+                ef.max_sharpe(risk_free_rate=RISK_FREE_RATE)
+            else:
+                getattr(ef, objective)(*args)
+            expected = ef.clean_weights()
+            weights, performance = getattr(session, objective)(*args, risk_free_rate=RISK_FREE_RATE)
+
+            for ticker in mu.index:
+                assert weights[ticker] == pytest.approx(expected[ticker], abs=1e-3), objective
+            np.testing.assert_allclose(
+                performance, ef.portfolio_performance(risk_free_rate=RISK_FREE_RATE), atol=1e-3
+            )
+
+    def test_sweep_compiles_once(self, problem):
+        """Test: Moving the target only updates the parameter"""
+        session = make_session(problem)
+        low = session.min_volatility()[1][0]
+        targets = np.linspace(low, session.max_return() * 0.95, 6)
+
+        returns = [session.efficient_return(float(t))[1][0] for t in targets]
+        volatilities = [session.efficient_risk(v)[1][1] for v in (0.2, 0.25, 0.3)]
+
+        # min_volatility, max_return, efficient_return and efficient_risk
+        assert session.compiles == 4
+        assert session.solves == 2 + len(targets) + 3
+        assert all(r >= t - 1e-4 for r, t in zip(returns, targets))
+        assert all(v <= cap + 1e-4 for v, cap in zip(volatilities, (0.2, 0.25, 0.3)))
+
+    def test_risk_aversion_lowers_volatility(self, problem):
+        """Test: A higher risk aversion never increases volatility"""
+        session = make_session(problem)
+        volatilities = [session.max_quadratic_utility(delta)[1][1] for delta in (0.5, 2, 8, 32)]
+
+        assert volatilities == sorted(volatilities, reverse=True)
+        with pytest.raises(ValueError):
+            session.max_quadratic_utility(0)
+
+    def test_unreachable_return_rejected(self, problem):
+        """Test: Targets above the maximum feasible return raise ValueError"""
+        session = make_session(problem)
+        with pytest.raises(ValueError):
+            session.efficient_return(session.max_return() + 0.01)
+
+
+class TestOptimizerSessions:
+    """Test suite for session reuse in the optimizer"""
+
+    def test_repeat_optimizations_reuse_session(self, optimizer):
+        """Test: Horizon changes reuse the compiled session of the risk profile"""
+        for years in (5, 10, 15):
+            optimizer.optimize_portfolio(risk_profile='medium', horizon_years=years)
+        optimizer.optimize_portfolio(risk_profile='low', horizon_years=5)
+
+        stats = optimizer.session_cache.stats()
+        assert stats["misses"] == 2
+        assert stats["hits"] == 2
+
+    def test_optimize_for_target(self, optimizer):
+        """Test: Each target kind returns a portfolio meeting it"""
+        by_return = optimizer.optimize_for_target('medium', 10, target_return=0.1)
+        by_volatility = optimizer.optimize_for_target('medium', 10, target_volatility=0.2)
+        by_aversion = optimizer.optimize_for_target('medium', 10, risk_aversion=4.0)
+
+        assert by_return["metrics"]["expected_annual_return"] >= 0.1 - 1e-3
+        assert by_volatility["metrics"]["annual_volatility"] <= 0.2 + 1e-3
+        assert by_aversion["objective"] == {"type": "risk_aversion", "value": 4.0}
+        assert optimizer.session_cache.stats()["size"] == 1
+
+    def test_optimize_for_target_needs_one_target(self, optimizer):
+        """Test: Zero or several targets are rejected"""
+        with pytest.raises(ValueError):
+            optimizer.optimize_for_target('medium', 10)
+        with pytest.raises(ValueError):
+            optimizer.optimize_for_target('medium', 10, target_return=0.1, risk_aversion=2.0)
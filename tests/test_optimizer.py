@@ -0,0 +1,189 @@
+"""
+Tests for the CSV-based portfolio optimizer (offline, synthetic data)
+"""
+import pandas as pd
+import pytest
+
+from data_loader import PortfolioDataLoader
+from portfolio_optimizer_csv import CSVPortfolioOptimizer
+
+
+@pytest.fixture
+def optimizer(synthetic_csvs):
+    return CSVPortfolioOptimizer(PortfolioDataLoader(*synthetic_csvs))
+
+
+class TestEstimateCache:
+    """Test suite for (mu, S) caching in the optimizer"""
+
+    def test_repeat_requests_hit_cache(self, optimizer):
+        """Test: Same universe and window is estimated once"""
+        first = optimizer.optimize_portfolio(risk_profile='low', horizon_years=5)
+        second = optimizer.optimize_portfolio(risk_profile='medium', horizon_years=10)
+
+        stats = optimizer.estimate_cache.stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 1
+        assert first["weights"] != second["weights"]
+
+    def test_universe_and_window_are_part_of_key(self, optimizer):
+        """Test: Different sectors or lookbacks do not share estimates"""
+        optimizer.optimize_portfolio(risk_profile='medium', horizon_years=5)
+        optimizer.optimize_portfolio(risk_profile='medium', horizon_years=5, lookback_days=120)
+        optimizer.optimize_portfolio(
+            risk_profile='medium', horizon_years=5,
+            sector_preferences=['IT', 'Finance', 'Healthcare']
+        )
+
+        assert optimizer.estimate_cache.stats()["misses"] == 3
+
+    def test_cache_invalidated_on_data_change(self, optimizer, synthetic_csvs):
+        """Test: Rewriting the prices CSV empties the cache and re-estimates"""
+        _, prices_csv = synthetic_csvs
+        before = optimizer.optimize_portfolio(risk_profile='low', horizon_years=5)
+
+        df = pd.read_csv(prices_csv)
+        df['Adjusted'] = df['Adjusted'] * (1 + pd.to_datetime(df['Date']).dt.day % 7 * 0.001)
+        df.to_csv(prices_csv, index=False)
+
+        # Estimates never touch the disk; the loader's owner checks for new data
+        assert optimizer.optimize_portfolio(risk_profile='low', horizon_years=5)["metrics"] == before["metrics"]
+        assert optimizer.data_loader.refresh()
+        after = optimizer.optimize_portfolio(risk_profile='low', horizon_years=5)
+
+        assert optimizer.estimate_cache.stats()["misses"] == 2
+        assert before["metrics"] != after["metrics"]
+
+    def test_estimate_does_not_refresh(self, optimizer, monkeypatch):
+        """Test: Requests do not check the CSV for new data"""
+        optimizer.optimize_portfolio(risk_profile='low', horizon_years=5)
+        monkeypatch.setattr(optimizer.data_loader, "refresh", lambda: pytest.fail("refreshed on the request path"))
+
+        optimizer.optimize_portfolio(risk_profile='medium', horizon_years=5)
+
+    def test_lru_bound(self, synthetic_csvs):
+        """Test: The cache never holds more than maxsize entries"""
+        from estimation_cache import EstimateCache
+
+        optimizer = CSVPortfolioOptimizer(
+            PortfolioDataLoader(*synthetic_csvs), estimate_cache=EstimateCache(maxsize=2)
+        )
+        for lookback in (100, 150, 200):
+            optimizer._estimate(optimizer.data_loader.get_stock_universe(), lookback)
+
+        assert optimizer.estimate_cache.stats()["size"] == 2
+
+
+class TestRollingCovariance:
+    """Test suite for the incremental rolling estimator"""
+
+    def test_matches_pypfopt_after_rolling(self, synthetic_csvs):
+        """Test: Sliding the window day by day equals re-estimating from scratch"""
+        from pypfopt import expected_returns, risk_models
+        from rolling_estimator import RollingCovariance
+
+        prices = PortfolioDataLoader(*synthetic_csvs).get_historical_prices()
+        window = 120
+        engine = RollingCovariance.from_prices(prices.iloc[:window + 1], window=window)
+        for date, row in prices.iloc[window + 1:window + 41].iterrows():
+            engine.push_prices(row, date=date)
+
+        expected_window = prices.iloc[40:window + 41]
+        mu, S = engine.estimates()
+        pd.testing.assert_series_equal(
+            mu, expected_returns.mean_historical_return(expected_window), check_names=False
+        )
+        pd.testing.assert_frame_equal(
+            S, risk_models.sample_cov(expected_window), check_names=False
+        )
+
+    def test_optimizer_consumes_estimates(self, optimizer):
+        """Test: optimize_portfolio accepts rolling estimates and skips estimation"""
+        from rolling_estimator import RollingCovariance
+
+        prices = optimizer.data_loader.get_historical_prices()
+        engine = RollingCovariance.from_prices(prices, window=200)
+
+        result = optimizer.optimize_portfolio(
+            risk_profile='medium', horizon_years=5, estimates=engine.estimates()
+        )
+
+        assert abs(sum(result["weights"].values()) - 1.0) < 0.01
+        assert optimizer.estimate_cache.stats()["misses"] == 0
+
+
+class TestFrontierCache:
+    """Test suite for the precomputed efficient frontier"""
+
+    def test_frontier_solved_once(self, optimizer):
+        """Test: Slider moves reuse one cached frontier"""
+        for target in (0.10, 0.14, 0.18, 0.25):
+            optimizer.optimize_on_frontier('medium', 5, target_volatility=target)
+
+        stats = optimizer.frontier_cache.stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 3
+
+    def test_target_volatility_is_met(self, optimizer):
+        """Test: Interpolated portfolio respects the target and constraints"""
+        low, high = optimizer.optimize_on_frontier('medium', 5)["frontier"]["volatility_range"]
+        target = (low + high) / 2
+
+        result = optimizer.optimize_on_frontier('medium', 5, target_volatility=target)
+
+        assert not result["frontier"]["clamped"]
+        assert result["metrics"]["annual_volatility"] <= target + 1e-3
+        assert abs(sum(result["weights"].values()) - 1.0) < 0.01
+        assert min(result["weights"].values()) >= 0.01 - 1e-4
+        assert max(result["sector_allocation"].values()) <= 0.35 + 1e-3
+
+    def test_endpoints_match_direct_solves(self, optimizer):
+        """Test: Out-of-range targets clamp to the min-volatility / max-return portfolios"""
+        floor = optimizer.optimize_on_frontier('low', 5, target_volatility=0.0)
+        direct = optimizer.optimize_portfolio('low', 5)
+
+        assert floor["frontier"]["clamped"]
+        assert abs(floor["metrics"]["annual_volatility"] - direct["metrics"]["annual_volatility"]) < 1e-3
+
+        top = optimizer.optimize_on_frontier('low', 5, target_return=10.0)
+        assert top["frontier"]["clamped"]
+        assert top["metrics"]["expected_annual_return"] >= floor["metrics"]["expected_annual_return"]
+
+
+class TestOptimizeMany:
+    """Test suite for batch optimization"""
+
+    def test_matches_individual_calls_in_order(self, optimizer):
+        """Test: Batch results equal single calls and keep input order"""
+        requests = [
+            {"risk_profile": "medium", "horizon_years": 10},
+            {"risk_profile": "low", "horizon_years": 3},
+            {"risk_profile": "medium", "horizon_years": 5, "sector_preferences": ["IT", "Finance", "Healthcare"]},
+            {"risk_profile": "low", "horizon_years": 7},
+        ]
+
+        batch = optimizer.optimize_many(requests)
+
+        for request, result in zip(requests, batch):
+            single = optimizer.optimize_portfolio(**request)
+            assert result["weights"] == single["weights"]
+            assert result["horizon_years"] == request["horizon_years"]
+
+    def test_shares_estimates_per_universe(self, optimizer):
+        """Test: One (mu, S) estimate per universe group"""
+        requests = [{"risk_profile": p, "horizon_years": h} for p in ("low", "medium") for h in (3, 5, 10)]
+        requests.append({"risk_profile": "medium", "horizon_years": 5, "exclude_tickers": ["AAPL"]})
+
+        optimizer.optimize_many(requests)
+
+        assert optimizer.estimate_cache.stats()["misses"] == 2
+
+    def test_failures_are_reported_in_place(self, optimizer):
+        """Test: A bad request yields an error entry without failing the batch"""
+        results = optimizer.optimize_many([
+            {"risk_profile": "extreme", "horizon_years": 5},
+            {"risk_profile": "low", "horizon_years": 5},
+        ])
+
+        assert "error" in results[0]
+        assert "weights" in results[1]
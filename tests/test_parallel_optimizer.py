@@ -0,0 +1,75 @@
+"""
+Tests for the process-pool parallel optimizer
+"""
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from parallel_optimizer import ParallelOptimizer
+from portfolio_optimizer_csv import CSVPortfolioOptimizer
+from data_loader import PortfolioDataLoader
+
+
+class TestParallelOptimizer:
+    """Test suite for ParallelOptimizer"""
+
+    def test_matches_serial_results_in_order(self, synthetic_csvs):
+        """Test: Worker results equal the in-process batch, in input order"""
+        requests = [
+            {"risk_profile": profile, "horizon_years": horizon, "exclude_tickers": exclude}
+            for profile in ("low", "medium")
+            for horizon in (3, 10)
+            for exclude in (None, ["AAPL"], ["KO", "PG"])
+        ]
+        requests.insert(3, {"risk_profile": "extreme", "horizon_years": 5})
+
+        serial = CSVPortfolioOptimizer(PortfolioDataLoader(*synthetic_csvs)).optimize_many(requests)
+        with ParallelOptimizer(*synthetic_csvs, max_workers=2, chunk_size=3) as pool:
+            parallel = pool.optimize_many(requests)
+
+        assert len(parallel) == len(requests)
+        assert "error" in parallel[3]
+        for expected, result in zip(serial, parallel):
+            assert result.get("weights") == expected.get("weights")
+            assert result.get("horizon_years") == expected.get("horizon_years")
+
+    def test_chunks_group_by_universe(self, synthetic_csvs):
+        """Test: Chunks never mix universes and respect chunk_size"""
+        requests = [{"risk_profile": "low", "horizon_years": 5, "exclude_tickers": [t]}
+                    for t in ("AAPL", "KO", "AAPL", "AAPL", "KO")]
+
+        chunks = ParallelOptimizer(*synthetic_csvs, chunk_size=2)._chunks(requests)
+
+        assert sorted(map(sorted, chunks)) == [[0, 2], [1, 4], [3]]
+
+    def test_batch_deadline_terminates_workers(self, synthetic_csvs):
+        """Test: Unfinished chunks time out together and their workers are killed"""
+        requests = [{"risk_profile": "medium", "horizon_years": 5, "exclude_tickers": [t]}
+                    for t in ("AAPL", "KO", "MSFT", "PG")]
+
+        pool = ParallelOptimizer(*synthetic_csvs, max_workers=2, chunk_size=1, batch_timeout=0.01)
+        start = time.perf_counter()
+        results = pool.optimize_many(requests)
+
+        assert time.perf_counter() - start < 10
+        assert all("timed out" in result["error"] for result in results)
+        assert pool._executor is None
+        assert not multiprocessing.active_children()
+
+    def test_terminate_kills_registered_workers(self, synthetic_csvs):
+        """Test: Workers report their pids and _terminate kills exactly those"""
+        pool = ParallelOptimizer(*synthetic_csvs, max_workers=2, chunk_size=1)
+        pool.optimize_many([{"risk_profile": "low", "horizon_years": 5, "exclude_tickers": [t]}
+                            for t in ("AAPL", "KO", "MSFT", "PG")])
+        pids = pool.worker_pids()
+        assert pids and set(pids) <= {p.pid for p in multiprocessing.active_children()}
+
+        pool._terminate()
+
+        assert pool._executor is None
+        assert not multiprocessing.active_children()
+        for pid in pids:
+            with pytest.raises(ProcessLookupError):
+                os.kill(pid, 0)
@@ -0,0 +1,76 @@
+"""
+Tests for the process-wide app resources
+"""
+import threading
+
+from data_loader import PortfolioDataLoader
+from guardrails import GuardrailSystem
+from resources import SharedResources
+from synthetic_data import write_dataset
+
+
+class CountingAgent:
+    """Stands in for the Cerebras agent and counts constructions"""
+
+    built = 0
+
+    def __init__(self, optimizer):
+        CountingAgent.built += 1
+        self.optimizer = optimizer
+
+
+class TestSharedResources:
+    """Test suite for SharedResources"""
+
+    def test_built_once_across_threads(self, synthetic_csvs):
+        """Test: Concurrent sessions share one loader, optimizer and agent"""
+        CountingAgent.built = 0
+        loaders = []
+
+        def build_loader():
+            loaders.append(PortfolioDataLoader(*synthetic_csvs))
+            return loaders[-1]
+
+        resources = SharedResources(build_loader, CountingAgent)
+        agents = []
+        threads = [threading.Thread(target=lambda: agents.append(resources.agent)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(loaders) == 1 and CountingAgent.built == 1
+        assert all(agent is agents[0] for agent in agents)
+        assert resources.agent.optimizer is resources.optimizer
+        assert resources.optimizer.data_loader is resources.data_loader
+
+    def test_refreshes_on_new_data(self, tmp_path):
+        """Test: New price data is picked up after the refresh interval; objects are kept"""
+        csvs = write_dataset(tmp_path, n_tickers=10, n_days=60, seed=1)
+        resources = SharedResources(lambda: PortfolioDataLoader(*csvs, use_store=False), CountingAgent, 0.0)
+        optimizer = resources.optimizer
+        version = resources.data_loader.data_version
+        mapping = resources.sector_mapping()
+        assert resources.sector_mapping() is mapping
+
+        write_dataset(tmp_path, n_tickers=10, n_days=90, seed=2)
+
+        assert resources.data_loader.data_version != version
+        assert len(resources.data_loader.get_price_matrix()) == 90
+        assert resources.sector_mapping() is not mapping
+        assert resources.optimizer is optimizer
+
+
+class TestViolationLog:
+    """Test suite for the bounded guardrail violation log"""
+
+    def test_keeps_most_recent(self):
+        """Test: The shared agent's guardrails keep only the latest violations"""
+        guardrail = GuardrailSystem()
+        limit = guardrail.violation_log.maxlen
+        for i in range(limit + 5):
+            guardrail.detect_pii(f"my ssn is 123-45-{i:04d}")
+
+        summary = guardrail.get_violation_summary()
+        assert summary["total_violations"] == limit
+        assert summary["violations"][-1]["input_preview"].startswith(f"my ssn is 123-45-{limit + 4:04d}")
@@ -0,0 +1,99 @@
+"""
+Tests for the vectorized share allocator and the loader's latest-price index
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from pypfopt.discrete_allocation import DiscreteAllocation, get_latest_prices
+
+from data_loader import PortfolioDataLoader
+from portfolio_optimizer_csv import CSVPortfolioOptimizer
+from share_allocation import MAX_UNAFFORDABLE_SKIPS, _top_candidates, greedy_allocation
+from synthetic_data import write_dataset
+
+PORTFOLIO_VALUES = [1_000, 7_500, 25_000, 100_000, 1_000_000]
+
+
+def random_weights(tickers, seed, zeros=0):
+    """Long-only weights summing to one, with some zero weights"""
+    rng = np.random.default_rng(seed)
+    raw = rng.dirichlet(np.ones(len(tickers)))
+    raw[rng.choice(len(tickers), size=zeros, replace=False)] = 0
+    raw /= raw.sum()
+    return dict(zip(tickers, np.round(raw, 5).tolist()))
+
+
+def pypfopt_allocation(weights, latest_prices, value):
+    return DiscreteAllocation(weights, latest_prices, total_portfolio_value=value).greedy_portfolio()
+
+
+class TestLatestPrices:
+    """Test suite for PortfolioDataLoader.get_latest_prices"""
+
+    def test_matches_pypfopt(self, synthetic_csvs):
+        """Test: Same prices as get_latest_prices on the full history"""
+        loader = PortfolioDataLoader(*synthetic_csvs)
+        expected = get_latest_prices(loader.get_historical_prices())
+
+        latest = loader.get_latest_prices()
+        pd.testing.assert_series_equal(latest[expected.index], expected, check_names=False)
+
+        subset = loader.get_latest_prices(["MSFT", "NOPE"])
+        assert subset["MSFT"] == expected["MSFT"]
+        assert np.isnan(subset["NOPE"])
+
+
+class TestGreedyAllocation:
+    """Test suite for greedy_allocation"""
+
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_matches_greedy_portfolio(self, seed, tmp_path):
+        """Test: Same shares, order and leftover as pypfopt for every portfolio value"""
+        loader = PortfolioDataLoader(*write_dataset(tmp_path, n_tickers=60, n_days=60, seed=seed))
+        latest_prices = loader.get_latest_prices()
+        weights = random_weights(latest_prices.index.tolist(), seed, zeros=5)
+
+        results = greedy_allocation(weights, latest_prices, PORTFOLIO_VALUES)
+        for value, (allocation, leftover) in zip(PORTFOLIO_VALUES, results):
+            expected, expected_leftover = pypfopt_allocation(weights, latest_prices, value)
+            assert list(allocation.items()) == list(expected.items()), value
+            assert leftover == pytest.approx(expected_leftover, abs=1e-6)
+
+    def test_small_value_with_expensive_stocks(self):
+        """Test: Nothing affordable in round one still follows greedy_portfolio"""
+        prices = pd.Series({"A": 400.0, "B": 250.0, "C": 90.0, "D": 30.0})
+        weights = {"A": 0.4, "B": 0.3, "C": 0.2, "D": 0.1}
+
+        for value in (20, 100, 300, 500):
+            allocation, leftover = greedy_allocation(weights, prices, [value])[0]
+            expected, expected_leftover = pypfopt_allocation(weights, prices, value)
+            assert allocation == expected
+            assert leftover == pytest.approx(expected_leftover)
+
+    def test_top_candidates_match_stable_sort(self):
+        """Test: Partial selection orders ties like a stable descending sort"""
+        deficit = np.random.default_rng(3).integers(-3, 4, size=(50, 40)).astype(float)
+        expected = np.argsort(-deficit, axis=1, kind="stable")[:, :MAX_UNAFFORDABLE_SKIPS]
+        np.testing.assert_array_equal(_top_candidates(deficit), expected)
+
+    def test_invalid_inputs(self):
+        """Test: Missing prices and non-positive amounts are rejected"""
+        prices = pd.Series({"A": 10.0})
+        with pytest.raises(ValueError):
+            greedy_allocation({"A": 0.5, "B": 0.5}, prices, [1000])
+        with pytest.raises(ValueError):
+            greedy_allocation({"A": 1.0}, prices, [0])
+
+
+class TestOptimizerAllocation:
+    """Test suite for the optimizer's allocation methods"""
+
+    def test_batch_matches_single_calls(self, synthetic_csvs):
+        """Test: discrete_allocations gives each amount's discrete_allocation result"""
+        optimizer = CSVPortfolioOptimizer(PortfolioDataLoader(*synthetic_csvs))
+        weights = optimizer.optimize_portfolio(risk_profile='medium', horizon_years=5)["weights"]
+
+        batch = optimizer.discrete_allocations(weights, PORTFOLIO_VALUES)
+        for value, (allocation, leftover) in zip(PORTFOLIO_VALUES, batch):
+            assert optimizer.discrete_allocation(weights, value) == (allocation, leftover)
+            assert leftover >= 0
@@ -0,0 +1,209 @@
+"""
+Tests for single-flight coalescing of identical concurrent requests
+"""
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+from agent_cerebras import CerebrasPortfolioAgent
+from data_loader import PortfolioDataLoader
+from extraction_cache import ExtractionCache
+from portfolio_optimizer_csv import CSVPortfolioOptimizer
+from single_flight import SingleFlight
+
+
+def run_concurrently(fn, n):
+    """Call fn() from n threads at once; returns the results in thread order"""
+    results = [None] * n
+
+    def call(i):
+        results[i] = fn()
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    return results
+
+
+def wait_for_followers(flights, count):
+    """Wait until count callers joined an in-flight computation"""
+    deadline = time.monotonic() + 10
+    while flights.stats()["followers"] < count:
+        assert time.monotonic() < deadline, "followers never joined"
+        time.sleep(0.005)
+
+
+class TestSingleFlight:
+    """Test suite for SingleFlight"""
+
+    def test_concurrent_calls_share_one_computation(self):
+        """Test: One leader computes; followers get equal but separate results"""
+        flights = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            release.wait(10)
+            return {"weights": {"AAPL": 0.5, "MSFT": 0.5}}
+
+        threading.Thread(target=lambda: wait_for_followers(flights, 7) or release.set()).start()
+        results = run_concurrently(lambda: flights.do("medium", compute), 8)
+
+        assert len(calls) == 1
+        assert all(result == {"weights": {"AAPL": 0.5, "MSFT": 0.5}} for result in results)
+        assert len({id(result) for result in results}) == 8
+        assert flights.stats() == {"leaders": 1, "followers": 7, "in_flight": 0}
+
+    def test_errors_reach_every_caller(self):
+        """Test: The leader's exception is raised in the followers too"""
+        flights = SingleFlight()
+        release = threading.Event()
+
+        def fail():
+            release.wait(10)
+            raise ValueError("infeasible")
+
+        errors = []
+
+        def call():
+            try:
+                flights.do("high", fail)
+            except ValueError as e:
+                errors.append(e)
+
+        threading.Thread(target=lambda: wait_for_followers(flights, 2) or release.set()).start()
+        run_concurrently(call, 3)
+        assert len(errors) == 3
+
+    def test_async_callers_share_one_computation(self):
+        """Test: Coroutines coalesce without blocking the loop, and can follow a thread's computation"""
+        flights = SingleFlight()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"risk_profile": "low"}
+
+        async def burst():
+            return await asyncio.gather(*(flights.do_async("low", compute) for _ in range(5)))
+
+        results = asyncio.run(burst())
+        assert len(calls) == 1
+        assert results == [{"risk_profile": "low"}] * 5
+        assert len({id(result) for result in results}) == 5
+
+        release = threading.Event()
+        leader = threading.Thread(target=lambda: flights.do("high", lambda: release.wait(10) and "high"))
+        leader.start()
+        # Four followers so far; the fifth is the coroutine below
+        threading.Thread(target=lambda: wait_for_followers(flights, 5) or release.set()).start()
+
+        async def follow():
+            while flights.stats()["in_flight"] == 0:
+                await asyncio.sleep(0.001)
+            return await flights.do_async("high", compute)
+
+        assert asyncio.run(follow()) == "high"
+        leader.join(10)
+        assert len(calls) == 1
+
+    def test_nothing_kept_after_completion(self):
+        """Test: Sequential calls recompute"""
+        flights = SingleFlight()
+        assert flights.do("low", lambda: 1) == 1
+        assert flights.do("low", lambda: 2) == 2
+
+
+class TestCoalescedRequests:
+    """Test suite for coalescing in the optimizer and the agent"""
+
+    def test_optimize_portfolio_burst(self, synthetic_csvs, monkeypatch):
+        """Test: A burst of identical optimize_portfolio calls solves once"""
+        optimizer = CSVPortfolioOptimizer(PortfolioDataLoader(*synthetic_csvs))
+        solve = optimizer._optimize_portfolio
+        release = threading.Event()
+        solves = []
+
+        def slow_solve(*args):
+            solves.append(args)
+            release.wait(10)
+            return solve(*args)
+
+        monkeypatch.setattr(optimizer, "_optimize_portfolio", slow_solve)
+        threading.Thread(target=lambda: wait_for_followers(optimizer.single_flight, 5) or release.set()).start()
+        results = run_concurrently(lambda: optimizer.optimize_portfolio("medium", 5), 6)
+
+        assert len(solves) == 1
+        assert all(result["weights"] == results[0]["weights"] for result in results)
+
+    def test_extraction_burst(self, synthetic_csvs, tmp_path):
+        """Test: Identical queries in flight share one LLM extraction call"""
+        agent = CerebrasPortfolioAgent(
+            optimizer=CSVPortfolioOptimizer(PortfolioDataLoader(*synthetic_csvs)),
+            extraction_cache=ExtractionCache(tmp_path / "cache.sqlite3")
+        )
+        release = threading.Event()
+        requests = []
+
+        def create(**kwargs):
+            requests.append(kwargs)
+            release.wait(10)
+            content = '{"risk_profile": "low", "horizon_years": 5, "confidence": 0.9}'
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+        agent.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        threading.Thread(target=lambda: wait_for_followers(agent._extraction_flights, 3) or release.set()).start()
+        results = run_concurrently(lambda: agent._request_extraction("I'm 60, keep it safe"), 4)
+
+        assert len(requests) == 1
+        assert all(params["risk_profile"] == "low" for params in results)
+
+    def test_extraction_coalesces_normalized_queries(self, synthetic_csvs, tmp_path):
+        """Test: Queries sharing a cache entry share the call, on the sync and async paths"""
+        agent = CerebrasPortfolioAgent(
+            optimizer=CSVPortfolioOptimizer(PortfolioDataLoader(*synthetic_csvs)),
+            extraction_cache=ExtractionCache(tmp_path / "cache.sqlite3")
+        )
+        content = '{"risk_profile": "low", "horizon_years": 5, "confidence": 0.9}'
+        requests = []
+
+        async def complete(request):
+            requests.append(request)
+            await asyncio.sleep(0.2)
+            return content
+
+        async def burst(queries):
+            return await asyncio.gather(*(agent._extract_parameters_async(query) for query in queries))
+
+        agent._complete_async = complete
+        queries = ["I'm 60, keep it safe", "i'm 60,  KEEP it safe!", "I'm 60, keep it safe."]
+        results = asyncio.run(burst(queries))
+
+        assert len(requests) == 1
+        assert all(params["risk_profile"] == "low" for params in results)
+
+        release = threading.Event()
+
+        def create(**kwargs):
+            requests.append(kwargs)
+            release.wait(10)
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+        agent.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        # Two async followers so far, three sync ones to come
+        threading.Thread(target=lambda: wait_for_followers(agent._extraction_flights, 5) or release.set()).start()
+        queries = iter(["Retire in 5 years", "retire in 5 years", "RETIRE IN 5 YEARS", "Retire  in 5 years?"])
+        lock = threading.Lock()
+
+        def request():
+            with lock:
+                query = next(queries)
+            return agent._request_extraction(query)
+
+        run_concurrently(request, 4)
+        assert len(requests) == 2
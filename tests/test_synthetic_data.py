@@ -0,0 +1,57 @@
+"""
+Tests for the synthetic market data generator
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_loader import PortfolioDataLoader
+from synthetic_data import SyntheticMarket, write_dataset
+
+
+class TestSyntheticMarket:
+    """Test suite for SyntheticMarket"""
+
+    def test_chunk_size_does_not_change_prices(self):
+        """Test: The same seed gives the same prices for any block size"""
+        def closes(chunk_days):
+            market = SyntheticMarket(n_tickers=12, n_sectors=3, n_days=100, seed=3)
+            return np.vstack([block for _, block in market.iter_chunks(chunk_days)])
+
+        np.testing.assert_allclose(closes(7), closes(100))
+
+    def test_returns_are_correlated(self):
+        """Test: The market and sector factors give positively correlated returns"""
+        market = SyntheticMarket(n_tickers=20, n_sectors=4, n_days=500, seed=1)
+        prices = np.vstack([block for _, block in market.iter_chunks()])
+        corr = np.corrcoef(np.diff(np.log(prices), axis=0), rowvar=False)
+        assert corr[np.triu_indices_from(corr, k=1)].mean() > 0.1
+
+
+class TestWriteDataset:
+    """Test suite for the written CSV files"""
+
+    def test_loader_reads_output(self, tmp_path):
+        """Test: The loader builds a complete price matrix from the generated files"""
+        portfolio_csv, prices_csv = write_dataset(tmp_path, n_tickers=40, n_sectors=8, n_days=300)
+        loader = PortfolioDataLoader(portfolio_csv, prices_csv, use_store=False)
+
+        assert loader.validate_data() == (True, [])
+        matrix = loader.get_price_matrix()
+        assert matrix.shape == (300, 40)
+        assert not matrix.isna().any().any()
+        assert len(set(loader.get_sector_mapping().values())) == 8
+
+        portfolio = pd.read_csv(portfolio_csv)
+        assert list(portfolio.columns) == ["Ticker", "Sector", "Price", "Weight"]
+        assert portfolio["Weight"].sum() == pytest.approx(1.0, abs=1e-3)
+
+    def test_explicit_sectors(self, tmp_path):
+        """Test: An explicit sector mapping fixes the tickers and their sectors"""
+        sectors = {"IT": ["AAA", "BBB"], "Finance": ["CCC"]}
+        portfolio_csv, _ = write_dataset(tmp_path, n_days=10, sectors=sectors)
+
+        portfolio = pd.read_csv(portfolio_csv)
+        assert dict(zip(portfolio["Ticker"], portfolio["Sector"])) == {
+            "AAA": "IT", "BBB": "IT", "CCC": "Finance"
+        }
@@ -0,0 +1,94 @@
+"""
+Tests for the single-pass text scanner and the guardrails built on it
+"""
+import random
+import re
+
+import pytest
+
+from config_new import PII_PATTERNS
+from guardrails import MALICIOUS_KEYWORDS, PII_KEYWORDS, GuardrailSystem
+from text_scanner import TextScanner, candidate_class
+
+
+def reference_scan(patterns, keywords, text):
+    """Per-pattern findall and per-keyword substring checks, as the guardrails did before"""
+    found = [(category, match) for category, group in patterns.items() for p in group for match in re.findall(p, text)]
+    lowered = text.lower()
+    found += [(category, k) for category, group in keywords.items() for k in group if k.lower() in lowered]
+    return found
+
+
+def random_texts(seed, count, alphabet="0123456789 -ABCDEFGHIJabcdehkpsxy\n"):
+    rng = random.Random(seed)
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 120))) for _ in range(count)]
+
+
+class TestTextScanner:
+    """Test suite for TextScanner"""
+
+    def test_candidate_class(self):
+        """Test: First characters are derived from the parsed patterns"""
+        assert candidate_class(PII_PATTERNS) == r"[\dA-Z]"
+        assert candidate_class([r"\bfoo", r"(?:ba|c)r+"]) == "[fbc]"
+        assert candidate_class([r"\d+", r"(?i)abc"]) is None
+        assert candidate_class([r"x*y"]) is None
+
+    @pytest.mark.parametrize("patterns", [
+        PII_PATTERNS,
+        PII_PATTERNS + [r"\d{4}", r"[a-c]+x"],   # overlapping matches across patterns
+        [r"\d{3}", r"(?i)ab", r"[^ ]e"],          # no first-character guard
+        [r"(\d)(\d)-", r"(A)B", r"\d{2}"],        # capture groups change findall's result
+    ])
+    def test_matches_findall(self, patterns):
+        """Test: Every pattern reports exactly its own findall() matches"""
+        keywords = {"PII": ["ssn", "pass"], "MALICIOUS": ["hack", "bypass"]}
+        scanner = TextScanner({"PII": patterns}, keywords)
+
+        for text in random_texts(len(patterns), 500):
+            found = [(m["category"], m["match"]) for m in scanner.scan(text)]
+            assert found == reference_scan({"PII": patterns}, keywords, text), text
+
+    def test_match_details(self):
+        """Test: Matches carry category, source and offsets"""
+        scanner = TextScanner({"PII": PII_PATTERNS}, {"MALICIOUS": MALICIOUS_KEYWORDS})
+        text = "Card 4111 1111 1111 1111, please BYPASS the check"
+
+        card, keyword = scanner.scan(text)
+        assert card["category"] == "PII" and card["source"] == "pattern"
+        assert text[card["start"]:card["end"]] == "4111 1111 1111 1111"
+        assert keyword == {"category": "MALICIOUS", "source": "keyword", "pattern": "bypass",
+                           "match": "bypass", "start": 33, "end": 39}
+
+
+class TestGuardrailScanning:
+    """Test suite for GuardrailSystem on the shared scanner"""
+
+    def test_same_findings_as_separate_scans(self):
+        """Test: detect_pii reports what the per-pattern and per-keyword scans reported"""
+        guardrail = GuardrailSystem()
+        patterns = [re.compile(p) for p in PII_PATTERNS]
+        texts = random_texts(7, 300) + [
+            "My SSN is 123-45-6789 and my passport number is ABCDE1234F",
+            "Aadhaar 123456789012 3456, credit card 1234 5678 9012 3456",
+            "I'm 30 with moderate risk, 10 year horizon",
+        ]
+
+        for text in texts:
+            expected = [f"PII Pattern: {m[:4]}***" for p in patterns for m in p.findall(text)]
+            expected += [f"PII Keyword: {k}" for k in PII_KEYWORDS if k in text.lower()]
+            assert guardrail.detect_pii(text) == (bool(expected), expected)
+
+    def test_validate_input_uses_one_scan(self):
+        """Test: PII and malicious keywords are reported from a single scan"""
+        guardrail = GuardrailSystem()
+        calls = []
+        scan = guardrail.scanner.scan
+        guardrail.scanner.scan = lambda text: calls.append(text) or scan(text)
+
+        result = guardrail.validate_input("Help me Hack the SSN database")
+
+        assert len(calls) == 1
+        assert not result["is_valid"]
+        assert [v["type"] for v in result["violations"]] == ["PII_DETECTED", "SUSPICIOUS_INTENT"]
+        assert guardrail.validate_input("Balanced portfolio for 20 years")["is_valid"]
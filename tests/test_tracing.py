@@ -0,0 +1,135 @@
+"""
+Tests for request tracing and stage latency metrics
+"""
+import contextvars
+import json
+import threading
+
+import pytest
+
+import tracing
+from data_loader import PortfolioDataLoader
+from portfolio_optimizer_csv import CSVPortfolioOptimizer
+from tracing import JsonLinesExporter, StageMetrics, span, start_trace
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    tracing.metrics.reset()
+    yield
+    tracing.metrics.reset()
+
+
+class TestSpans:
+    """Test suite for spans and traces"""
+
+    def test_nested_spans(self):
+        """Test: Spans record their parent and stage_seconds sums repeated names"""
+        with start_trace("request") as trace:
+            with span("outer"):
+                with span("inner"):
+                    pass
+                with span("inner"):
+                    pass
+
+        spans = trace.to_dict()["spans"]
+        assert [(s["name"], s["parent"]) for s in spans] == [
+            ("outer", "request"), ("inner", "outer"), ("inner", "outer")
+        ]
+        stages = trace.stage_seconds()
+        assert set(stages) == {"outer", "inner", "total"}
+        assert stages["total"] >= stages["outer"] >= stages["inner"]
+
+    def test_span_without_trace_is_noop(self):
+        """Test: Spans outside a trace record nothing"""
+        with span("orphan"):
+            pass
+        assert tracing.current_trace() is None
+        assert tracing.metrics.summary() == {}
+
+    def test_nested_trace_becomes_span(self):
+        """Test: start_trace inside a trace joins the outer trace"""
+        with start_trace("outer") as outer:
+            with start_trace("inner") as inner:
+                pass
+
+        assert inner is outer
+        assert "inner" in outer.stage_seconds()
+        assert list(tracing.metrics.summary()) == ["outer"]
+
+    def test_copied_context_reaches_threads(self):
+        """Test: Work submitted with a copied context records into the trace"""
+        def work():
+            with span("worker"):
+                pass
+
+        with start_trace("request") as trace:
+            thread = threading.Thread(target=contextvars.copy_context().run, args=(work,))
+            thread.start()
+            thread.join()
+
+        (worker,) = trace.to_dict()["spans"]
+        assert worker["name"] == "worker"
+        assert worker["parent"] == "request"
+        assert worker["thread"] != threading.current_thread().name
+
+
+class TestStageMetrics:
+    """Test suite for latency quantiles and exporters"""
+
+    def test_quantiles(self):
+        """Test: Summary reports count, mean and p50/p95/p99 per stage"""
+        metrics = StageMetrics()
+        for ms in range(1, 101):
+            metrics.observe("request", "solve", ms / 1000)
+
+        stats = metrics.summary()["request"]["solve"]
+        assert stats["count"] == 100
+        assert stats["mean"] == pytest.approx(0.0505)
+        assert stats["p50"] == pytest.approx(0.0505)
+        assert stats["p95"] == pytest.approx(0.09505)
+        assert stats["p99"] == pytest.approx(0.09901)
+
+    def test_sample_window_is_bounded(self):
+        """Test: Quantiles use the latest samples; counts are all-time"""
+        metrics = StageMetrics(max_samples=10)
+        for seconds in [10.0] * 50 + [1.0] * 10:
+            metrics.observe("request", "solve", seconds)
+
+        stats = metrics.summary()["request"]["solve"]
+        assert stats["count"] == 60
+        assert stats["p99"] == 1.0
+
+    def test_prometheus_text(self):
+        """Test: Exposition has quantile, sum and count series per stage"""
+        metrics = StageMetrics()
+        metrics.observe("process_query", "extraction", 0.4)
+
+        text = metrics.to_prometheus()
+        assert "# TYPE f2_stage_latency_seconds summary" in text
+        assert 'f2_stage_latency_seconds{trace="process_query",stage="extraction",quantile="0.95"} 0.4' in text
+        assert 'f2_stage_latency_seconds_count{trace="process_query",stage="extraction"} 1' in text
+
+    def test_json_lines_export(self, tmp_path):
+        """Test: Each finished trace is appended as one JSON line"""
+        exporter = JsonLinesExporter(tmp_path / "traces.jsonl")
+        tracing.add_exporter(exporter)
+        try:
+            for _ in range(2):
+                with start_trace("request"):
+                    with span("stage"):
+                        pass
+        finally:
+            tracing.remove_exporter(exporter)
+
+        lines = (tmp_path / "traces.jsonl").read_text().splitlines()
+        assert len(lines) == 2
+        assert json.loads(lines[0])["spans"][0]["name"] == "stage"
+
+    def test_optimizer_stages(self, synthetic_csvs):
+        """Test: optimize_portfolio is traced with data load, estimation and solve stages"""
+        optimizer = CSVPortfolioOptimizer(PortfolioDataLoader(*synthetic_csvs))
+        optimizer.optimize_portfolio("medium", 5)
+
+        stages = tracing.metrics.summary()["optimize_portfolio"]
+        assert {"data_load", "estimation", "solve", "total"} <= set(stages)
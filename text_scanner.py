@@ -0,0 +1,190 @@
+"""
+Text Scanner for F2 Portfolio Recommender
+Finds several categorized regular expressions and keyword lists in one scan,
+for guardrail checks on queries, chat transcripts and uploaded documents
+
+All patterns are combined into one regular expression that captures, at each
+position where any of them starts, every pattern matching there; a pass over
+those captures then reproduces each pattern's own findall() result. The
+combined expression is led by a lookahead on the characters the patterns can
+start with (derived from the parsed patterns), which lets the regex engine
+skip every other position in C. Keywords are matched case-insensitively on
+one lowercased copy of the text with str.find, which outruns both a keyword
+alternation and a pure-Python Aho-Corasick automaton in CPython.
+
+Usage:
+    scanner = TextScanner({"PII": PII_PATTERNS}, {"PII": ["passport"], "MALICIOUS": ["hack"]})
+    for match in scanner.scan(text):
+        print(match["category"], match["match"], match["start"])
+"""
+import logging
+import re
+from typing import Dict, List, Optional
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+logger = logging.getLogger(__name__)
+
+_CATEGORY_CLASSES = {
+    sre_parse.CATEGORY_DIGIT: r"\d",
+    sre_parse.CATEGORY_WORD: r"\w",
+    sre_parse.CATEGORY_SPACE: r"\s",
+}
+
+
+def _first_chars(items) -> Optional[List[str]]:
+    """Character-class pieces covering every first character of a parsed pattern (None: any)"""
+    for op, av in items:
+        if op is sre_parse.AT:
+            continue  # Anchors and \b consume nothing
+        if op is sre_parse.LITERAL:
+            return [re.escape(chr(av))]
+        if op is sre_parse.IN:
+            pieces = []
+            for item_op, item_av in av:
+                if item_op is sre_parse.LITERAL:
+                    pieces.append(re.escape(chr(item_av)))
+                elif item_op is sre_parse.RANGE:
+                    pieces.append(f"{re.escape(chr(item_av[0]))}-{re.escape(chr(item_av[1]))}")
+                elif item_op is sre_parse.CATEGORY and item_av in _CATEGORY_CLASSES:
+                    pieces.append(_CATEGORY_CLASSES[item_av])
+                else:
+                    return None
+            return pieces
+        if op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            low, _, sub = av
+            return _first_chars(sub) if low >= 1 else None
+        if op is sre_parse.SUBPATTERN:
+            _, add_flags, _, sub = av
+            return None if add_flags & re.IGNORECASE else _first_chars(sub)
+        if op is sre_parse.BRANCH:
+            pieces = []
+            for branch in av[1]:
+                branch_pieces = _first_chars(branch)
+                if branch_pieces is None:
+                    return None
+                pieces.extend(branch_pieces)
+            return pieces
+        return None
+    return None  # Can match the empty string
+
+
+def candidate_class(patterns: List[str]) -> Optional[str]:
+    """
+    Character class matching every character any of the patterns can start with
+
+    Args:
+        patterns: Regular expressions
+
+    Returns:
+        e.g. "[\\dA-Z]", or None when some pattern may start with any
+        character (case-insensitive, negated class, optional first item, ...)
+    """
+    pieces = []
+    for pattern in patterns:
+        parsed = sre_parse.parse(pattern)
+        if parsed.state.flags & re.IGNORECASE:
+            return None
+        first = _first_chars(parsed.data)
+        if first is None:
+            return None
+        pieces.extend(first)
+    return f"[{''.join(dict.fromkeys(pieces))}]" if pieces else None
+
+
+class TextScanner:
+    """
+    Compiled multi-pattern, multi-keyword scanner
+
+    Matches are dictionaries with the category, the source ("pattern" or
+    "keyword"), the pattern or keyword, the matched text and its offsets.
+    """
+
+    def __init__(
+        self,
+        patterns: Optional[Dict[str, List[str]]] = None,
+        keywords: Optional[Dict[str, List[str]]] = None
+    ):
+        """
+        Compile scanner
+
+        Args:
+            patterns: Regular expressions by category
+            keywords: Case-insensitive keywords by category
+        """
+        self._patterns = [(category, p) for category, group in (patterns or {}).items() for p in group]
+        self._keywords = [
+            (category, keyword, keyword.lower()) for category, group in (keywords or {}).items() for keyword in group
+        ]
+
+        # Capture groups (which change findall's result and group numbering) and global
+        # inline flags cannot be embedded in the combined expression: scan those on their own
+        self._separate_regexes = {
+            i: regex for i, regex in enumerate(re.compile(p) for _, p in self._patterns)
+            if regex.groups or regex.flags & ~re.UNICODE
+        }
+        combined = [i for i in range(len(self._patterns)) if i not in self._separate_regexes]
+        self._groups = {i: f"_scan{i}" for i in combined}
+
+        self._regex = None
+        if combined:
+            sources = [self._patterns[i][1] for i in combined]
+            guard = candidate_class(sources)
+            if guard is None:
+                logger.info("Scanner patterns have no common first-character class; scanning every position")
+            self._regex = re.compile(
+                (f"(?={guard})" if guard else "")
+                + "(?=" + "|".join(f"(?:{p})" for p in sources) + ")"
+                + "".join(f"(?=(?P<{self._groups[i]}>{self._patterns[i][1]}))?" for i in combined)
+            )
+
+    def _pattern_match(self, i: int, match: str, start: int, end: int) -> Dict:
+        category, pattern = self._patterns[i]
+        return {"category": category, "source": "pattern", "pattern": pattern,
+                "match": match, "start": start, "end": end}
+
+    def scan(self, text: str) -> List[Dict]:
+        """
+        Find every pattern and keyword in the text
+
+        Each pattern reports the same matches as its own findall(), in
+        pattern order and then by position; each keyword found is reported
+        once (first occurrence, offsets in the lowercased text), in keyword
+        order after the patterns.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            List of match dictionaries
+        """
+        found: Dict[int, List[Dict]] = {i: [] for i in range(len(self._patterns))}
+
+        if self._regex is not None:
+            next_start = dict.fromkeys(self._groups, 0)
+            for m in self._regex.finditer(text):
+                for i, name in self._groups.items():
+                    start, end = m.span(name)
+                    # findall resumes after each match, so overlapping matches of one pattern are skipped
+                    if start >= 0 and start >= next_start[i]:
+                        found[i].append(self._pattern_match(i, text[start:end], start, end))
+                        next_start[i] = end if end > start else start + 1
+
+        for i, regex in self._separate_regexes.items():
+            for m in regex.finditer(text):
+                value = m.group() if not regex.groups else m.group(1) if regex.groups == 1 else m.groups()
+                found[i].append(self._pattern_match(i, value, m.start(), m.end()))
+
+        matches = [match for i in range(len(self._patterns)) for match in found[i]]
+
+        if self._keywords:
+            lowered = text.lower()
+            for category, keyword, needle in self._keywords:
+                start = lowered.find(needle)
+                if start >= 0:
+                    matches.append({"category": category, "source": "keyword", "pattern": keyword,
+                                    "match": keyword, "start": start, "end": start + len(needle)})
+        return matches
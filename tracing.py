@@ -0,0 +1,315 @@
+"""
+Request Tracing for F2 Portfolio Recommender
+Lightweight spans with monotonic timings, per-stage latency quantiles and exporters
+(JSON lines of traces, Prometheus text file of quantiles)
+
+Usage:
+    with start_trace("process_query") as trace:
+        with span("extraction"):
+            ...
+    trace.stage_seconds()   # {"extraction": 0.41, ..., "total": 0.85}
+    metrics.summary()       # {"process_query": {"extraction": {"p50": ..., "p95": ..., "p99": ...}}}
+
+Spans outside an active trace cost one context-variable lookup and record
+nothing. Traces follow contextvars, so they cover asyncio tasks and
+asyncio.to_thread; wrap other thread-pool submissions in
+contextvars.copy_context().run.
+"""
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Deque, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from config_new import (
+    METRICS_FILE_INTERVAL_SECONDS,
+    METRICS_FILE_PATH,
+    TRACE_LOG_PATH,
+    TRACE_MAX_SAMPLES
+)
+
+logger = logging.getLogger(__name__)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Span:
+    """One timed stage of a trace"""
+
+    __slots__ = ("name", "parent", "start", "end", "thread")
+
+    def __init__(self, name: str, parent: Optional[str], start: float, end: float, thread: str):
+        self.name = name
+        self.parent = parent
+        self.start = start
+        self.end = end
+        self.thread = thread
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class Trace:
+    """Spans recorded while handling one request (thread-safe)"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started_at = time.time()
+        self.start = time.monotonic()
+        self.end: Optional[float] = None
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def finish(self) -> None:
+        if self.end is None:
+            self.end = time.monotonic()
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.monotonic()) - self.start
+
+    def stage_seconds(self) -> Dict[str, float]:
+        """Seconds per span name (repeated spans are summed), plus "total" for the trace so far"""
+        with self._lock:
+            spans = list(self.spans)
+        stages: Dict[str, float] = {}
+        for s in spans:
+            stages[s.name] = stages.get(s.name, 0.0) + s.duration
+        stages["total"] = self.duration
+        return {name: round(seconds, 4) for name, seconds in stages.items()}
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable trace with span offsets from the trace start"""
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "trace": self.name,
+            "started_at": self.started_at,
+            "duration": round(self.duration, 6),
+            "spans": [
+                {
+                    "name": s.name,
+                    "parent": s.parent,
+                    "offset": round(s.start - self.start, 6),
+                    "duration": round(s.duration, 6),
+                    "thread": s.thread,
+                }
+                for s in sorted(spans, key=lambda s: s.start)
+            ],
+        }
+
+
+class StageMetrics:
+    """
+    Latency quantiles per (trace, stage)
+
+    Keeps the latest ``max_samples`` durations of each stage for quantiles,
+    plus all-time counts and sums.
+    """
+
+    def __init__(self, max_samples: int = TRACE_MAX_SAMPLES):
+        self.max_samples = max_samples
+        self._samples: Dict[tuple, Deque[float]] = {}
+        self._counts: Dict[tuple, int] = {}
+        self._sums: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, trace_name: str, stage: str, seconds: float) -> None:
+        key = (trace_name, stage)
+        with self._lock:
+            if key not in self._samples:
+                self._samples[key] = deque(maxlen=self.max_samples)
+                self._counts[key] = 0
+                self._sums[key] = 0.0
+            self._samples[key].append(seconds)
+            self._counts[key] += 1
+            self._sums[key] += seconds
+
+    def record(self, trace: Trace) -> None:
+        """Observe every stage of a finished trace"""
+        for stage, seconds in trace.stage_seconds().items():
+            self.observe(trace.name, stage, seconds)
+
+    def summary(self) -> Dict[str, Dict[str, Dict]]:
+        """{trace: {stage: {count, sum, mean, p50, p95, p99}}} in seconds"""
+        with self._lock:
+            snapshot = {key: (np.array(samples), self._counts[key], self._sums[key])
+                        for key, samples in self._samples.items()}
+
+        result: Dict[str, Dict[str, Dict]] = {}
+        for (trace_name, stage), (samples, count, total) in sorted(snapshot.items()):
+            quantiles = np.quantile(samples, QUANTILES)
+            result.setdefault(trace_name, {})[stage] = {
+                "count": count,
+                "sum": round(total, 6),
+                "mean": round(total / count, 6),
+                **{f"p{int(q * 100)}": round(float(v), 6) for q, v in zip(QUANTILES, quantiles)},
+            }
+        return result
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition (summary type) of the stage latencies"""
+        lines = [
+            "# HELP f2_stage_latency_seconds Latency of request pipeline stages",
+            "# TYPE f2_stage_latency_seconds summary",
+        ]
+        for trace_name, stages in self.summary().items():
+            for stage, stats in stages.items():
+                labels = f'trace="{trace_name}",stage="{stage}"'
+                for q in QUANTILES:
+                    lines.append(
+                        f'f2_stage_latency_seconds{{{labels},quantile="{q}"}} {stats[f"p{int(q * 100)}"]}'
+                    )
+                lines.append(f"f2_stage_latency_seconds_sum{{{labels}}} {stats['sum']}")
+                lines.append(f"f2_stage_latency_seconds_count{{{labels}}} {stats['count']}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self._sums.clear()
+
+
+class JsonLinesExporter:
+    """Appends one JSON line per finished trace"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, trace: Trace) -> None:
+        line = json.dumps(trace.to_dict())
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class PrometheusFileExporter:
+    """
+    Rewrites a Prometheus text file with the current quantiles
+
+    For node_exporter's textfile collector; the file is replaced atomically
+    at most once every ``interval_seconds``.
+    """
+
+    def __init__(self, path: Path, stage_metrics: "StageMetrics", interval_seconds: float = METRICS_FILE_INTERVAL_SECONDS):
+        self.path = Path(path)
+        self.stage_metrics = stage_metrics
+        self.interval_seconds = interval_seconds
+        self._last_write = float("-inf")
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, trace: Trace) -> None:
+        with self._lock:
+            if time.monotonic() - self._last_write < self.interval_seconds:
+                return
+            self._last_write = time.monotonic()
+        self.write()
+
+    def write(self) -> None:
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(self.stage_metrics.to_prometheus(), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+# Process-wide latency metrics fed by every finished trace
+metrics = StageMetrics()
+
+_exporters: List = []
+if TRACE_LOG_PATH:
+    _exporters.append(JsonLinesExporter(TRACE_LOG_PATH))
+if METRICS_FILE_PATH:
+    _exporters.append(PrometheusFileExporter(METRICS_FILE_PATH, metrics))
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("f2_trace", default=None)
+_current_span: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("f2_span", default=None)
+
+
+def add_exporter(exporter) -> None:
+    """Send every finished trace to exporter.export(trace)"""
+    _exporters.append(exporter)
+
+
+def remove_exporter(exporter) -> None:
+    _exporters.remove(exporter)
+
+
+def current_trace() -> Optional[Trace]:
+    """The trace active in this context, if any"""
+    return _current_trace.get()
+
+
+@contextmanager
+def start_trace(name: str) -> Iterator[Trace]:
+    """
+    Trace the enclosed block as one request
+
+    Inside an already active trace this is an ordinary span and yields the
+    outer trace. On exit the trace is recorded in ``metrics`` and exported.
+    """
+    outer = _current_trace.get()
+    if outer is not None:
+        with span(name):
+            yield outer
+        return
+
+    trace = Trace(name)
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(name)
+    try:
+        yield trace
+    finally:
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+        trace.finish()
+        metrics.record(trace)
+        for exporter in list(_exporters):
+            try:
+                exporter.export(trace)
+            except OSError as e:
+                logger.warning(f"Trace export to {exporter.__class__.__name__} failed: {e}")
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time the enclosed block as a stage of the active trace (no-op without one)"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+
+    parent = _current_span.get()
+    token = _current_span.set(name)
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        end = time.monotonic()
+        _current_span.reset(token)
+        trace.add(Span(name, parent, start, end, threading.current_thread().name))
+
+
+def traced(name: str) -> Callable:
+    """Decorator form of span()"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator